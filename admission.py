@@ -0,0 +1,108 @@
+"""
+Admission control for the expensive API routes.
+
+Each route that can run an uncached, CPU-heavy query gets a RouteLimiter:
+at most max_concurrent requests run at once, up to max_queue more wait (for
+at most queue_timeout seconds) and anything beyond that is shed immediately
+instead of piling up behind the slow queries. Cached responses never pass
+through a limiter.
+
+Shed requests raise Shed, which app.py turns into a fast 503 (capacity) or
+429 (the query itself is too expensive) with a Retry-After header. Every
+decision is counted so /api/admission can show what is being shed and why.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Reasons a request can be shed, and the HTTP status each maps to
+QUEUE_FULL = 'queue_full'
+QUEUE_TIMEOUT = 'queue_timeout'
+TOO_EXPENSIVE = 'too_expensive'
+SHED_STATUS = {QUEUE_FULL: 503, QUEUE_TIMEOUT: 503, TOO_EXPENSIVE: 429}
+
+
+class Shed(Exception):
+    """A request rejected by admission control"""
+
+    def __init__(self, route, reason, message, retry_after=1):
+        super().__init__(message)
+        self.route = route
+        self.reason = reason
+        self.status = SHED_STATUS[reason]
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """Concurrency limit with a bounded, time-limited wait queue for one route"""
+
+    def __init__(self, route, max_concurrent, max_queue, queue_timeout):
+        self.route = route
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.degraded = 0
+        self.shed = {reason: 0 for reason in SHED_STATUS}
+        self.queued_seconds = 0.0
+
+    @contextmanager
+    def admit(self):
+        """Hold one of the route's slots for the duration of the block, or raise Shed"""
+        with self._cond:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.shed[QUEUE_FULL] += 1
+                    raise Shed(self.route, QUEUE_FULL, 'Server is busy, please retry shortly')
+                self.waiting += 1
+                start = time.perf_counter()
+                try:
+                    admitted = self._cond.wait_for(lambda: self.active < self.max_concurrent, self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                    self.queued_seconds += time.perf_counter() - start
+                if not admitted:
+                    self.shed[QUEUE_TIMEOUT] += 1
+                    raise Shed(self.route, QUEUE_TIMEOUT, 'Server is busy, please retry shortly')
+            self.active += 1
+            self.admitted += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify()
+
+    def reject(self, message, retry_after=0):
+        """Shed a request whose estimated cost is too high to run at all"""
+        with self._cond:
+            self.shed[TOO_EXPENSIVE] += 1
+        return Shed(self.route, TOO_EXPENSIVE, message, retry_after)
+
+    def record_degraded(self):
+        """Count a request answered with a cheaper fallback instead of being shed"""
+        with self._cond:
+            self.degraded += 1
+
+    @property
+    def busy(self):
+        """True when a new request would have to queue"""
+        return self.active >= self.max_concurrent
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'degraded': self.degraded,
+                'shed': dict(self.shed),
+                'queued_seconds': round(self.queued_seconds, 3)
+            }
@@ -1,19 +1,107 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, url_for
 import pandas as pd
+import hashlib
 import json
 import os
+import re
+import threading
 from pathlib import Path
+from contextlib import ExitStack
 from functools import lru_cache
 
+from admission import RouteLimiter, Shed
+from backends import (MAX_PAGE_SIZE, STATISTICS_FIELDS, PandasBackend, SQLiteBackend, StringPool, build_lock,
+                      build_sqlite, dataset_version, read_nodes_csv, sqlite_version)
+from profile_store import ProfileStore, build_profile_store, profile_version, store_version
+from country_matrix import CountryMatrix
+from export import ExportError, stream_export
+from sketches import StatisticsSketches
+from suggestions import build_suggestion_store
+from serving import Dataset, HeavyExecutor
+from startup import StartupStatus
+
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # Cache static files for 1 year
 
-nodes_df = None
-edges_df = None
-country_names = {}
+# Storage backend: 'pandas' (in memory) or 'sqlite' (indexed on-disk file)
+app.config['DATA_BACKEND'] = os.environ.get('DATA_BACKEND', 'pandas')
+app.config['SQLITE_PATH'] = os.environ.get('SQLITE_PATH', 'coauthors.sqlite3')
+
+# Materialized author profiles (empty path disables the store)
+app.config['PROFILE_STORE'] = os.environ.get('PROFILE_STORE', 'author_profiles')
+app.config['PROFILE_STORE_BUILD'] = os.environ.get('PROFILE_STORE_BUILD', '1') == '1'
+
+# Precomputed suggested collaborators (empty path disables them)
+app.config['SUGGESTION_STORE'] = os.environ.get('SUGGESTION_STORE', 'author_suggestions')
+app.config['SUGGESTION_STORE_BUILD'] = os.environ.get('SUGGESTION_STORE_BUILD', '1') == '1'
+
+# Sketches for approximate statistics; approx=auto switches to them above this many edges
+app.config['STATISTICS_SKETCHES'] = os.environ.get('STATISTICS_SKETCHES', '1') == '1'
+app.config['APPROX_AUTO_EDGES'] = int(os.environ.get('APPROX_AUTO_EDGES', 5_000_000))
+
+# Load data in a background thread so the worker can answer health checks
+# and cheap routes while indexes build; WARM_COUNTRIES largest countries get
+# their statistics precomputed before the worker reports ready
+app.config['BACKGROUND_STARTUP'] = os.environ.get('BACKGROUND_STARTUP', '1') == '1'
+app.config['WARM_COUNTRIES'] = int(os.environ.get('WARM_COUNTRIES', 5))
+
+# Threads per worker that may run uncached statistics, searches and backend
+# profile renders at once; the remaining request threads stay free for
+# cached and cheap routes
+app.config['HEAVY_WORKERS'] = int(os.environ.get('HEAVY_WORKERS', 2))
 
-# Cache for API responses
-api_cache = {}
+# Admission control for uncached work: concurrent slots and wait-queue size
+# per route; requests beyond the queue, or queued longer than
+# ADMISSION_QUEUE_TIMEOUT seconds, are shed with a fast 503
+app.config['STATISTICS_CONCURRENCY'] = int(os.environ.get('STATISTICS_CONCURRENCY', app.config['HEAVY_WORKERS']))
+app.config['STATISTICS_QUEUE'] = int(os.environ.get('STATISTICS_QUEUE', 8))
+app.config['SEARCH_CONCURRENCY'] = int(os.environ.get('SEARCH_CONCURRENCY', 2))
+app.config['SEARCH_QUEUE'] = int(os.environ.get('SEARCH_QUEUE', 8))
+app.config['EXPORT_CONCURRENCY'] = int(os.environ.get('EXPORT_CONCURRENCY', 2))
+app.config['EXPORT_QUEUE'] = int(os.environ.get('EXPORT_QUEUE', 0))
+app.config['ADMISSION_QUEUE_TIMEOUT'] = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2.0))
+
+# Cost limits: while statistics are busy, filters with more edges than this
+# are answered from the sketches instead of queueing; non-ID searches shorter
+# than SEARCH_MIN_CHARS are rejected with 429 and results are capped
+app.config['STATISTICS_DEGRADE_EDGES'] = int(os.environ.get('STATISTICS_DEGRADE_EDGES', 1_000_000))
+app.config['SEARCH_MIN_CHARS'] = int(os.environ.get('SEARCH_MIN_CHARS', 2))
+app.config['SEARCH_MAX_RESULTS'] = int(os.environ.get('SEARCH_MAX_RESULTS', 100))
+
+def parse_datasets(spec):
+    """{name: (nodes_csv, edges_csv)} from "name=nodes.csv:edges.csv;name2=..." """
+    datasets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(';'))):
+        name, _, files = entry.partition('=')
+        nodes_file, _, edges_file = files.partition(':')
+        if not re.fullmatch(r'[\w-]+', name.strip()) or not nodes_file or not edges_file:
+            raise ValueError(f"Bad DATASETS entry {entry!r}, expected name=nodes.csv:edges.csv")
+        datasets[name.strip()] = (nodes_file.strip(), edges_file.strip())
+    return datasets or {'default': ('coauthors_nodes.csv', 'coauthors_edges.csv')}
+
+# Named datasets hosted by this worker; API routes pick one with ?dataset=name
+# and fall back to DEFAULT_DATASET. Each gets its own SQLite file and stores
+# (the name is added to their paths, except for 'default').
+app.config['DATASETS'] = parse_datasets(os.environ.get('DATASETS', ''))
+app.config['DEFAULT_DATASET'] = os.environ.get('DEFAULT_DATASET', next(iter(app.config['DATASETS'])))
+
+startup = StartupStatus(['parse', 'index_build', 'cache_warm'])
+
+# The loaded data and its API response cache, per dataset name. Loaders
+# publish a new Dataset by swapping in a new dict; handlers read it once per
+# request. Country codes and author names are interned in one pool shared by
+# every pandas dataset, so overlapping datasets store each string once.
+datasets = {name: Dataset() for name in app.config['DATASETS']}
+string_pool = StringPool()
+publish_lock = threading.Lock()
+heavy = HeavyExecutor(app.config['HEAVY_WORKERS'])
+limiters = {
+    route: RouteLimiter(route, app.config[f'{route.upper()}_CONCURRENCY'], app.config[f'{route.upper()}_QUEUE'],
+                        app.config['ADMISSION_QUEUE_TIMEOUT'])
+    for route in ('statistics', 'search', 'export')
+}
+
+country_names = {}
 
 # Get the base directory
 BASE_DIR = Path(__file__).resolve().parent
@@ -39,16 +127,49 @@ def get_country_name(code):
     """Get country name from code, fallback to code if not found"""
     return country_names.get(code, code)
 
-def load_data(nodes_path, edges_path):
-    """Load CSV files into pandas dataframes"""
-    global nodes_df, edges_df
+def dataset_path(path, name):
+    """Per-dataset variant of a file or store path ('default' keeps the configured path)"""
+    if name == 'default':
+        return BASE_DIR / path
+    path = BASE_DIR / path
+    return path.with_name(f"{path.stem}.{name}{path.suffix}")
+
+class UnknownDataset(LookupError):
+    """A dataset= parameter naming no hosted dataset"""
+
+def selected_dataset():
+    """Snapshot of the dataset named by the request's dataset= parameter"""
+    name = request.args.get('dataset') or app.config['DEFAULT_DATASET']
+    data = datasets.get(name)
+    if data is None:
+        raise UnknownDataset(name)
+    return data
+
+@app.errorhandler(UnknownDataset)
+def unknown_dataset(e):
+    return jsonify({'error': f'Unknown dataset: {e}', 'datasets': list(datasets)}), 404
+
+def publish(name, backend, **changes):
+    """Swap in a copy of one dataset with some fields replaced.
+    
+    Structures built from a backend that has since been replaced are dropped.
+    """
+    global datasets
+    with publish_lock:
+        current = datasets.get(name)
+        if current is not None and current.backend is backend:
+            datasets = {**datasets, name: current.replace(**changes)}
+
+def load_data(name, nodes_path, edges_path):
+    """Load one dataset's CSV files into the configured storage backend"""
+    global datasets
     
     try:
         # Use absolute paths
         nodes_full_path = BASE_DIR / nodes_path
         edges_full_path = BASE_DIR / edges_path
         
-        print(f"Loading data from:")
+        print(f"Loading dataset '{name}' from:")
         print(f"  Nodes: {nodes_full_path}")
         print(f"  Edges: {edges_full_path}")
         
@@ -57,15 +178,23 @@ def load_data(nodes_path, edges_path):
         if not edges_full_path.exists():
             raise FileNotFoundError(f"Edges file not found: {edges_full_path}")
         
-        nodes_df = pd.read_csv(nodes_full_path)
-        edges_df = pd.read_csv(edges_full_path)
-        
-        # Convert year to int, handling NaN values
-        nodes_df['first_pubyear'] = pd.to_numeric(nodes_df['first_pubyear'], errors='coerce')
-        nodes_df = nodes_df.dropna(subset=['first_pubyear'])
-        nodes_df['first_pubyear'] = nodes_df['first_pubyear'].astype(int)
-        
-        print(f"✓ Loaded {len(nodes_df):,} nodes and {len(edges_df):,} edges")
+        version = dataset_version(nodes_full_path, edges_full_path)
+        backend_name = app.config['DATA_BACKEND']
+        if backend_name == 'sqlite':
+            backend = load_sqlite_backend(name, nodes_full_path, edges_full_path, version)
+        elif backend_name == 'pandas':
+            nodes_df = read_nodes_csv(nodes_full_path)
+            edges_df = pd.read_csv(edges_full_path)
+            backend = PandasBackend(nodes_df, edges_df, get_country_name, version, string_pool=string_pool)
+        else:
+            raise ValueError(f"Unknown DATA_BACKEND: {backend_name}")
+    
+        # A new backend replaces every derived structure and cached response
+        with publish_lock:
+            datasets = {**datasets, name: Dataset(backend=backend)}
+    
+        nodes_count, edges_count = backend.counts()
+        print(f"✓ Loaded {nodes_count:,} nodes and {edges_count:,} edges into '{name}' ({backend.name} backend)")
         return True
         
     except Exception as e:
@@ -75,6 +204,132 @@ def load_data(nodes_path, edges_path):
             print(f"  - {file}")
         return False
 
+def load_sqlite_backend(name, nodes_path, edges_path, version):
+    """Open the dataset's SQLite file, rebuilding it first if the CSVs have changed"""
+    db_path = dataset_path(app.config['SQLITE_PATH'], name)
+    
+    if sqlite_version(db_path) != version:
+        with build_lock(db_path):
+            # Another worker may have built it while this one waited for the lock
+            if sqlite_version(db_path) != version:
+                print(f"  Building SQLite database at {db_path}...")
+                build_sqlite(nodes_path, edges_path, db_path, version)
+    
+    return SQLiteBackend(db_path, get_country_name)
+
+def build_indexes(name):
+    """Build a dataset's heavy derived structures; routes fall back to the backend until they exist"""
+    backend = datasets[name].backend
+    publish(name, backend, profile_store=load_profile_store(name, backend, profile_version(backend.version)))
+    publish(name, backend, suggestion_store=load_suggestion_store(name, backend, backend.version))
+    publish(name, backend, statistics_sketches=load_statistics_sketches(backend))
+    publish(name, backend, country_matrix=load_country_matrix(backend))
+
+def warm_caches(name):
+    """Precompute the responses every dashboard visit asks for first"""
+    data = datasets[name]
+    cached_filters(data)
+    statistics = cached_statistics(data, '')
+    for entry in statistics['all_countries'][:app.config['WARM_COUNTRIES']]:
+        cached_statistics(data, entry['code'])
+    print(f"✓ Warmed API cache for '{name}' ({len(data.cache)} entries)")
+
+def load_statistics_sketches(backend):
+    """Stream the backend once to build the approximate statistics sketches"""
+    if not app.config['STATISTICS_SKETCHES']:
+        return None
+    
+    statistics_sketches = StatisticsSketches(backend, get_country_name)
+    print(f"✓ Built statistics sketches for {len(statistics_sketches.filters):,} filters")
+    return statistics_sketches
+
+def load_country_matrix(backend):
+    """Scatter-add every edge into the country x country matrix"""
+    country_matrix = CountryMatrix(backend)
+    print(f"✓ Built {len(country_matrix.codes)}x{len(country_matrix.codes)} country collaboration matrix")
+    return country_matrix
+
+def load_profile_store(name, backend, version):
+    """Open the materialized profile store, rebuilding it for a new dataset version"""
+    if not app.config['PROFILE_STORE']:
+        return None
+    
+    store_dir = dataset_path(app.config['PROFILE_STORE'], name)
+    if store_version(store_dir) != version:
+        if not app.config['PROFILE_STORE_BUILD']:
+            print(f"⚠ Profile store at {store_dir} is stale, serving profiles from the backend")
+            return None
+        with build_lock(store_dir):
+            # Another worker may have built it while this one waited for the lock
+            if store_version(store_dir) != version:
+                print(f"  Materializing author profiles into {store_dir}...")
+                build_profile_store(backend, store_dir, version)
+    
+    print(f"✓ Serving author profiles from {store_dir}")
+    return ProfileStore(store_dir, version)
+
+def load_suggestion_store(name, backend, version):
+    """Open the suggested collaborators store, rescoring it for a new dataset version"""
+    if not app.config['SUGGESTION_STORE']:
+        return None
+    
+    store_dir = dataset_path(app.config['SUGGESTION_STORE'], name)
+    if store_version(store_dir) != version:
+        if not app.config['SUGGESTION_STORE_BUILD']:
+            print(f"⚠ Suggestion store at {store_dir} is stale, suggestions disabled")
+            return None
+        with build_lock(store_dir):
+            if store_version(store_dir) != version:
+                print(f"  Scoring suggested collaborators into {store_dir}...")
+                build_suggestion_store(backend, store_dir, version)
+    
+    print(f"✓ Serving suggested collaborators from {store_dir}")
+    return ProfileStore(store_dir, version)
+
+@lru_cache(maxsize=None)
+def static_hash(filename):
+    """Short content hash of a static file, or None if it does not exist"""
+    try:
+        return hashlib.sha256((Path(app.static_folder) / filename).read_bytes()).hexdigest()[:12]
+    except OSError:
+        return None
+
+@app.url_defaults
+def hashed_static_url(endpoint, values):
+    """Version static URLs by content so browsers and the service worker can cache them forever"""
+    if endpoint == 'static' and 'v' not in values:
+        digest = static_hash(values.get('filename', ''))
+        if digest:
+            values['v'] = digest
+
+# Pages the service worker precaches and serves stale-while-revalidate
+SERVICE_WORKER_PAGES = ('/author', '/country', '/images')
+
+@app.route('/sw.js')
+def service_worker():
+    """Service worker, served from the root so its scope covers every page"""
+    static_dir = Path(app.static_folder)
+    assets = sorted(path.relative_to(static_dir).as_posix() for path in static_dir.rglob('*') if path.is_file())
+    precache = [url_for('static', filename=name) for name in assets]
+    
+    # A new cache name on any asset or template change makes browsers install the new worker
+    digest = hashlib.sha256('\n'.join(precache).encode())
+    for template in sorted((BASE_DIR / app.template_folder).glob('*')):
+        digest.update(template.read_bytes())
+    
+    script = render_template('sw.js', cache_version=digest.hexdigest()[:12], pages=SERVICE_WORKER_PAGES,
+                             precache=precache)
+    return app.response_class(script, mimetype='application/javascript', headers={'Cache-Control': 'no-cache'})
+
+@app.after_request
+def add_dataset_version(response):
+    """Tag API responses with the dataset version the service worker keys its cache by"""
+    if request.path.startswith('/api/'):
+        data = datasets.get(request.args.get('dataset') or app.config['DEFAULT_DATASET'])
+        if data is not None and data.backend is not None:
+            response.headers.setdefault('X-Dataset-Version', data.backend.version)
+    return response
+
 @app.route('/')
 def index():
     """Serve the main dashboard page"""
@@ -96,14 +351,26 @@ def page2():
 @app.route('/debug')
 def debug():
     """Debug endpoint to check file availability"""
+    data = selected_dataset()
+    backend = data.backend
     debug_info = {
         'base_dir': str(BASE_DIR),
         'current_working_directory': os.getcwd(),
         'files_in_directory': os.listdir(BASE_DIR),
         'csv_files': [f for f in os.listdir(BASE_DIR) if f.endswith('.csv')],
-        'data_loaded': nodes_df is not None and edges_df is not None,
-        'nodes_count': len(nodes_df) if nodes_df is not None else 0,
-        'edges_count': len(edges_df) if edges_df is not None else 0,
+        'data_loaded': backend is not None,
+        'startup': startup.snapshot(),
+        'datasets': list(datasets),
+        'dataset': request.args.get('dataset') or app.config['DEFAULT_DATASET'],
+        'data_backend': backend.name if backend is not None else app.config['DATA_BACKEND'],
+        'dataset_version': backend.version if backend is not None else None,
+        'profile_store': data.profile_store.store_dir if data.profile_store is not None else None,
+        'suggestion_store': data.suggestion_store.store_dir if data.suggestion_store is not None else None,
+        'nodes_count': backend.counts()[0] if backend is not None else 0,
+        'edges_count': backend.counts()[1] if backend is not None else 0,
+        'cached_responses': len(data.cache),
+        'heavy_workers': heavy.max_workers,
+        'string_pool': string_pool.snapshot(),
     }
     
     html = "<html><head><title>Debug Info</title><style>body{font-family:monospace;padding:20px;}</style></head><body>"
@@ -114,223 +381,452 @@ def debug():
     
     return html
 
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up (fails only if startup itself failed)"""
+    status = startup.snapshot()
+    return jsonify(status), 500 if status['state'] == 'failed' else 200
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: data loaded, indexes built and caches warm"""
+    status = startup.snapshot()
+    return jsonify(status), 200 if startup.ready else 503
+
+def data_unavailable():
+    """Response for data routes hit before the backend is available"""
+    if startup.loading:
+        return jsonify({'error': 'Data is still loading'}), 503, {'Retry-After': '5'}
+    return jsonify({'error': 'Data not loaded'}), 400
+
+def shed_response(shed):
+    """Fast rejection for a request shed by admission control"""
+    headers = {'Cache-Control': 'no-store'}
+    if shed.retry_after:
+        headers['Retry-After'] = str(shed.retry_after)
+    return jsonify({'error': str(shed), 'reason': shed.reason}), shed.status, headers
+
+@app.route('/api/admission')
+def get_admission():
+    """Admission control state and shed counters per route"""
+    return jsonify({route: limiter.snapshot() for route, limiter in limiters.items()})
+
+@app.route('/api/datasets')
+def get_datasets():
+    """Hosted datasets with their load state, plus the shared string pool"""
+    entries = []
+    for name, data in datasets.items():
+        backend = data.backend
+        nodes_count, edges_count = backend.counts() if backend is not None else (0, 0)
+        entries.append({
+            'name': name,
+            'default': name == app.config['DEFAULT_DATASET'],
+            'loaded': backend is not None,
+            'version': backend.version if backend is not None else None,
+            'nodes_count': nodes_count,
+            'edges_count': edges_count,
+            'cached_responses': len(data.cache)
+        })
+    return jsonify({'datasets': entries, 'string_pool': string_pool.snapshot()})
+
+def cached_filters(data):
+    """Filter options and the dataset version (clients key their response caches by it), computed once"""
+    def compute():
+        countries_codes = data.backend.filters()
+        return {
+            'countries': [{'code': code, 'name': get_country_name(code)} for code in countries_codes],
+            'version': data.backend.version
+        }
+    return data.cache.get_or_compute('filters', compute)
+
 @app.route('/api/filters')
 def get_filters():
     """Get available filter options"""
-    if nodes_df is None:
-        return jsonify({'error': 'Data not loaded'}), 400
-    
-    # Check cache first
-    if 'filters' in api_cache:
-        return jsonify(api_cache['filters'])
+    data = selected_dataset()
+    if data.backend is None:
+        return data_unavailable()
     
-    countries_codes = sorted(nodes_df['country_code'].dropna().unique().tolist())
-    countries = [{'code': code, 'name': get_country_name(code)} for code in countries_codes]
-    
-    result = {'countries': countries}
-    api_cache['filters'] = result
-    
-    return jsonify(result)
+    return jsonify(cached_filters(data))
+
+# Column order of each list-valued statistics field in shape=columnar responses
+STATISTICS_COLUMNS = {
+    'top_countries': ('country', 'code', 'count'),
+    'all_countries': ('country', 'code', 'count'),
+    'top_authors': ('id', 'name', 'count'),
+    'year_distribution': ('year', 'count'),
+    'strength_distribution': ('strength', 'count'),
+}
+
+def get_cache_key(country, approximate=False, field=None, structure=None):
+    """Generate cache key for statistics (one entry per field and filter)"""
+    prefix = 'stats_approx' if approximate else 'stats'
+    scope = f"/component={structure[0]}/core={structure[1]}" if structure else ''
+    return f"{prefix}_{country if country else 'all'}{scope}:{field}"
+
+def parse_structure_filter():
+    """(component, min_core) from the component=giant|<id> and min_core=<k> parameters, or None"""
+    component = request.args.get('component', '').strip().lower()
+    min_core = request.args.get('min_core', '').strip()
+    if not component and not min_core:
+        return None
+    if component == 'giant':
+        component = 0
+    elif component:
+        component = int(component)
+    else:
+        component = None
+    min_core = int(min_core) if min_core else 0
+    if (component is not None and component < 0) or min_core < 0:
+        raise ValueError('component and min_core must be non-negative')
+    return component, min_core
+
+def use_approximate_statistics(data, country):
+    """Decide from the approx parameter (1/true, auto, or absent) whether to answer from sketches"""
+    statistics_sketches = data.statistics_sketches
+    mode = request.args.get('approx', '').lower()
+    if statistics_sketches is None or mode not in ('1', 'true', 'auto'):
+        return False
+    if (country or '') not in statistics_sketches.filters:
+        return False
+    if mode == 'auto':
+        return statistics_sketches.edge_count(country) > app.config['APPROX_AUTO_EDGES']
+    return True
 
-def get_cache_key(country):
-    """Generate cache key for statistics"""
-    return f"stats_{country if country else 'all'}"
+def sketches_cover(data, country, structure):
+    """True when the sketches can answer a filter approximately"""
+    sketches = data.statistics_sketches
+    return structure is None and sketches is not None and (country or '') in sketches.filters
+
+def to_columnar(result):
+    """Replace lists of records with parallel arrays, one per column"""
+    shaped = dict(result)
+    for field, columns in STATISTICS_COLUMNS.items():
+        if field in shaped:
+            rows = shaped[field]
+            shaped[field] = {column: [row[column] for row in rows] for column in columns}
+    return shaped
 
 @app.route('/api/statistics')
 def get_statistics():
-    """Get filtered statistics based on query parameters"""
-    if nodes_df is None or edges_df is None:
-        return jsonify({'error': 'Data not loaded'}), 400
+    """Get filtered statistics based on query parameters
+    
+    fields=summary,year_distribution,... limits the response to those fields
+    and shape=columnar returns list fields as parallel arrays.
+    approx=1 answers from precomputed sketches (with error bounds) and
+    approx=auto does so only for filters with more than APPROX_AUTO_EDGES edges.
+    component=giant (or a component id) and min_core=k restrict the authors by
+    graph structure; these are always answered exactly.
+    """
+    data = selected_dataset()
+    if data.backend is None:
+        return data_unavailable()
     
     country = request.args.get('country', '')
-    cache_key = get_cache_key(country)
-    
-    # Check cache first
-    if cache_key in api_cache:
-        return jsonify(api_cache[cache_key])
     
-    filtered_nodes = nodes_df.copy()
+    fields = STATISTICS_FIELDS
+    if request.args.get('fields'):
+        requested = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        unknown = sorted(set(requested) - set(STATISTICS_FIELDS))
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        fields = tuple(field for field in STATISTICS_FIELDS if field in requested)
     
-    if country:
-        filtered_nodes = filtered_nodes[filtered_nodes['country_code'] == country]
+    shape = request.args.get('shape', 'rows')
+    if shape not in ('rows', 'columnar'):
+        return jsonify({'error': 'shape must be rows or columnar'}), 400
     
-    filtered_node_ids = set(filtered_nodes['author_id'].values)
-    filtered_edges = edges_df[
-        edges_df['author1'].isin(filtered_node_ids) & 
-        edges_df['author2'].isin(filtered_node_ids)
-    ]
+    try:
+        structure = parse_structure_filter()
+    except ValueError:
+        return jsonify({'error': 'component must be giant or a component id and min_core an integer >= 0'}), 400
+    
+    approximate = structure is None and use_approximate_statistics(data, country)
+    cached = all(get_cache_key(country, False, field, structure) in data.cache for field in fields)
+    if approximate or cached:
+        result = cached_statistics(data, country, approximate, fields, structure)
+    else:
+        try:
+            result = admitted_statistics(data, country, fields, structure)
+        except Shed as e:
+            return shed_response(e)
+    response = jsonify(to_columnar(result) if shape == 'columnar' else result)
+    if result.get('degraded'):
+        # An estimate served under load must not be cached in place of the exact answer
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def admitted_statistics(data, country, fields, structure):
+    """Exact statistics through admission control, degrading to the sketches when shed
     
-    total_authors = len(filtered_nodes)
-    total_collaborations = int(filtered_edges['collaboration_count'].sum())
-    avg_collaborations = round(total_collaborations / total_authors, 1) if total_authors > 0 else 0
+    Raises Shed when the request is shed and the sketches cannot stand in.
+    """
+    limiter = limiters['statistics']
+    degradable = sketches_cover(data, country, structure)
     
-    # Only include country data if no country filter is applied
-    top_countries = []
-    all_countries = []
+    # Don't queue an expensive filter behind others when an estimate is available
+    if degradable and limiter.busy and \
+            data.statistics_sketches.edge_count(country) > app.config['STATISTICS_DEGRADE_EDGES']:
+        limiter.record_degraded()
+        return dict(cached_statistics(data, country, True, fields), degraded=True)
     
-    if not country:
-        country_counts = filtered_nodes['country_code'].value_counts().head(10)
-        top_countries = [{'country': get_country_name(k), 'code': k, 'count': int(v)} for k, v in country_counts.items()]
+    try:
+        with limiter.admit():
+            return cached_statistics(data, country, False, fields, structure)
+    except Shed:
+        if not degradable:
+            raise
+        limiter.record_degraded()
+        return dict(cached_statistics(data, country, True, fields), degraded=True)
+
+def cached_statistics(data, country, approximate=False, fields=STATISTICS_FIELDS, structure=None):
+    """Statistics for a filter; each field is computed once and cached on its own"""
+    cache = data.cache
+    keys = {field: get_cache_key(country, approximate, field, structure) for field in fields}
+    missing = [field for field in fields if keys[field] not in cache]
+    
+    if missing:
+        def compute():
+            if approximate:
+                computed = data.statistics_sketches.statistics(country, missing)
+                cache.update({get_cache_key(country, True, 'error_bounds'): computed['error_bounds']})
+            else:
+                computed = heavy.run(data.backend.statistics, country, missing, *(structure or ()))
+            
+            # Cache each field separately
+            cache.update({keys[field]: computed[field] for field in missing})
         
-        all_country_counts = filtered_nodes['country_code'].value_counts()
-        all_countries = [{'country': get_country_name(k), 'code': k, 'count': int(v)} for k, v in all_country_counts.items()]
-    
-    author_collabs = {}
-    for _, row in filtered_edges.iterrows():
-        count = int(row['collaboration_count'])
-        author_collabs[row['author1']] = author_collabs.get(row['author1'], 0) + count
-        author_collabs[row['author2']] = author_collabs.get(row['author2'], 0) + count
-    
-    top_authors = []
-    for author_id, collab_count in sorted(author_collabs.items(), key=lambda x: x[1], reverse=True)[:10]:
-        author_info = filtered_nodes[filtered_nodes['author_id'] == author_id]
-        if not author_info.empty:
-            top_authors.append({
-                'id': str(author_id),
-                'name': author_info.iloc[0]['author_name'],
-                'count': collab_count
-            })
-    
-    year_counts = filtered_nodes['first_pubyear'].value_counts().sort_index()
-    year_distribution = [{'year': int(k), 'count': int(v)} for k, v in year_counts.items()]
-    
-    collab_strength = filtered_edges['collaboration_count'].value_counts().sort_index()
-    strength_distribution = [{'strength': int(k), 'count': int(v)} for k, v in collab_strength.items()]
-    
-    result = {
-        'summary': {
-            'total_authors': total_authors,
-            'total_collaborations': total_collaborations,
-            'avg_collaborations': avg_collaborations,
-            'unique_connections': len(filtered_edges)
-        },
-        'top_countries': top_countries,
-        'all_countries': all_countries,
-        'top_authors': top_authors,
-        'year_distribution': year_distribution,
-        'strength_distribution': strength_distribution,
-        'has_country_filter': bool(country)
-    }
-    
-    # Cache the result
-    api_cache[cache_key] = result
-    
-    return jsonify(result)
+        # Concurrent requests for the same missing fields share one computation
+        cache.single_flight(tuple(keys[field] for field in missing), compute)
+    
+    result = {field: cache.get(keys[field]) for field in fields}
+    result['has_country_filter'] = bool(country)
+    if structure:
+        result['structure_filter'] = {'component': structure[0], 'min_core': structure[1]}
+    if approximate:
+        result['approximate'] = True
+        result['error_bounds'] = cache.get(get_cache_key(country, True, 'error_bounds'))
+    
+    return result
 
 @app.route('/api/search/author')
 def search_author():
     """Search for authors by ID or name"""
-    if nodes_df is None or edges_df is None:
-        return jsonify({'error': 'Data not loaded'}), 400
+    data = selected_dataset()
+    if data.backend is None:
+        return data_unavailable()
     
     query = request.args.get('q', '').strip()
     
     if not query:
         return jsonify({'error': 'No search query provided'}), 400
     
-    results = nodes_df[
-        (nodes_df['author_id'].astype(str) == query) |
-        (nodes_df['author_name'].str.contains(query, case=False, na=False))
-    ]
+    # A very short name fragment matches most authors; author IDs are always allowed
+    limiter = limiters['search']
+    min_chars = app.config['SEARCH_MIN_CHARS']
+    if len(query) < min_chars and not query.isdigit():
+        return shed_response(limiter.reject(f'Query too broad: enter at least {min_chars} characters'))
     
-    if results.empty:
-        return jsonify({'results': [], 'count': 0})
+    max_results = app.config['SEARCH_MAX_RESULTS']
+    try:
+        with limiter.admit():
+            authors = heavy.run(data.backend.search_author, query, max_results + 1)
+    except Shed as e:
+        return shed_response(e)
     
-    authors = []
-    for _, author in results.iterrows():
-        author_id = author['author_id']
-        
-        author_edges = edges_df[
-            (edges_df['author1'] == author_id) | 
-            (edges_df['author2'] == author_id)
-        ]
-        
-        total_collabs = int(author_edges['collaboration_count'].sum())
-        num_collaborators = len(author_edges)
-        
-        collaborator_ids = set()
-        for _, edge in author_edges.iterrows():
-            if edge['author1'] == author_id:
-                collaborator_ids.add(edge['author2'])
-            else:
-                collaborator_ids.add(edge['author1'])
-        
-        collaborators = []
-        for collab_id in list(collaborator_ids)[:5]:
-            collab_info = nodes_df[nodes_df['author_id'] == collab_id]
-            if not collab_info.empty:
-                collab_edge = author_edges[
-                    ((author_edges['author1'] == author_id) & (author_edges['author2'] == collab_id)) |
-                    ((author_edges['author2'] == author_id) & (author_edges['author1'] == collab_id))
-                ]
-                collab_count = int(collab_edge['collaboration_count'].sum()) if not collab_edge.empty else 0
-                
-                collaborators.append({
-                    'id': str(collab_id),
-                    'name': collab_info.iloc[0]['author_name'],
-                    'collaboration_count': collab_count
-                })
-        
-        collaborators.sort(key=lambda x: x['collaboration_count'], reverse=True)
-        
-        authors.append({
-            'author_id': str(author_id),
-            'author_name': author['author_name'],
-            'first_pubyear': int(author['first_pubyear']),
-            'country_code': author['country_code'],
-            'total_collaborations': total_collabs,
-            'num_collaborators': num_collaborators,
-            'top_collaborators': collaborators
-        })
+    truncated = len(authors) > max_results
+    authors = authors[:max_results]
     
     return jsonify({
         'results': authors,
-        'count': len(authors)
+        'count': len(authors),
+        'truncated': truncated
     })
 
 @app.route('/api/author/<author_id>')
 def get_author_details(author_id):
-    """Get detailed information about a specific author"""
-    if nodes_df is None or edges_df is None:
-        return jsonify({'error': 'Data not loaded'}), 400
+    """Get detailed information about a specific author
+    
+    Optional query parameters page through the collaborators (heaviest first):
+    limit (page size), cursor (from the previous page's next_cursor) and
+    country (only collaborators from that country).
+    """
+    data = selected_dataset()
+    if data.backend is None:
+        return data_unavailable()
     
-    author = nodes_df[nodes_df['author_id'].astype(str) == author_id]
+    if any(param in request.args for param in ('limit', 'cursor', 'country')):
+        return get_author_collaborator_page(data, author_id)
     
-    if author.empty:
+    if data.profile_store is not None:
+        profile = data.profile_store.get(author_id)
+        if profile is None:
+            return jsonify({'error': 'Author not found'}), 404
+        return app.response_class(profile, mimetype='application/json')
+    
+    details = heavy.run(data.backend.author_details, author_id)
+    
+    if details is None:
         return jsonify({'error': 'Author not found'}), 404
     
-    author = author.iloc[0]
+    return jsonify(details)
+
+@app.route('/api/author/<author_id>/suggestions')
+def get_author_suggestions(author_id):
+    """Suggested collaborators: authors two hops away, ranked by Adamic-Adar score"""
+    data = selected_dataset()
+    if data.suggestion_store is None:
+        if data.backend is not None and startup.phase_done('index_build'):
+            return jsonify({'error': 'Suggestions are disabled'}), 404
+        return data_unavailable()
+    
+    suggestions = data.suggestion_store.get(author_id)
+    if suggestions is None:
+        return jsonify({'error': 'Author not found'}), 404
+    
+    return app.response_class(suggestions, mimetype='application/json')
+
+def get_author_collaborator_page(data, author_id):
+    """Paginated variant of the author details response"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        cursor = int(request.args.get('cursor', 0))
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
     
-    author_edges = edges_df[
-        (edges_df['author1'].astype(str) == author_id) | 
-        (edges_df['author2'].astype(str) == author_id)
-    ]
+    if not 1 <= limit <= MAX_PAGE_SIZE or cursor < 0:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE} and cursor non-negative'}), 400
     
-    collaborators = []
-    for _, edge in author_edges.iterrows():
-        collab_id = edge['author2'] if str(edge['author1']) == author_id else edge['author1']
-        collab_info = nodes_df[nodes_df['author_id'] == collab_id]
+    country = request.args.get('country', '').strip() or None
+    page = heavy.run(data.backend.collaborator_page, author_id, limit, cursor, country)
+    
+    if page is None:
+        return jsonify({'error': 'Author not found'}), 404
+    
+    return jsonify(page)
+
+def run_startup(dataset_files, country_codes_file):
+    """Load every dataset and build its indexes in phases, recording progress in `startup`
+    
+    dataset_files maps dataset names to their (nodes, edges) CSV files.
+    """
+    global datasets
+    with publish_lock:
+        datasets = {name: datasets.get(name, Dataset()) for name in dataset_files}
+    
+    startup.begin()
+    try:
+        with startup.phase('parse'):
+            load_country_codes(country_codes_file)
+            for name, (nodes_file, edges_file) in dataset_files.items():
+                if not load_data(name, nodes_file, edges_file):
+                    raise RuntimeError(f"Could not load data files for dataset '{name}'")
         
-        if not collab_info.empty:
-            collaborators.append({
-                'id': str(collab_id),
-                'name': collab_info.iloc[0]['author_name'],
-                'country': collab_info.iloc[0]['country_code'],
-                'collaboration_count': int(edge['collaboration_count'])
-            })
+        with startup.phase('index_build'):
+            for name in dataset_files:
+                build_indexes(name)
+        
+        with startup.phase('cache_warm'):
+            for name in dataset_files:
+                warm_caches(name)
+    except Exception as e:
+        startup.fail(e)
+        print(f"\n⚠ Warning: Startup failed: {e}")
+        print(f"   Make sure CSV files are in the repository root")
+        return False
     
-    collaborators.sort(key=lambda x: x['collaboration_count'], reverse=True)
+    startup.finish()
+    print(f"\n✓ Data loaded successfully!")
+    for name, data in datasets.items():
+        nodes_count, edges_count = data.backend.counts()
+        print(f"   {name}: {nodes_count:,} authors, {edges_count:,} collaborations")
+    print(f"   Shared string pool: {len(string_pool):,} strings")
+    for phase in startup.snapshot()['phases']:
+        print(f"   {phase['name']}: {phase['seconds']}s")
+    print(f"\n✓ Server is ready!")
+    return True
+
+@app.route('/api/countries/matrix')
+def get_country_matrix():
+    """Country x country matrix of summed collaboration counts between authors"""
+    data = selected_dataset()
+    country_matrix = data.country_matrix
+    if country_matrix is None:
+        return data_unavailable()
+    
+    return jsonify(data.cache.get_or_compute('country_matrix', lambda: {
+        'countries': [{'code': code, 'name': get_country_name(code)} for code in country_matrix.codes],
+        'matrix': country_matrix.matrix.tolist()
+    }))
+
+@app.route('/api/countries/<code>/partners')
+def get_country_partners(code):
+    """Top partner countries of a country, read from its pre-sorted matrix row"""
+    country_matrix = selected_dataset().country_matrix
+    if country_matrix is None:
+        return data_unavailable()
     
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    partners = country_matrix.top_partners(code, max(limit, 0))
+    if partners is None:
+        return jsonify({'error': 'Country not found'}), 404
+    
+    domestic, international = country_matrix.totals(code)
     return jsonify({
-        'author_id': str(author['author_id']),
-        'author_name': author['author_name'],
-        'first_pubyear': int(author['first_pubyear']),
-        'country_code': author['country_code'],
-        'total_collaborations': int(author_edges['collaboration_count'].sum()),
-        'num_collaborators': len(collaborators),
-        'collaborators': collaborators
+        'code': code,
+        'country': get_country_name(code),
+        'domestic_collaborations': domestic,
+        'international_collaborations': international,
+        'partners': [{'code': partner, 'country': get_country_name(partner), 'count': count}
+                     for partner, count in partners]
     })
 
+@app.route('/api/graph/summary')
+def get_graph_summary():
+    """Connected component size distribution and k-core histogram of the coauthor graph"""
+    data = selected_dataset()
+    if data.backend is None:
+        return data_unavailable()
+    
+    return jsonify(data.cache.get_or_compute('graph_summary', data.backend.structure.summary))
+
+@app.route('/api/export')
+def export_subgraph():
+    """Stream the nodes and/or edges of a filtered subgraph as csv, ndjson or parquet"""
+    backend = selected_dataset().backend
+    if backend is None:
+        return data_unavailable()
+    
+    country = request.args.get('country', '')
+    try:
+        min_weight = int(request.args.get('min_weight', 0))
+    except ValueError:
+        return jsonify({'error': 'min_weight must be an integer'}), 400
+    if min_weight < 0:
+        return jsonify({'error': 'min_weight must be >= 0'}), 400
+    
+    try:
+        body, mimetype, filename = stream_export(
+            backend, country, min_weight, request.args.get('format', 'csv'), request.args.get('part')
+        )
+    except ExportError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    # The slot is held until the stream has been fully sent (or abandoned)
+    slot = ExitStack()
+    try:
+        slot.enter_context(limiters['export'].admit())
+    except Shed as e:
+        return shed_response(e)
+    
+    response = Response(body, mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+    response.call_on_close(slot.close)
+    return response
+
 # Initialize data on startup for production
 def init_app():
     """Initialize the application with data"""
@@ -339,24 +835,20 @@ def init_app():
     print("="*60)
     
     # Try to load data automatically
-    nodes_file = 'coauthors_nodes.csv'
-    edges_file = 'coauthors_edges.csv'
+    dataset_files = app.config['DATASETS']
     country_codes_file = 'country_codes.json'
     
     print(f"\nLooking for data files in: {BASE_DIR}")
     print(f"Files available: {os.listdir(BASE_DIR)}")
     
-    load_country_codes(country_codes_file)
-    success = load_data(nodes_file, edges_file)
-    
-    if success:
-        print(f"\n✓ Data loaded successfully!")
-        print(f"   Authors: {len(nodes_df):,}")
-        print(f"   Collaborations: {len(edges_df):,}")
-        print(f"\n✓ Server is ready!")
+    if app.config['BACKGROUND_STARTUP']:
+        # Serve health checks and static pages while loading; /readyz flips when done
+        thread = threading.Thread(target=run_startup, args=(dataset_files, country_codes_file),
+                                  name='startup', daemon=True)
+        thread.start()
+        print("  Loading data in the background (see /readyz)")
     else:
-        print(f"\n⚠ Warning: Could not load data files")
-        print(f"   Make sure CSV files are in the repository root")
+        run_startup(dataset_files, country_codes_file)
     
     print("="*60 + "\n")
 
@@ -378,15 +870,14 @@ if __name__ == '__main__':
             print(f"Error: {edges_file} not found")
             sys.exit(1)
         
-        load_country_codes(country_codes_file)
-        load_data(nodes_file, edges_file)
+        app.config['DATASETS'] = {'default': (nodes_file, edges_file)}
+        app.config['DEFAULT_DATASET'] = 'default'
+        if not run_startup(app.config['DATASETS'], country_codes_file):
+            sys.exit(1)
         
         print("\n" + "="*50)
         print("Research Collaboration Dashboard")
         print("="*50)
-        print(f"\nData loaded successfully!")
-        print(f"   Authors: {len(nodes_df):,}")
-        print(f"   Collaborations: {len(edges_df):,}")
         print(f"\nStarting server...")
         print(f"   Open your browser to: http://localhost:5000")
         print(f"\nPress Ctrl+C to stop the server")
@@ -0,0 +1,130 @@
+"""
+ASGI entry point for the dashboard.
+
+    uvicorn asgi:application --workers 2
+
+Adapts the Flask WSGI app to ASGI without extra dependencies. Each request
+runs on a thread of its own (at most REQUEST_THREADS at once), so the event
+loop never blocks on handler work; CPU-heavy handlers are further limited by
+app.heavy, which leaves the other request threads free for cached and cheap
+routes. Response bodies are streamed chunk by chunk, so /api/export stays
+incremental. The app call, every chunk of the body and its close() run on
+that same thread, because the SQLite backend's connections (and so its
+export generators) may only be used on the thread that opened them.
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app
+
+REQUEST_THREADS = int(os.environ.get('REQUEST_THREADS', 32))
+
+_END = object()
+
+
+class WSGIToASGI:
+    """Minimal HTTP-only ASGI adapter around a WSGI application"""
+
+    def __init__(self, wsgi_app, threads=REQUEST_THREADS):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.threads)
+        loop = asyncio.get_running_loop()
+        environ = self._environ(scope, bytes(body))
+        async with self._slots:
+            # One thread for the whole request: the body may hold thread-bound resources
+            thread = ThreadPoolExecutor(1, thread_name_prefix='request')
+            try:
+                iterable = await loop.run_in_executor(thread, self.wsgi_app, environ, start_response)
+                try:
+                    iterator = iter(iterable)
+                    # WSGI lets an app delay start_response until its first chunk
+                    chunk = await loop.run_in_executor(thread, next, iterator, _END)
+                    await send({'type': 'http.response.start', 'status': response['status'],
+                                'headers': response['headers']})
+                    while chunk is not _END:
+                        if chunk:
+                            await send({'type': 'http.response.body', 'body': bytes(chunk), 'more_body': True})
+                        chunk = await loop.run_in_executor(thread, next, iterator, _END)
+                    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                finally:
+                    close = getattr(iterable, 'close', None)
+                    if close is not None:
+                        await loop.run_in_executor(thread, close)
+            finally:
+                thread.shutdown(wait=False)
+
+    @staticmethod
+    def _environ(scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+application = WSGIToASGI(app)
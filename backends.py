@@ -0,0 +1,917 @@
+"""
+Storage backends for the author collaboration dashboard.
+
+Each backend answers the same four queries used by app.py (filters,
+statistics, author search and author details) and returns plain Python
+structures, so the JSON produced by the routes is identical regardless of
+where the data lives:
+
+  * PandasBackend  - everything in memory, with an integer adjacency index.
+  * SQLiteBackend  - an indexed on-disk SQLite file, built once from the CSVs,
+                     so workers never hold the full tables in memory.
+
+Ordering rules shared by both backends (ties are always broken the same way):
+  * authors are ordered by their first row in the nodes file
+  * edges are ordered by their row in the edges file
+  * countries with equal counts are ordered by code
+
+Statistics can additionally be restricted to one connected component and/or
+a minimum k-core number (see graph_structure.py).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds are not serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from graph_structure import GraphStructure
+
+# Number of CSV rows inserted per batch when building the SQLite file
+SQLITE_CHUNK_ROWS = 200_000
+
+# Number of collaborators shown per author in search results
+SEARCH_TOP_COLLABORATORS = 5
+
+# Number of entries in the top country / top author lists
+TOP_N = 10
+
+# Largest collaborator page a client may request
+MAX_PAGE_SIZE = 1000
+
+
+def _clean(value):
+    """Convert pandas missing values to None so they serialize as null"""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def dataset_version(*paths):
+    """Cheap fingerprint of the source files (name, size and mtime)"""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def read_nodes_csv(path, chunksize=None):
+    """Read the nodes CSV, dropping rows without a valid publication year"""
+    def clean(df):
+        df['first_pubyear'] = pd.to_numeric(df['first_pubyear'], errors='coerce')
+        df = df.dropna(subset=['first_pubyear'])
+        df['first_pubyear'] = df['first_pubyear'].astype(int)
+        return df
+
+    if chunksize is None:
+        return clean(pd.read_csv(path))
+    return (clean(chunk) for chunk in pd.read_csv(path, chunksize=chunksize))
+
+
+def _country_rows(counts, country_name):
+    """Format (code, count) pairs as the dashboard's country entries"""
+    return [{'country': country_name(code), 'code': code, 'count': int(count)} for code, count in counts]
+
+
+# Fields of the /api/statistics payload, in response order
+STATISTICS_FIELDS = ('summary', 'top_countries', 'all_countries', 'top_authors',
+                     'year_distribution', 'strength_distribution')
+
+# Fields that need the filtered edge set (the expensive part of a query)
+EDGE_FIELDS = {'summary', 'top_authors', 'strength_distribution'}
+
+
+def statistics_result(country, fields, country_name, country_counts=None, total_authors=0,
+                      total_collaborations=0, unique_connections=0, top_authors=None,
+                      year_counts=None, strength_counts=None):
+    """Assemble the requested /api/statistics fields from backend aggregates"""
+    result = {}
+    if 'summary' in fields:
+        avg_collaborations = round(total_collaborations / total_authors, 1) if total_authors > 0 else 0
+        result['summary'] = {
+            'total_authors': int(total_authors),
+            'total_collaborations': int(total_collaborations),
+            'avg_collaborations': avg_collaborations,
+            'unique_connections': int(unique_connections)
+        }
+
+    # Only include country data if no country filter is applied
+    if 'top_countries' in fields:
+        result['top_countries'] = [] if country else _country_rows(country_counts[:TOP_N], country_name)
+    if 'all_countries' in fields:
+        result['all_countries'] = [] if country else _country_rows(country_counts, country_name)
+
+    if 'top_authors' in fields:
+        result['top_authors'] = top_authors
+    if 'year_distribution' in fields:
+        result['year_distribution'] = [{'year': int(k), 'count': int(v)} for k, v in year_counts]
+    if 'strength_distribution' in fields:
+        result['strength_distribution'] = [{'strength': int(k), 'count': int(v)} for k, v in strength_counts]
+
+    result['has_country_filter'] = bool(country)
+    return result
+
+
+class StringPool:
+    """Canonical string objects shared by every dataset loaded in a process.
+
+    Snapshots of the same data repeat most author names and all country
+    codes; interning them through one pool stores each distinct string once
+    however many snapshots reference it.
+    """
+
+    def __init__(self):
+        self._strings = {}
+        self._lock = threading.Lock()
+        self.references = 0
+
+    def __len__(self):
+        return len(self._strings)
+
+    def intern(self, series):
+        """Series with every string replaced by its pooled instance (missing values kept)"""
+        codes, uniques = pd.factorize(series)
+        with self._lock:
+            canonical = np.array([self._strings.setdefault(value, value) if isinstance(value, str) else value
+                                  for value in uniques] + [np.nan], dtype=object)
+            self.references += len(series)
+        # code -1 (missing) picks the trailing NaN
+        return pd.Series(canonical[codes], index=series.index, name=series.name)
+
+    def snapshot(self):
+        with self._lock:
+            return {'strings': len(self._strings), 'references': self.references}
+
+
+class PandasBackend:
+    """In-memory backend over pandas frames plus integer-coded edge arrays"""
+
+    name = 'pandas'
+
+    def __init__(self, nodes_df, edges_df, country_name=None, version=None, string_pool=None):
+        self.nodes_df = nodes_df.reset_index(drop=True)
+        self.edges_df = edges_df.reset_index(drop=True)
+        if string_pool is not None:
+            for column in ('author_name', 'country_code'):
+                self.nodes_df[column] = string_pool.intern(self.nodes_df[column])
+        self.country_name = country_name or (lambda code: code)
+        self.version = version
+        self._build_index()
+        self.structure = GraphStructure.compute(self.author_codes(), self)
+
+    def _build_index(self):
+        """Integer-code authors and build a CSR adjacency over edge ids"""
+        raw_ids = self.nodes_df['author_id']
+        first = ~raw_ids.duplicated().to_numpy()
+
+        # Author code = position among unique ids, in order of first appearance
+        self.author_rows = np.flatnonzero(first)
+        self.author_lookup = pd.Index(raw_ids.to_numpy()[first])
+        self.author_str_lookup = pd.Index(raw_ids.astype(str).to_numpy()[first])
+        self.row_codes = self.author_lookup.get_indexer(raw_ids)
+        self.num_authors = len(self.author_rows)
+
+        self.edge_src = self.author_lookup.get_indexer(self.edges_df['author1'])
+        self.edge_dst = self.author_lookup.get_indexer(self.edges_df['author2'])
+        self.edge_weight = self.edges_df['collaboration_count'].to_numpy(dtype=np.int64)
+
+        # Each edge is listed under both endpoints (self-loops once)
+        edge_ids = np.arange(len(self.edges_df))
+        both = self.edge_dst != self.edge_src
+        owners = np.concatenate([self.edge_src, self.edge_dst[both]])
+        members = np.concatenate([edge_ids, edge_ids[both]])
+        others = np.concatenate([self.edge_dst, self.edge_src[both]])
+        keep = owners >= 0
+        owners, members, others = owners[keep], members[keep], others[keep]
+        unknown = others < 0
+        weights = self.edge_weight[members]
+
+        # Per author: known collaborators first, heaviest first (ties by edge
+        # row), then edges whose other end is not in the nodes file. Rank r in
+        # an author's collaborator list is adjacency slot adj_ptr[code] + r.
+        order = np.lexsort((members, -weights, unknown, owners))
+        self.adj_edges = members[order]
+        self.adj_others = others[order]
+        self.adj_ptr = np.zeros(self.num_authors + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=self.num_authors), out=self.adj_ptr[1:])
+
+        self.author_totals = np.bincount(owners, weights=weights, minlength=self.num_authors).astype(np.int64)
+        self.author_collaborators = np.bincount(owners[~unknown], minlength=self.num_authors)
+
+        self.author_names = self.nodes_df['author_name'].to_numpy()[self.author_rows]
+        self.author_countries = self.nodes_df['country_code'].to_numpy()[self.author_rows]
+
+    def counts(self):
+        return len(self.nodes_df), len(self.edges_df)
+
+    def author_ids(self):
+        """All author ids as strings, in author-code order"""
+        return iter(self.author_str_lookup)
+
+    def author_codes(self):
+        """All author codes, sorted"""
+        return np.arange(self.num_authors)
+
+    def author_labels(self, codes):
+        """(id, name) pairs for a list of author codes"""
+        return [(str(self.author_lookup[code]), _clean(self.author_names[code])) for code in codes]
+
+    def node_chunks(self, chunk_rows):
+        """Yield (country codes, publication years) for every node row"""
+        countries = self.nodes_df['country_code'].to_numpy(dtype=object)
+        years = self.nodes_df['first_pubyear'].to_numpy(dtype=np.int64)
+        for start in range(0, len(years), chunk_rows):
+            yield countries[start:start + chunk_rows], years[start:start + chunk_rows]
+
+    def edge_chunks(self, chunk_rows):
+        """Yield (src, dst, weight, src country, dst country) for edges between known authors"""
+        for start in range(0, len(self.edge_weight), chunk_rows):
+            src = self.edge_src[start:start + chunk_rows]
+            dst = self.edge_dst[start:start + chunk_rows]
+            known = (src >= 0) & (dst >= 0)
+            src, dst = src[known], dst[known]
+            yield (src, dst, self.edge_weight[start:start + chunk_rows][known],
+                   self.author_countries[src], self.author_countries[dst])
+
+    def export_node_chunks(self, country, chunk_rows):
+        """Yield the nodes in a filter as frames of at most chunk_rows rows"""
+        columns = ['author_id', 'author_name', 'country_code', 'first_pubyear']
+        for start in range(0, len(self.nodes_df), chunk_rows):
+            chunk = self.nodes_df.iloc[start:start + chunk_rows]
+            if country:
+                chunk = chunk[chunk['country_code'] == country]
+            if len(chunk):
+                chunk = chunk[columns].copy()
+                chunk['author_id'] = chunk['author_id'].astype(str)
+                yield chunk
+
+    def export_edge_chunks(self, country, min_weight, chunk_rows):
+        """Yield edges between authors in a filter with weight >= min_weight.
+
+        A country export walks the adjacency lists of that country's authors,
+        so it touches only the subgraph rather than scanning every edge.
+        """
+        if not country:
+            for start in range(0, len(self.edge_weight), chunk_rows):
+                src = self.edge_src[start:start + chunk_rows]
+                dst = self.edge_dst[start:start + chunk_rows]
+                weight = self.edge_weight[start:start + chunk_rows]
+                keep = np.flatnonzero((src >= 0) & (dst >= 0) & (weight >= min_weight))
+                if len(keep):
+                    yield self._edge_frame(src[keep], dst[keep], weight[keep])
+            return
+
+        in_filter = np.zeros(self.num_authors + 1, dtype=bool)
+        in_filter[self.row_codes[(self.nodes_df['country_code'] == country).to_numpy()]] = True
+        codes = np.flatnonzero(in_filter[:-1])
+        degrees = self.adj_ptr[codes + 1] - self.adj_ptr[codes]
+
+        # Split the authors into batches covering roughly chunk_rows adjacency slots
+        cumulative = np.cumsum(degrees)
+        total = int(cumulative[-1]) if len(cumulative) else 0
+        cuts = np.searchsorted(cumulative, np.arange(chunk_rows, total, chunk_rows), side='right')
+        for batch, batch_degrees in zip(np.split(codes, cuts), np.split(degrees, cuts)):
+            if batch_degrees.sum() == 0:
+                continue
+            owners = np.repeat(batch, batch_degrees)
+            offsets = np.arange(batch_degrees.sum()) - np.repeat(np.cumsum(batch_degrees) - batch_degrees, batch_degrees)
+            slots = self.adj_ptr[owners] + offsets
+            edge_ids, others = self.adj_edges[slots], self.adj_others[slots]
+            # Emit each edge once, from its author1 side
+            keep = ((self.edge_src[edge_ids] == owners) & in_filter[others]
+                    & (self.edge_weight[edge_ids] >= min_weight))
+            edge_ids = edge_ids[keep]
+            if len(edge_ids):
+                yield self._edge_frame(self.edge_src[edge_ids], self.edge_dst[edge_ids], self.edge_weight[edge_ids])
+
+    def _edge_frame(self, src, dst, weight):
+        return pd.DataFrame({
+            'author1': self.author_str_lookup[src],
+            'author2': self.author_str_lookup[dst],
+            'collaboration_count': weight
+        })
+
+    def find_author(self, author_id):
+        """Return the author code for a string id, or -1"""
+        return int(self.author_str_lookup.get_indexer([author_id])[0])
+
+    def incident_edges(self, code):
+        """Edge ids touching an author, heaviest known collaborators first"""
+        return self.adj_edges[self.adj_ptr[code]:self.adj_ptr[code + 1]]
+
+    def collaborator_slice(self, code, start=0, stop=None):
+        """(other codes, weights) for collaborator ranks [start, stop)"""
+        count = self.author_collaborators[code]
+        stop = count if stop is None else min(stop, count)
+        begin = self.adj_ptr[code]
+        return (self.adj_others[begin + start:begin + stop],
+                self.edge_weight[self.adj_edges[begin + start:begin + stop]])
+
+    def filters(self):
+        return sorted(self.nodes_df['country_code'].dropna().unique().tolist())
+
+    def statistics(self, country, fields=STATISTICS_FIELDS, component=None, min_core=0):
+        nodes = self.nodes_df
+        if country:
+            row_mask = (nodes['country_code'] == country).to_numpy()
+        else:
+            row_mask = np.ones(len(nodes), dtype=bool)
+        if component is not None or min_core:
+            row_mask &= self.structure.author_mask(component, min_core)[self.row_codes]
+        parts = {'total_authors': int(row_mask.sum())}
+
+        if EDGE_FIELDS.intersection(fields):
+            in_filter = np.zeros(self.num_authors + 1, dtype=bool)
+            in_filter[self.row_codes[row_mask]] = True
+            # index -1 (missing endpoint) maps to the trailing False slot
+            edge_mask = in_filter[self.edge_src] & in_filter[self.edge_dst]
+
+            src = self.edge_src[edge_mask]
+            dst = self.edge_dst[edge_mask]
+            weight = self.edge_weight[edge_mask]
+            parts['total_collaborations'] = int(weight.sum())
+            parts['unique_connections'] = len(weight)
+
+        if not country and {'top_countries', 'all_countries'}.intersection(fields):
+            counts = nodes.loc[row_mask, 'country_code'].value_counts()
+            parts['country_counts'] = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+        if 'top_authors' in fields:
+            totals = (np.bincount(src, weights=weight, minlength=self.num_authors)
+                      + np.bincount(dst, weights=weight, minlength=self.num_authors))
+            touched = np.bincount(src, minlength=self.num_authors) + np.bincount(dst, minlength=self.num_authors)
+            candidates = np.flatnonzero(touched)
+            order = np.lexsort((candidates, -totals[candidates]))[:TOP_N]
+            parts['top_authors'] = [{
+                'id': str(self.author_lookup[code]),
+                'name': _clean(self.author_names[code]),
+                'count': int(totals[code])
+            } for code in candidates[order]]
+
+        if 'year_distribution' in fields:
+            parts['year_counts'] = nodes.loc[row_mask, 'first_pubyear'].value_counts().sort_index().items()
+        if 'strength_distribution' in fields:
+            parts['strength_counts'] = pd.Series(weight).value_counts().sort_index().items()
+
+        return statistics_result(country, fields, self.country_name, **parts)
+
+    def search_author(self, query, limit=None):
+        """Matching authors in node order, at most limit of them"""
+        nodes = self.nodes_df
+        # Literal, case-insensitive substring match (same rule as name_upper in SQLite)
+        matches = np.flatnonzero((
+            (nodes['author_id'].astype(str) == query) |
+            nodes['author_name'].str.contains(query, case=False, regex=False, na=False)
+        ).to_numpy())[:limit]
+
+        authors = []
+        for row in matches:
+            code = self.row_codes[row]
+            others, weights = self.collaborator_slice(code)
+            collab_codes, inverse = np.unique(others, return_inverse=True)
+            collab_totals = np.bincount(inverse, weights=weights, minlength=len(collab_codes))
+            order = np.lexsort((collab_codes, -collab_totals))[:SEARCH_TOP_COLLABORATORS]
+
+            authors.append({
+                'author_id': str(nodes.at[row, 'author_id']),
+                'author_name': _clean(nodes.at[row, 'author_name']),
+                'first_pubyear': int(nodes.at[row, 'first_pubyear']),
+                'country_code': _clean(nodes.at[row, 'country_code']),
+                'total_collaborations': int(self.author_totals[code]),
+                'num_collaborators': int(self.adj_ptr[code + 1] - self.adj_ptr[code]),
+                'top_collaborators': [{
+                    'id': str(self.author_lookup[collab_codes[i]]),
+                    'name': _clean(self.author_names[collab_codes[i]]),
+                    'collaboration_count': int(collab_totals[i])
+                } for i in order]
+            })
+        return authors
+
+    def author_details(self, author_id):
+        code = self.find_author(author_id)
+        if code < 0:
+            return None
+
+        others, weights = self.collaborator_slice(code)
+        profile = self._profile_header(code)
+        profile['collaborators'] = self._collaborator_rows(others, weights)
+        return profile
+
+    def collaborator_page(self, author_id, limit, cursor=0, country=None):
+        """One page of an author's collaborators, heaviest first.
+
+        The cursor is a rank in the author's weight-sorted collaborator list;
+        the first page costs O(limit) without a country filter.
+        """
+        code = self.find_author(author_id)
+        if code < 0:
+            return None
+
+        count = int(self.author_collaborators[code])
+        if country:
+            others, weights, next_cursor = self._filtered_slice(code, limit, cursor, country)
+        else:
+            others, weights = self.collaborator_slice(code, cursor, cursor + limit)
+            next_cursor = cursor + limit if cursor + limit < count else None
+
+        profile = self._profile_header(code)
+        profile['collaborators'] = self._collaborator_rows(others, weights)
+        profile['next_cursor'] = next_cursor
+        return profile
+
+    def _filtered_slice(self, code, limit, cursor, country):
+        """Scan growing windows of the sorted list for limit + 1 matches.
+
+        The extra match only tells us whether another page exists; the next
+        cursor resumes right after the last returned collaborator.
+        """
+        count = int(self.author_collaborators[code])
+        ranks = []
+        found = 0
+        window = max(limit * 4, 256)
+        position = cursor
+        while position < count and found <= limit:
+            others, _ = self.collaborator_slice(code, position, position + window)
+            hits = np.flatnonzero(self.author_countries[others] == country)[:limit + 1 - found]
+            ranks.append(hits + position)
+            found += len(hits)
+            position += len(others)
+            window *= 2
+
+        ranks = np.concatenate(ranks) if ranks else np.empty(0, dtype=np.int64)
+        next_cursor = int(ranks[limit - 1]) + 1 if len(ranks) > limit else None
+        slots = self.adj_ptr[code] + ranks[:limit]
+        return self.adj_others[slots], self.edge_weight[self.adj_edges[slots]], next_cursor
+
+    def _collaborator_rows(self, others, weights):
+        return [{
+            'id': str(self.author_lookup[other]),
+            'name': _clean(self.author_names[other]),
+            'country': _clean(self.author_countries[other]),
+            'collaboration_count': int(weight)
+        } for other, weight in zip(others, weights)]
+
+    def _profile_header(self, code):
+        row = self.author_rows[code]
+        nodes = self.nodes_df
+        return {
+            'author_id': str(nodes.at[row, 'author_id']),
+            'author_name': _clean(nodes.at[row, 'author_name']),
+            'first_pubyear': int(nodes.at[row, 'first_pubyear']),
+            'country_code': _clean(nodes.at[row, 'country_code']),
+            'total_collaborations': int(self.author_totals[code]),
+            'num_collaborators': int(self.author_collaborators[code]),
+            **self.structure.describe(code)
+        }
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE nodes (
+    author_id TEXT NOT NULL,
+    author_name TEXT,
+    name_upper TEXT,
+    country_code TEXT,
+    first_pubyear INTEGER NOT NULL
+);
+CREATE TABLE edges (
+    author1 TEXT NOT NULL,
+    author2 TEXT NOT NULL,
+    collaboration_count INTEGER NOT NULL
+);
+"""
+
+# Bumped whenever the tables or indexes below change, forcing a rebuild
+SQLITE_SCHEMA_VERSION = '3'
+
+SQLITE_INDEXES = """
+CREATE TABLE authors AS
+    SELECT author_id, MIN(rowid) AS code, 0 AS total, 0 AS num_edges, 0 AS num_collaborators,
+           0 AS component, 0 AS core
+    FROM nodes GROUP BY author_id;
+CREATE UNIQUE INDEX idx_authors_id ON authors(author_id);
+CREATE UNIQUE INDEX idx_authors_code ON authors(code);
+CREATE INDEX idx_nodes_country ON nodes(country_code, author_id);
+CREATE INDEX idx_nodes_id ON nodes(author_id);
+CREATE INDEX idx_edges_author1 ON edges(author1, author2, collaboration_count);
+CREATE INDEX idx_edges_author2 ON edges(author2, author1, collaboration_count);
+
+-- Known collaborators of each author, pre-sorted heaviest first (ties by
+-- edge row); rank is the pagination cursor
+CREATE TABLE adjacency (
+    author_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    other TEXT NOT NULL,
+    other_code INTEGER NOT NULL,
+    other_name TEXT,
+    other_country TEXT,
+    weight INTEGER NOT NULL,
+    PRIMARY KEY (author_id, rank)
+) WITHOUT ROWID;
+INSERT INTO adjacency
+    WITH incident AS (
+        SELECT author1 AS author_id, author2 AS other, collaboration_count AS w, rowid AS edge FROM edges
+        UNION ALL
+        SELECT author2, author1, collaboration_count, rowid FROM edges WHERE author1 != author2
+    )
+    SELECT incident.author_id,
+           ROW_NUMBER() OVER (PARTITION BY incident.author_id ORDER BY incident.w DESC, incident.edge) - 1,
+           incident.other, o.code, nodes.author_name, nodes.country_code, incident.w
+    FROM incident
+    JOIN authors a ON a.author_id = incident.author_id
+    JOIN authors o ON o.author_id = incident.other
+    JOIN nodes ON nodes.rowid = o.code;
+
+UPDATE authors SET
+    total = (SELECT COALESCE(SUM(collaboration_count), 0) FROM edges
+             WHERE author1 = authors.author_id OR author2 = authors.author_id),
+    num_edges = (SELECT COUNT(*) FROM edges
+                 WHERE author1 = authors.author_id OR author2 = authors.author_id),
+    num_collaborators = (SELECT COUNT(*) FROM adjacency WHERE adjacency.author_id = authors.author_id);
+ANALYZE;
+"""
+
+
+@contextmanager
+def build_lock(path):
+    """Hold an exclusive lock on {path}.lock, so one process at a time builds path.
+
+    Every gunicorn worker loads the data itself; the one that gets the lock
+    builds a stale file while the others wait and then reuse it.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def build_sqlite(nodes_path, edges_path, db_path, version=None):
+    """Stream both CSVs into an indexed SQLite file (written atomically)"""
+    version = version or dataset_version(nodes_path, edges_path)
+    # Each process builds into its own file; only finished files are swapped in
+    tmp_path = f"{db_path}.tmp{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(SQLITE_SCHEMA)
+
+        for chunk in read_nodes_csv(nodes_path, chunksize=SQLITE_CHUNK_ROWS):
+            names = chunk['author_name'].astype(object).where(chunk['author_name'].notna(), None)
+            upper = names.map(lambda name: name.upper() if isinstance(name, str) else None)
+            countries = chunk['country_code'].astype(object).where(chunk['country_code'].notna(), None)
+            conn.executemany('INSERT INTO nodes VALUES (?, ?, ?, ?, ?)', zip(
+                chunk['author_id'].astype(str), names, upper, countries,
+                chunk['first_pubyear'].astype(int).tolist()
+            ))
+
+        for chunk in pd.read_csv(edges_path, chunksize=SQLITE_CHUNK_ROWS):
+            conn.executemany('INSERT INTO edges VALUES (?, ?, ?)', zip(
+                chunk['author1'].astype(str), chunk['author2'].astype(str),
+                chunk['collaboration_count'].astype(int).tolist()
+            ))
+
+        conn.executescript(SQLITE_INDEXES)
+        conn.commit()
+
+        # Components and core numbers come from the finished edge tables
+        built = SQLiteBackend(tmp_path)
+        structure = GraphStructure.compute(built.author_codes(), built)
+        built.conn.close()
+        conn.executemany('UPDATE authors SET component = ?, core = ? WHERE code = ?', zip(
+            structure.component.tolist(), structure.core.tolist(), structure.codes.tolist()
+        ))
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        conn.execute("INSERT INTO meta VALUES ('schema', ?)", (SQLITE_SCHEMA_VERSION,))
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def sqlite_version(db_path):
+    """Return the dataset version stored in a SQLite file, or None if missing or outdated"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute('SELECT key, value FROM meta').fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if meta.get('schema') != SQLITE_SCHEMA_VERSION:
+        return None
+    return meta.get('version')
+
+
+class SQLiteBackend:
+    """On-disk backend: every query runs against an indexed SQLite file"""
+
+    name = 'sqlite'
+
+    # Filtered edge set shared by the statistics queries; the predicate is
+    # "1" (all authors) or a conjunction from _predicate()
+    FILTERED_EDGES = """
+        SELECT author1, author2, collaboration_count AS w FROM edges
+        WHERE author1 IN (SELECT author_id FROM nodes WHERE {pred})
+          AND author2 IN (SELECT author_id FROM nodes WHERE {pred})
+    """
+
+    def __init__(self, db_path, country_name=None):
+        self.db_path = str(db_path)
+        self.country_name = country_name or (lambda code: code)
+        self._local = threading.local()
+        self.version = sqlite_version(self.db_path)
+        self._structure = None
+
+    @property
+    def structure(self):
+        """Component and core arrays, read once from the authors table"""
+        if self._structure is None:
+            rows = self.conn.execute('SELECT code, component, core FROM authors ORDER BY code').fetchall()
+            codes, component, core = zip(*rows) if rows else ((), (), ())
+            self._structure = GraphStructure(codes, component, core)
+        return self._structure
+
+    @property
+    def conn(self):
+        """Read-only connection, one per thread (and per forked worker)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            conn.execute('PRAGMA query_only = ON')
+            conn.execute('PRAGMA mmap_size = 268435456')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def counts(self):
+        nodes = self.conn.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+        edges = self.conn.execute('SELECT COUNT(*) FROM edges').fetchone()[0]
+        return nodes, edges
+
+    def author_ids(self):
+        """All author ids, in author-code order"""
+        return (author_id for (author_id,) in self.conn.execute('SELECT author_id FROM authors ORDER BY code'))
+
+    def author_codes(self):
+        """All author codes (first node rowids), sorted"""
+        return np.array([code for (code,) in self.conn.execute('SELECT code FROM authors ORDER BY code')],
+                        dtype=np.int64)
+
+    def author_labels(self, codes):
+        """(id, name) pairs for a list of author codes (first node rowids)"""
+        if not codes:
+            return []
+        placeholders = ', '.join('?' * len(codes))
+        rows = self.conn.execute(
+            f'SELECT rowid, author_id, author_name FROM nodes WHERE rowid IN ({placeholders})', list(codes)
+        )
+        labels = {code: (author_id, name) for code, author_id, name in rows}
+        return [labels[code] for code in codes]
+
+    def node_chunks(self, chunk_rows):
+        """Yield (country codes, publication years) for every node row"""
+        cursor = self.conn.execute('SELECT country_code, first_pubyear FROM nodes ORDER BY rowid')
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            countries, years = zip(*rows)
+            yield np.array(countries, dtype=object), np.array(years, dtype=np.int64)
+
+    def edge_chunks(self, chunk_rows):
+        """Yield (src, dst, weight, src country, dst country) for edges between known authors"""
+        cursor = self.conn.execute("""
+            SELECT a1.code, a2.code, edges.collaboration_count, n1.country_code, n2.country_code
+            FROM edges
+            JOIN authors a1 ON a1.author_id = edges.author1
+            JOIN authors a2 ON a2.author_id = edges.author2
+            JOIN nodes n1 ON n1.rowid = a1.code
+            JOIN nodes n2 ON n2.rowid = a2.code
+            ORDER BY edges.rowid
+        """)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            src, dst, weight, src_country, dst_country = zip(*rows)
+            yield (np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(weight, dtype=np.int64),
+                   np.array(src_country, dtype=object), np.array(dst_country, dtype=object))
+
+    def _frames(self, cursor, columns, chunk_rows):
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def export_node_chunks(self, country, chunk_rows):
+        """Yield the nodes in a filter as frames of at most chunk_rows rows"""
+        pred = 'country_code = :country' if country else '1'
+        cursor = self.conn.execute(
+            f'SELECT author_id, author_name, country_code, first_pubyear FROM nodes WHERE {pred} ORDER BY rowid',
+            {'country': country}
+        )
+        return self._frames(cursor, ['author_id', 'author_name', 'country_code', 'first_pubyear'], chunk_rows)
+
+    def export_edge_chunks(self, country, min_weight, chunk_rows):
+        """Yield edges between authors in a filter with weight >= min_weight"""
+        pred = 'country_code = :country' if country else '1'
+        cursor = self.conn.execute(
+            f'SELECT * FROM ({self.FILTERED_EDGES.format(pred=pred)}) WHERE w >= :min_weight',
+            {'country': country, 'min_weight': min_weight}
+        )
+        return self._frames(cursor, ['author1', 'author2', 'collaboration_count'], chunk_rows)
+
+    def filters(self):
+        rows = self.conn.execute('SELECT DISTINCT country_code FROM nodes WHERE country_code IS NOT NULL')
+        return sorted(code for (code,) in rows)
+
+    @staticmethod
+    def _predicate(country, component=None, min_core=0):
+        """WHERE clause over nodes for a country and structure filter"""
+        preds = []
+        if country:
+            preds.append('country_code = :country')
+        if component is not None or min_core:
+            structure = ['core >= :min_core']
+            if component is not None:
+                structure.append('component = :component')
+            preds.append(f"author_id IN (SELECT author_id FROM authors WHERE {' AND '.join(structure)})")
+        return ' AND '.join(preds) or '1'
+
+    def statistics(self, country, fields=STATISTICS_FIELDS, component=None, min_core=0):
+        conn = self.conn
+        pred = self._predicate(country, component, min_core)
+        params = {'country': country, 'component': component, 'min_core': min_core}
+        filtered_edges = self.FILTERED_EDGES.format(pred=pred)
+
+        parts = {'total_authors': conn.execute(f'SELECT COUNT(*) FROM nodes WHERE {pred}', params).fetchone()[0]}
+
+        if 'summary' in fields:
+            parts['unique_connections'], parts['total_collaborations'] = conn.execute(
+                f'SELECT COUNT(*), COALESCE(SUM(w), 0) FROM ({filtered_edges})', params
+            ).fetchone()
+
+        if not country and {'top_countries', 'all_countries'}.intersection(fields):
+            parts['country_counts'] = conn.execute(f"""
+                SELECT country_code, COUNT(*) AS n FROM nodes WHERE country_code IS NOT NULL AND {pred}
+                GROUP BY country_code ORDER BY n DESC, country_code
+            """, params).fetchall()
+
+        if 'top_authors' in fields:
+            top_rows = conn.execute(f"""
+                WITH fe AS ({filtered_edges}),
+                totals AS (
+                    SELECT author, SUM(w) AS total FROM (
+                        SELECT author1 AS author, w FROM fe
+                        UNION ALL
+                        SELECT author2 AS author, w FROM fe
+                    ) GROUP BY author
+                )
+                SELECT totals.author, nodes.author_name, totals.total
+                FROM totals
+                JOIN authors ON authors.author_id = totals.author
+                JOIN nodes ON nodes.rowid = authors.code
+                ORDER BY totals.total DESC, authors.code
+                LIMIT {TOP_N}
+            """, params).fetchall()
+            parts['top_authors'] = [{'id': author, 'name': name, 'count': int(total)}
+                                    for author, name, total in top_rows]
+
+        if 'year_distribution' in fields:
+            parts['year_counts'] = conn.execute(
+                f'SELECT first_pubyear, COUNT(*) FROM nodes WHERE {pred} GROUP BY first_pubyear ORDER BY first_pubyear',
+                params
+            ).fetchall()
+        if 'strength_distribution' in fields:
+            parts['strength_counts'] = conn.execute(
+                f'SELECT w, COUNT(*) FROM ({filtered_edges}) GROUP BY w ORDER BY w', params
+            ).fetchall()
+
+        return statistics_result(country, fields, self.country_name, **parts)
+
+    def search_author(self, query, limit=None):
+        """Matching authors in node order, at most limit of them"""
+        conn = self.conn
+        rows = conn.execute("""
+            SELECT author_id, author_name, country_code, first_pubyear FROM nodes
+            WHERE author_id = ? OR instr(name_upper, ?) > 0
+            ORDER BY rowid LIMIT ?
+        """, (query, query.upper(), -1 if limit is None else limit)).fetchall()
+
+        authors = []
+        for author_id, author_name, country_code, first_pubyear in rows:
+            total, num_edges = conn.execute(
+                'SELECT total, num_edges FROM authors WHERE author_id = ?', (author_id,)
+            ).fetchone()
+            top = conn.execute(f"""
+                SELECT other, other_name, SUM(weight) AS total FROM adjacency
+                WHERE author_id = ?
+                GROUP BY other
+                ORDER BY total DESC, MIN(other_code)
+                LIMIT {SEARCH_TOP_COLLABORATORS}
+            """, (author_id,)).fetchall()
+
+            authors.append({
+                'author_id': author_id,
+                'author_name': author_name,
+                'first_pubyear': int(first_pubyear),
+                'country_code': country_code,
+                'total_collaborations': int(total),
+                'num_collaborators': int(num_edges),
+                'top_collaborators': [
+                    {'id': other, 'name': name, 'collaboration_count': int(total)} for other, name, total in top
+                ]
+            })
+        return authors
+
+    def _profile_header(self, author_id):
+        row = self.conn.execute("""
+            SELECT nodes.author_id, nodes.author_name, nodes.first_pubyear, nodes.country_code,
+                   authors.total, authors.num_collaborators, authors.code
+            FROM authors JOIN nodes ON nodes.rowid = authors.code
+            WHERE authors.author_id = ?
+        """, (author_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'author_id': row[0],
+            'author_name': row[1],
+            'first_pubyear': int(row[2]),
+            'country_code': row[3],
+            'total_collaborations': int(row[4]),
+            'num_collaborators': int(row[5]),
+            **self.structure.describe(row[6])
+        }
+
+    @staticmethod
+    def _collaborator_rows(rows):
+        return [
+            {'id': other, 'name': name, 'country': country, 'collaboration_count': int(weight)}
+            for other, name, country, weight in rows
+        ]
+
+    def author_details(self, author_id):
+        profile = self._profile_header(author_id)
+        if profile is None:
+            return None
+
+        rows = self.conn.execute("""
+            SELECT other, other_name, other_country, weight FROM adjacency
+            WHERE author_id = ? ORDER BY rank
+        """, (author_id,))
+        profile['collaborators'] = self._collaborator_rows(rows)
+        return profile
+
+    def collaborator_page(self, author_id, limit, cursor=0, country=None):
+        """One page of an author's collaborators; the cursor is a rank in adjacency"""
+        profile = self._profile_header(author_id)
+        if profile is None:
+            return None
+
+        country_pred = 'AND other_country = :country' if country else ''
+        rows = self.conn.execute(f"""
+            SELECT other, other_name, other_country, weight, rank FROM adjacency
+            WHERE author_id = :id AND rank >= :cursor {country_pred}
+            ORDER BY rank LIMIT :limit
+        """, {'id': author_id, 'cursor': cursor, 'country': country, 'limit': limit + 1}).fetchall()
+
+        if country:
+            # Resume right after the last match; a short page means the scan ended
+            next_cursor = rows[limit - 1][4] + 1 if len(rows) > limit else None
+        else:
+            next_cursor = cursor + limit if len(rows) > limit else None
+        profile['collaborators'] = self._collaborator_rows(row[:4] for row in rows[:limit])
+        profile['next_cursor'] = next_cursor
+        return profile
@@ -0,0 +1,139 @@
+"""
+Benchmark the pandas and SQLite storage backends against each other.
+
+Times the statistics, search and author endpoints on both backends and checks
+that they return identical JSON. Runs on real CSVs when given, otherwise on a
+synthetic coauthor graph.
+
+Usage:
+    python benchmarks/bench_backends.py [--nodes coauthors_nodes.csv --edges coauthors_edges.csv]
+    python benchmarks/bench_backends.py --authors 200000 --edges-per-author 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backends import STATISTICS_FIELDS, PandasBackend, SQLiteBackend, build_sqlite, read_nodes_csv
+
+COUNTRIES = ['US', 'CN', 'GB', 'DE', 'FR', 'JP', 'CA', 'IT', 'AU', 'IN', 'ES', 'KR', 'NL', 'BR', 'CH']
+FIRST_NAMES = ['Wei', 'Maria', 'John', 'Akira', 'Fatima', 'Lukas', 'Priya', 'Carlos', 'Anna', 'Chen']
+LAST_NAMES = ['Zhang', 'Smith', 'Garcia', 'Muller', 'Tanaka', 'Kumar', 'Rossi', 'Kim', 'Silva', 'Martin']
+
+
+def generate_coauthor_csvs(out_dir, num_authors, edges_per_author, seed=42):
+    """Write synthetic coauthors_nodes.csv / coauthors_edges.csv files"""
+    rng = np.random.default_rng(seed)
+    author_ids = np.arange(1_000_000, 1_000_000 + num_authors)
+
+    # Skewed country sizes, like the real data
+    country_p = 1 / np.arange(1, len(COUNTRIES) + 1)
+    country_p /= country_p.sum()
+
+    nodes = pd.DataFrame({
+        'author_id': author_ids,
+        'author_name': [f"{FIRST_NAMES[i % 10]} {LAST_NAMES[(i // 10) % 10]} {i}" for i in range(num_authors)],
+        'country_code': rng.choice(COUNTRIES, size=num_authors, p=country_p),
+        'first_pubyear': rng.integers(1980, 2024, size=num_authors),
+    })
+
+    # Preferential attachment-ish endpoints so a few hub authors exist
+    num_edges = num_authors * edges_per_author // 2
+    hub = rng.zipf(1.6, size=num_edges) % num_authors
+    other = rng.integers(0, num_authors, size=num_edges)
+    pairs = np.unique(np.sort(np.column_stack([hub, other]), axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    edges = pd.DataFrame({
+        'author1': author_ids[pairs[:, 0]],
+        'author2': author_ids[pairs[:, 1]],
+        'collaboration_count': rng.geometric(0.4, size=len(pairs)),
+    })
+
+    nodes_path = os.path.join(out_dir, 'coauthors_nodes.csv')
+    edges_path = os.path.join(out_dir, 'coauthors_edges.csv')
+    nodes.to_csv(nodes_path, index=False)
+    edges.to_csv(edges_path, index=False)
+    return nodes_path, edges_path
+
+
+def timed(func, *args, repeat=3):
+    """Return (best seconds, result) over a few runs"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', help='nodes CSV (default: synthetic)')
+    parser.add_argument('--edges', help='edges CSV (default: synthetic)')
+    parser.add_argument('--authors', type=int, default=50_000, help='synthetic author count')
+    parser.add_argument('--edges-per-author', type=int, default=6, help='synthetic average degree')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.nodes and args.edges:
+            nodes_path, edges_path = args.nodes, args.edges
+        else:
+            print(f"Generating {args.authors:,} synthetic authors...")
+            nodes_path, edges_path = generate_coauthor_csvs(tmp, args.authors, args.edges_per_author)
+
+        start = time.perf_counter()
+        pandas_backend = PandasBackend(read_nodes_csv(nodes_path), pd.read_csv(edges_path))
+        pandas_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db_path = build_sqlite(nodes_path, edges_path, os.path.join(tmp, 'coauthors.sqlite3'))
+        sqlite_backend = SQLiteBackend(db_path)
+        sqlite_load = time.perf_counter() - start
+
+        nodes, edges = pandas_backend.counts()
+        print(f"Dataset: {nodes:,} nodes, {edges:,} edges")
+        print(f"Load: pandas {pandas_load:.2f}s, sqlite build {sqlite_load:.2f}s "
+              f"({os.path.getsize(db_path) / 1e6:.1f} MB on disk)\n")
+
+        # Hub author, a median author, a common name fragment and a country filter
+        degrees = np.diff(pandas_backend.adj_ptr)
+        hub_id = str(pandas_backend.author_lookup[int(degrees.argmax())])
+        median_id = str(pandas_backend.author_lookup[int(np.argsort(degrees)[len(degrees) // 2])])
+        country = pandas_backend.filters()[0]
+        cases = [
+            ('filters', 'filters', ()),
+            ('statistics (all)', 'statistics', ('',)),
+            (f'statistics ({country})', 'statistics', (country,)),
+            ('statistics (giant, k>=3)', 'statistics', ('', STATISTICS_FIELDS, 0, 3)),
+            ('search (id)', 'search_author', (median_id,)),
+            ('search (name)', 'search_author', ('smith 12',)),
+            ('author (median)', 'author_details', (median_id,)),
+            ('author (hub)', 'author_details', (hub_id,)),
+            ('author page (hub)', 'collaborator_page', (hub_id, 50)),
+            (f'author page (hub, {country})', 'collaborator_page', (hub_id, 50, 0, country)),
+        ]
+
+        print(f"{'query':<24}{'pandas':>12}{'sqlite':>12}  identical")
+        mismatches = 0
+        for label, method, method_args in cases:
+            pandas_time, pandas_result = timed(getattr(pandas_backend, method), *method_args, repeat=args.repeat)
+            sqlite_time, sqlite_result = timed(getattr(sqlite_backend, method), *method_args, repeat=args.repeat)
+            same = json.dumps(pandas_result, sort_keys=True) == json.dumps(sqlite_result, sort_keys=True)
+            mismatches += not same
+            print(f"{label:<24}{pandas_time * 1000:>10.1f}ms{sqlite_time * 1000:>10.1f}ms  {'yes' if same else 'NO'}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
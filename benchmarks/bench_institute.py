@@ -0,0 +1,184 @@
+"""
+Benchmark the institute_backend pipeline across input sizes.
+
+For each scale, generates a synthetic institution-pair CSV (see
+generate_institutions.py) and builds the page from it: every process_data
+stage, generate_html_template and the end-to-end build are timed, with
+throughput in input rows per second. A second, memory-traced run of the same
+build records per-stage peak memory (tracemalloc) and peak RSS; each build
+runs in a fresh process so the RSS of one scale does not carry into the next.
+Results are written as JSON for regression tracking and can be compared with
+an earlier run.
+
+Usage:
+    python benchmarks/bench_institute.py --scales 10000,100000,1000000 --json bench_institute.json
+    python benchmarks/bench_institute.py --csv institutions.csv --compare bench_institute.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_institutions import generate_institution_csv
+from institute_backend import measure, peak_rss_mb, process_data
+from institute_frontend import generate_html_template
+
+COUNTRY_CODES = str(Path(__file__).resolve().parent.parent / 'country_codes.json')
+
+
+def build(csv_path, options, trace_memory):
+    """Build the page once (pipeline output silenced) and return its stage records"""
+    if trace_memory:
+        tracemalloc.start()
+    stages = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        viz_data, total = measure(partial(process_data, csv_path, COUNTRY_CODES, options['chunk_rows'],
+                                          options['workers'], stages, options['layout_iterations'],
+                                          profile=trace_memory))
+        html, stages['html'] = measure(generate_html_template, viz_data)
+    stages['end_to_end'] = {key: total[key] + stages['html'][key] for key in ('wall', 'cpu')}
+    if trace_memory:
+        stages['end_to_end']['peak_mb'] = max(total['peak_mb'], stages['html']['peak_mb'])
+        stages['end_to_end']['rss_mb'] = peak_rss_mb()
+        stages['html']['bytes'] = len(html.encode('utf-8'))
+    return stages
+
+
+def build_in_subprocess(csv_path, options, trace_memory):
+    # Executor workers (unlike multiprocessing.Pool's) may start the pipeline's own stage workers
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(build, csv_path, options, trace_memory).result()
+
+
+def bench_scale(csv_path, rows, options, repeat):
+    """Best-of-`repeat` stage times plus one memory-traced build"""
+    best = None
+    for _ in range(repeat):
+        stages = build_in_subprocess(csv_path, options, False)
+        if best is None or stages['end_to_end']['wall'] < best['end_to_end']['wall']:
+            best = stages
+    memory = build_in_subprocess(csv_path, options, True)
+
+    result = {}
+    for name, timing in best.items():
+        traced = memory.get(name, {})
+        result[name] = {
+            'wall': timing['wall'],
+            'cpu': timing['cpu'],
+            'rows_per_s': rows / timing['wall'] if timing['wall'] > 0 else None,
+            'peak_mb': traced.get('peak_mb'),
+            'rss_mb': traced.get('rss_mb'),
+            'output_rows': traced.get('rows'),
+            'output_bytes': traced.get('bytes'),
+        }
+    return result
+
+
+def print_scale(rows, result):
+    print(f"\n{rows:,} rows")
+    print(f"  {'stage':<13}{'wall s':>9}{'rows/s':>13}{'peak MB':>10}{'RSS MB':>10}")
+    for name, record in result.items():
+        peak = '-' if record['peak_mb'] is None else f"{record['peak_mb']:.1f}"
+        rss = '-' if record['rss_mb'] is None else f"{record['rss_mb']:.1f}"
+        speed = '-' if record['rows_per_s'] is None else f"{record['rows_per_s']:,.0f}"
+        print(f"  {name:<13}{record['wall']:>9.2f}{speed:>13}{peak:>10}{rss:>10}")
+
+
+def compare(results, baseline, tolerance):
+    """Print end-to-end and per-stage slowdowns against a baseline run; returns the regression count"""
+    regressions = 0
+    print(f"\nCompared with baseline (regression: more than {tolerance:.0%} slower)")
+    for scale, stages in results['scales'].items():
+        old_stages = baseline['scales'].get(scale)
+        if old_stages is None:
+            continue
+        for name, record in stages.items():
+            old = old_stages.get(name)
+            if old is None or not old['wall']:
+                continue
+            ratio = record['wall'] / old['wall']
+            # Sub-10ms stages are too noisy to flag
+            regressed = ratio > 1 + tolerance and record['wall'] > 0.01
+            regressions += regressed
+            print(f"  {int(scale):>12,} {name:<13}{old['wall']:>9.2f}s -> {record['wall']:>7.2f}s"
+                  f"  x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='10000,100000,1000000',
+                        help='comma-separated synthetic row counts (10k to 50M)')
+    parser.add_argument('--csv', help='benchmark this institution-pair CSV instead of synthetic ones')
+    parser.add_argument('--chunk-rows', type=int, help='stream the CSV in chunks of this many rows')
+    parser.add_argument('--workers', type=int, help='processes for independent stages')
+    parser.add_argument('--layout-iterations', type=int, help='force-directed layout iteration budget')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='earlier --json results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before flagging')
+    args = parser.parse_args()
+
+    options = {'chunk_rows': args.chunk_rows, 'workers': args.workers, 'layout_iterations': args.layout_iterations}
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpus': os.cpu_count(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'options': options,
+        'scales': {},
+    }
+
+    if args.csv:
+        with open(args.csv, encoding='utf-8') as f:
+            scales = [(args.csv, sum(1 for _ in f) - 1)]
+    else:
+        scales = [(None, int(scale)) for scale in args.scales.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for path, rows in scales:
+            if path is None:
+                # One synthetic file at a time, so a 50M-row run needs no room for the others
+                path = os.path.join(tmp, 'institutions.csv')
+                start = time.perf_counter()
+                generate_institution_csv(path, rows)
+                print(f"\nGenerated {rows:,} synthetic rows in {time.perf_counter() - start:.1f}s")
+            result = bench_scale(path, rows, options, args.repeat)
+            results['scales'][str(rows)] = result
+            print_scale(rows, result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.json}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
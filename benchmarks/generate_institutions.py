@@ -0,0 +1,122 @@
+"""
+Generate a synthetic institution collaboration CSV for institute_backend.
+
+The file has the columns load_and_prepare_data reads (institution_{1,2}_id,
+_name, _country, _lat, _lon, collaboration_count, authors_involved). It is
+written in chunks, so 50M-row files need no more memory than 1M-row ones.
+Institution sizes are skewed (a few hubs take part in most pairs), most
+collaborations are domestic, pairs occur in both orders and repeat across
+rows, and a small share of names, countries and coordinates is missing.
+
+Usage:
+    python benchmarks/generate_institutions.py --rows 1000000 --out institutions.csv
+    python benchmarks/generate_institutions.py --rows 50000000 --institutions 40000 --out big.csv
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ISO codes (mapped by country_codes.json) with rough centroids
+COUNTRIES = {
+    'US': (39.8, -98.6), 'CN': (35.9, 104.2), 'GB': (54.0, -2.0), 'DE': (51.2, 10.4), 'FR': (46.2, 2.2),
+    'JP': (36.2, 138.3), 'CA': (56.1, -106.3), 'IT': (41.9, 12.6), 'AU': (-25.3, 133.8), 'IN': (20.6, 79.0),
+    'ES': (40.5, -3.7), 'KR': (35.9, 127.8), 'NL': (52.1, 5.3), 'BR': (-14.2, -51.9), 'CH': (46.8, 8.2),
+}
+PREFIXES = ['University of', 'Institute of', 'National Laboratory of', 'College of', 'Academy of']
+PLACES = ['Northfield', 'Riverside', 'Lakeview', 'Eastport', 'Westbrook', 'Hillcrest', 'Fairhaven', 'Stonebridge']
+DOMESTIC_SHARE = 0.6
+MISSING_SHARE = 0.005
+
+
+def default_institutions(rows):
+    """Institution count for a file of `rows` rows: grows with the square root of the rows"""
+    return int(min(max(500, 5 * np.sqrt(rows)), 200_000))
+
+
+def make_institutions(num_institutions, rng):
+    """Institution table: id, name, country code, lat, lon"""
+    codes = np.array(list(COUNTRIES))
+    # Skewed country sizes, like the real data
+    country_p = 1 / np.arange(1, len(codes) + 1)
+    country_p /= country_p.sum()
+    country = rng.choice(len(codes), size=num_institutions, p=country_p)
+    centroid = np.array(list(COUNTRIES.values()))[country]
+
+    return pd.DataFrame({
+        'id': np.arange(100_000, 100_000 + num_institutions),
+        'name': [f"{PREFIXES[i % 5]} {PLACES[(i // 5) % 8]} {i}" for i in range(num_institutions)],
+        'country': codes[country],
+        'lat': np.clip(centroid[:, 0] + rng.normal(0, 4, num_institutions), -90, 90).round(4),
+        'lon': ((centroid[:, 1] + rng.normal(0, 6, num_institutions) + 180) % 360 - 180).round(4),
+    })
+
+
+def make_chunk(institutions, by_country, rows, rng):
+    """One chunk of institution-pair rows"""
+    n = len(institutions)
+    # Zipf-distributed first endpoints make hub institutions
+    first = (rng.zipf(1.5, size=rows) - 1) % n
+    second = rng.integers(0, n, size=rows)
+
+    # Most partners come from the same country
+    domestic = rng.random(rows) < DOMESTIC_SHARE
+    country = institutions['country'].to_numpy()[first[domestic]]
+    for code, members in by_country.items():
+        rows_here = np.flatnonzero(country == code)
+        second[np.flatnonzero(domestic)[rows_here]] = members[rng.integers(0, len(members), size=len(rows_here))]
+
+    keep = first != second
+    first, second = first[keep], second[keep]
+    # Either institution may be listed first
+    swap = rng.random(len(first)) < 0.5
+    first, second = np.where(swap, second, first), np.where(swap, first, second)
+
+    chunk = {}
+    for side, index in ((1, first), (2, second)):
+        for field in ('id', 'name', 'country', 'lat', 'lon'):
+            chunk[f'institution_{side}_{field}'] = institutions[field].to_numpy()[index]
+    collaborations = rng.geometric(0.3, size=len(first))
+    chunk['collaboration_count'] = collaborations
+    chunk['authors_involved'] = collaborations + rng.geometric(0.5, size=len(first)) - 1
+    chunk = pd.DataFrame(chunk)
+
+    # Sparse gaps the backend fills in
+    for column in ('institution_1_name', 'institution_2_country', 'institution_2_lat'):
+        chunk.loc[rng.random(len(chunk)) < MISSING_SHARE, column] = None
+    return chunk
+
+
+def generate_institution_csv(path, rows, num_institutions=None, seed=42, chunk_rows=1_000_000):
+    """Write `rows` synthetic institution-pair rows to path and return the row count"""
+    rng = np.random.default_rng(seed)
+    institutions = make_institutions(num_institutions or default_institutions(rows), rng)
+    by_country = {code: np.flatnonzero(institutions['country'].to_numpy() == code) for code in COUNTRIES}
+    by_country = {code: members for code, members in by_country.items() if len(members)}
+
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows:
+            chunk = make_chunk(institutions, by_country, min(chunk_rows, rows - written), rng)
+            chunk.to_csv(f, header=written == 0, index=False)
+            written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='row count')
+    parser.add_argument('--institutions', type=int, help='institution count (default: grows with --rows)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='institutions.csv')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = generate_institution_csv(args.out, args.rows, args.institutions, args.seed)
+    print(f"Wrote {rows:,} rows to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
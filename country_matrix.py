@@ -0,0 +1,62 @@
+"""
+Author-level country x country collaboration matrix.
+
+Every edge's endpoint countries are integer-coded and the summed
+collaboration_count is scatter-added into a dense symmetric matrix in one
+vectorized pass over the backend's edge stream. Each row's partners are
+argsorted once at build time, so top-partner queries just slice a row.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CountryMatrix:
+    """Dense symmetric matrix of summed collaboration counts between countries.
+
+    matrix[i, j] (i != j) is the total collaboration_count of edges between
+    authors from countries i and j; matrix[i, i] counts domestic edges once.
+    """
+
+    def __init__(self, backend, chunk_rows=5_000_000):
+        self.codes = list(backend.filters())
+        self.index = pd.Index(self.codes)
+        size = len(self.codes)
+
+        flat = np.zeros(size * size, dtype=np.int64)
+        for _, _, weight, src_country, dst_country in backend.edge_chunks(chunk_rows):
+            i = self.index.get_indexer(src_country)
+            j = self.index.get_indexer(dst_country)
+            known = (i >= 0) & (j >= 0)
+            i, j, weight = i[known], j[known], weight[known]
+            # Both orientations in one scatter-add; domestic edges only once
+            cross = i != j
+            rows = np.concatenate([i, j[cross]])
+            cols = np.concatenate([j, i[cross]])
+            flat += np.bincount(rows * size + cols, weights=np.concatenate([weight, weight[cross]]),
+                                minlength=size * size).astype(np.int64)
+        self.matrix = flat.reshape(size, size)
+
+        # Partners of each country, heaviest first, with the country itself excluded
+        partners = self.matrix.astype(np.float64)
+        np.fill_diagonal(partners, -1)
+        self.partner_order = np.argsort(-partners, axis=1, kind='stable')[:, :max(size - 1, 0)]
+        self.partner_counts = np.count_nonzero(partners > 0, axis=1)
+
+    def position(self, code):
+        """Row of a country code, or -1"""
+        return int(self.index.get_indexer([code])[0])
+
+    def top_partners(self, code, limit):
+        """[(partner code, count)] for the heaviest `limit` partners of a country"""
+        row = self.position(code)
+        if row < 0:
+            return None
+        count = min(limit, int(self.partner_counts[row]))
+        return [(self.codes[col], int(self.matrix[row, col])) for col in self.partner_order[row, :count]]
+
+    def totals(self, code):
+        """(domestic, international) collaboration totals for a country"""
+        row = self.position(code)
+        domestic = int(self.matrix[row, row])
+        return domestic, int(self.matrix[row].sum()) - domestic
@@ -0,0 +1,132 @@
+"""
+Streaming export of a filtered coauthor subgraph.
+
+Nodes and edges are pulled from the backend in bounded chunks and serialized
+one chunk at a time, so the response is produced incrementally and a worker
+never holds more than one chunk of the subset in memory, however large the
+export is.
+
+Formats:
+  * csv     - one part (nodes or edges) per file, header on the first chunk
+  * ndjson  - one JSON object per line, nodes then edges, tagged with "type"
+  * parquet - one part per file, one row group per chunk (requires pyarrow)
+"""
+
+import io
+import json
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+EXPORT_PARTS = ('nodes', 'edges', 'all')
+
+
+class ExportError(ValueError):
+    """An export request that cannot be served, with its HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _chunks(backend, part, country, min_weight, chunk_rows):
+    """Yield (part name, frame) for each chunk of the requested parts"""
+    if part in ('nodes', 'all'):
+        for frame in backend.export_node_chunks(country, chunk_rows):
+            yield 'node', frame
+    if part in ('edges', 'all'):
+        for frame in backend.export_edge_chunks(country, min_weight, chunk_rows):
+            yield 'edge', frame
+
+
+def _csv(chunks):
+    header = True
+    for _, frame in chunks:
+        yield frame.to_csv(index=False, header=header)
+        header = False
+
+
+def _ndjson(chunks):
+    for kind, frame in chunks:
+        records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+        yield ''.join(json.dumps(dict(type=kind, **record), default=int) + '\n' for record in records)
+
+
+class _DrainingSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain.
+
+    tell() keeps counting across drains, so the offsets pyarrow records in the
+    parquet footer stay correct.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data, self._parts = b''.join(self._parts), []
+        return data
+
+
+def _parquet(chunks, part):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if part == 'nodes':
+        schema = pa.schema([('author_id', pa.string()), ('author_name', pa.string()),
+                            ('country_code', pa.string()), ('first_pubyear', pa.int64())])
+    else:
+        schema = pa.schema([('author1', pa.string()), ('author2', pa.string()),
+                            ('collaboration_count', pa.int64())])
+
+    # Each row group is flushed to the response as soon as it is written
+    sink = _DrainingSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for _, frame in chunks:
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(backend, country, min_weight, fmt, part=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Return (generator of body chunks, mimetype, filename) for an export.
+
+    Raises ExportError for an invalid combination of options.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    part = part or ('all' if fmt == 'ndjson' else 'edges')
+    if part not in EXPORT_PARTS:
+        raise ExportError(f"part must be one of: {', '.join(EXPORT_PARTS)}")
+    if part == 'all' and fmt != 'ndjson':
+        raise ExportError(f"{fmt} exports one part at a time; use part=nodes or part=edges")
+
+    chunks = _chunks(backend, part, country, min_weight, chunk_rows)
+    if fmt == 'csv':
+        body = _csv(chunks)
+    elif fmt == 'ndjson':
+        body = _ndjson(chunks)
+    else:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportError("parquet export requires pyarrow", status=501)
+        body = _parquet(chunks, part)
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    return body, mimetype, f"coauthors_{country or 'all'}_{part}.{extension}"
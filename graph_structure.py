@@ -0,0 +1,215 @@
+"""
+Structure of the coauthor graph: connected components and k-core numbers.
+
+Both are computed with vectorized passes over integer edge arrays:
+
+  * components by union-find done as vectorized hook-and-compress rounds,
+    each round hooking the larger root of every edge under the smaller one
+    and then path-compressing with pointer jumping
+  * core numbers by Batagelj-Zaversnik peeling over a bucket queue of
+    authors by degree: all authors with degree <= k are removed at once,
+    only the neighbors whose degree dropped are re-examined (and re-queued
+    under their new degree), and k rises to the next non-empty bucket when
+    nothing is left to peel. Each author and edge is handled a bounded number
+    of times, so apart from sorting each re-queued batch by degree this is
+    linear in the graph's size
+
+Components are numbered by size, largest first, so component 0 is the giant
+component. Authors without collaborators are singleton components with core 0.
+"""
+
+import numpy as np
+
+# Edge rows pulled from the backend per streaming step
+GRAPH_CHUNK_ROWS = 1_000_000
+
+
+class CoauthorGraph:
+    """Simple undirected weighted graph in CSR form over dense author indices.
+
+    codes[i] is the backend author code of index i (sorted, so index order is
+    the backend's author order). Repeated pairs are merged by summing their
+    counts and self-loops are dropped.
+    """
+
+    def __init__(self, backend, chunk_rows=GRAPH_CHUNK_ROWS):
+        src, dst, weight = [], [], []
+        for s, d, w, _, _ in backend.edge_chunks(chunk_rows):
+            keep = s != d
+            src.append(s[keep])
+            dst.append(d[keep])
+            weight.append(w[keep])
+        src = np.concatenate(src) if src else np.empty(0, dtype=np.int64)
+        dst = np.concatenate(dst) if dst else np.empty(0, dtype=np.int64)
+        weight = np.concatenate(weight) if weight else np.empty(0, dtype=np.int64)
+
+        self.codes, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        n = len(self.codes)
+        rows = np.concatenate([inverse[:len(src)], inverse[len(src):]])
+        cols = np.concatenate([inverse[len(src):], inverse[:len(src)]])
+        weights = np.concatenate([weight, weight])
+
+        # Merge repeated (row, col) pairs, leaving entries sorted by row then col
+        keys, merged = np.unique(rows * n + cols, return_inverse=True)
+        self.data = np.bincount(merged, weights=weights, minlength=len(keys)).astype(np.int64)
+        self.indices = keys % n
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=self.indptr[1:])
+        self.degree = np.diff(self.indptr)
+
+    def __len__(self):
+        return len(self.codes)
+
+
+def adjacency_slots(indptr, owners, counts):
+    """Adjacency slots of each owner, repeated owner by owner"""
+    total = int(counts.sum())
+    starts = np.repeat(indptr[owners] - (np.cumsum(counts) - counts), counts)
+    return starts + np.arange(total)
+
+
+def connected_components(graph):
+    """Root index (smallest member) of each graph index's component"""
+    n = len(graph)
+    src = np.repeat(np.arange(n), graph.degree)
+    dst = graph.indices
+    one_way = src < dst
+    src, dst = src[one_way], dst[one_way]
+
+    parent = np.arange(n)
+    while True:
+        a, b = parent[src], parent[dst]
+        differ = a != b
+        if not differ.any():
+            return parent
+        # Hook the larger root under the smallest root it touches
+        np.minimum.at(parent, np.maximum(a[differ], b[differ]), np.minimum(a[differ], b[differ]))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        # Keep only edges that still span two components
+        src, dst = src[differ], dst[differ]
+
+
+def by_degree(indices, degree):
+    """Split indices into (degree, indices with that degree) groups"""
+    if not len(indices):
+        return
+    order = np.argsort(degree, kind='stable')
+    degree = degree[order]
+    bounds = np.flatnonzero(np.r_[True, degree[1:] != degree[:-1], True])
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        yield int(degree[start]), indices[order[start:stop]]
+
+
+def core_numbers(graph):
+    """k-core number of each graph index"""
+    n = len(graph)
+    degree = graph.degree.copy()
+    core = np.zeros(n, dtype=np.int64)
+    removed = np.zeros(n, dtype=bool)
+    slot = np.empty(n, dtype=np.int64)
+
+    # buckets[d] holds batches of indices queued with degree d; an index whose
+    # degree dropped since is queued again, so stale entries are skipped
+    buckets = [[] for _ in range(int(degree.max(initial=0)) + 1)]
+    for d, batch in by_degree(np.arange(n), degree):
+        buckets[d].append(batch)
+
+    k = 0
+    frontier = np.empty(0, dtype=np.int64)
+    while True:
+        while not len(frontier):
+            if k == len(buckets):
+                return core
+            if buckets[k]:
+                queued = np.concatenate(buckets[k])
+                buckets[k] = []
+                frontier = queued[~removed[queued] & (degree[queued] == k)]
+            if not len(frontier):
+                k += 1
+        core[frontier] = k
+        removed[frontier] = True
+
+        neighbors = graph.indices[adjacency_slots(graph.indptr, frontier, graph.degree[frontier])]
+        touched = neighbors[~removed[neighbors]]
+        np.subtract.at(degree, touched, 1)
+        # Deduplicate in linear time: keep the last occurrence of each index
+        slot[touched] = np.arange(len(touched))
+        touched = touched[slot[touched] == np.arange(len(touched))]
+
+        peel = degree[touched] <= k
+        frontier = touched[peel]
+        for d, batch in by_degree(touched[~peel], degree[touched[~peel]]):
+            buckets[d].append(batch)
+
+
+class GraphStructure:
+    """Per-author component id and core number, aligned with sorted author codes"""
+
+    def __init__(self, codes, component, core):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.component = np.asarray(component, dtype=np.int64)
+        self.core = np.asarray(core, dtype=np.int64)
+        self.component_sizes = np.bincount(self.component)
+
+    @classmethod
+    def compute(cls, author_codes, backend, chunk_rows=GRAPH_CHUNK_ROWS):
+        """Build from a backend's edge stream; author_codes lists every author, sorted"""
+        codes = np.asarray(author_codes, dtype=np.int64)
+        graph = CoauthorGraph(backend, chunk_rows)
+        positions = np.searchsorted(codes, graph.codes)
+
+        # Authors outside the graph are their own components
+        roots = np.arange(len(codes))
+        roots[positions] = positions[connected_components(graph)]
+        core = np.zeros(len(codes), dtype=np.int64)
+        core[positions] = core_numbers(graph)
+
+        # Renumber components by size (largest first, ties by smallest member)
+        uniques, inverse, sizes = np.unique(roots, return_inverse=True, return_counts=True)
+        rank = np.empty(len(uniques), dtype=np.int64)
+        rank[np.lexsort((uniques, -sizes))] = np.arange(len(uniques))
+        return cls(codes, rank[inverse], core)
+
+    def position(self, code):
+        return int(np.searchsorted(self.codes, code))
+
+    def describe(self, code):
+        """Profile fields for one author code"""
+        i = self.position(code)
+        component = int(self.component[i])
+        return {
+            'component_id': component,
+            'component_size': int(self.component_sizes[component]),
+            'core_number': int(self.core[i])
+        }
+
+    def author_mask(self, component=None, min_core=0):
+        """Boolean mask over positions for authors passing a structure filter"""
+        mask = self.core >= min_core
+        if component is not None:
+            mask &= self.component == component
+        return mask
+
+    def summary(self):
+        """Component size distribution and core histogram"""
+        num_authors = len(self.codes)
+        sizes, size_counts = np.unique(self.component_sizes, return_counts=True)
+        cores, core_counts = np.unique(self.core, return_counts=True)
+        giant = int(self.component_sizes[0]) if num_authors else 0
+        return {
+            'num_authors': num_authors,
+            'num_components': len(self.component_sizes),
+            'giant_component': {
+                'size': giant,
+                'share': round(giant / num_authors, 4) if num_authors else 0
+            },
+            'isolated_authors': int(np.count_nonzero(self.component_sizes == 1)),
+            'max_core': int(cores[-1]) if len(cores) else 0,
+            'component_sizes': [{'size': int(size), 'count': int(count)}
+                                for size, count in zip(sizes[::-1], size_counts[::-1])],
+            'core_histogram': [{'core': int(core), 'count': int(count)} for core, count in zip(cores, core_counts)]
+        }
@@ -3,14 +3,35 @@ Institutional Collaboration Network - Backend Data Processing
 Contains all data loading, processing, and preparation logic.
 """
 
-import pandas as pd
-import numpy as np
+import argparse
+import hashlib
+import inspect
 import json
-from collections import defaultdict
-import sys
+import multiprocessing
 import os
 import shutil
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+
+import numpy as np
+import pandas as pd
+
 from institute_frontend import generate_html_template
+from institute_layout import (force_atlas2, load_layout, normalize_positions, save_layout, warm_iterations,
+                              warm_start)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Worker processes for independent build stages (at most three run at once)
+STAGE_WORKERS = 3
+
 def load_country_codes(json_path):
     """Load country code to full name mapping from JSON file."""
     try:
@@ -25,37 +46,37 @@ def load_country_codes(json_path):
         print(f"  Warning: Invalid JSON in {json_path}")
         return {}
 
-def map_country_codes(df, country_mapping):
+def map_country_codes(df, country_mapping, verbose=True):
     """Map 2-digit country codes to full names."""
     if not country_mapping:
         print("  No country mapping available, using original codes")
         return df
     
-    # Map institution_1_country
-    df['institution_1_country'] = df['institution_1_country'].apply(
-        lambda code: country_mapping.get(str(code).upper(), code) if pd.notna(code) else 'Unknown'
-    )
-    
-    # Map institution_2_country
-    df['institution_2_country'] = df['institution_2_country'].apply(
-        lambda code: country_mapping.get(str(code).upper(), code) if pd.notna(code) else 'Unknown'
-    )
+    # Look up each distinct code once; missing codes (-1) become 'Unknown'
+    for column in ('institution_1_country', 'institution_2_country'):
+        codes, uniques = pd.factorize(df[column])
+        names = [country_mapping.get(str(code).upper(), code) for code in uniques]
+        df[column] = np.array(names + ['Unknown'], dtype=object)[codes]
     
-    print(f"  Mapped country codes to full names")
+    if verbose:
+        print(f"  Mapped country codes to full names")
     return df
 
 def load_and_prepare_data(csv_path, country_mapping=None):
     """Load CSV with vectorized operations."""
     print("  Reading CSV...")
     df = pd.read_csv(csv_path, low_memory=False)
-    
+    return encode_pairs(prepare_frame(df, country_mapping))
+
+def prepare_frame(df, country_mapping=None, verbose=True):
+    """Fill missing values, map countries and normalize count types."""
     # Fill NaN values
     df['institution_1_country'] = df['institution_1_country'].fillna('Unknown')
     df['institution_2_country'] = df['institution_2_country'].fillna('Unknown')
     
     # Map country codes to full names if mapping provided
     if country_mapping:
-        df = map_country_codes(df, country_mapping)
+        df = map_country_codes(df, country_mapping, verbose)
     
     df['institution_1_name'] = df['institution_1_name'].fillna('Unknown')
     df['institution_2_name'] = df['institution_2_name'].fillna('Unknown')
@@ -65,58 +86,117 @@ def load_and_prepare_data(csv_path, country_mapping=None):
     df['institution_2_lon'] = df['institution_2_lon'].fillna(0)
     df['collaboration_count'] = df['collaboration_count'].fillna(0).astype(int)
     df['authors_involved'] = df['authors_involved'].fillna(0).astype(int)
-    df['institution_1_id'] = df['institution_1_id'].astype(str)
-    df['institution_2_id'] = df['institution_2_id'].astype(str)
     
     return df
 
-def build_institution_data(df):
-    """Build institution metadata using vectorized ops."""
-    print("  Building institution metadata...")
+# Encoded columns: (field, compare as str like the ids' astype(str), sort the labels)
+ENCODED_FIELDS = (('id', True, True), ('name', False, False), ('country', False, True))
+
+def factorize_labels(values, as_str=False, sort=False):
+    """(codes, labels) with labels[codes] == values.
     
-    # Stack both institution columns
-    inst1 = df[['institution_1_id', 'institution_1_name', 'institution_1_country', 
-                'institution_1_lat', 'institution_1_lon']].copy()
-    inst1.columns = ['id', 'name', 'country', 'lat', 'lon']
+    as_str labels values by str() (so 1 and '1' share a code); sort orders the
+    labels, so comparing codes compares the labels.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    if not (as_str or sort):
+        return codes, np.asarray(uniques, dtype=object)
+    labels = pd.Series(np.asarray(uniques, dtype=object))
+    if as_str:
+        labels = labels.astype(str)
+    remap, labels = pd.factorize(labels, sort=sort)
+    return remap[codes], np.asarray(labels, dtype=object)
+
+class EncodedPairs:
+    """Prepared institution pairs with ids, names and countries as integer codes.
     
-    inst2 = df[['institution_2_id', 'institution_2_name', 'institution_2_country',
-                'institution_2_lat', 'institution_2_lon']].copy()
-    inst2.columns = ['id', 'name', 'country', 'lat', 'lon']
+    frame has the CSV's columns, but institution_{1,2}_{id,name,country} hold
+    int32 codes into the ids, names and countries label arrays. ids and
+    countries are sorted, so grouping or comparing codes orders rows like the
+    labels; labels are only looked up for the final output.
+    """
     
-    all_inst = pd.concat([inst1, inst2], ignore_index=True)
+    def __init__(self, frame, ids, names, countries):
+        self.frame = frame
+        self.ids = ids
+        self.names = names
+        self.countries = countries
     
-    # Get unique institutions (first occurrence for metadata)
-    institutions = all_inst.drop_duplicates(subset='id').set_index('id')
+    def __len__(self):
+        return len(self.frame)
+
+def encode_pairs(df):
+    """Replace the id, name and country columns of a prepared frame by shared codes."""
+    labels = {}
+    for field, as_str, sort in ENCODED_FIELDS:
+        first, second = f'institution_1_{field}', f'institution_2_{field}'
+        codes, labels[field] = factorize_labels(pd.concat([df[first], df[second]], ignore_index=True), as_str, sort)
+        df[first] = codes[:len(df)].astype(np.int32)
+        df[second] = codes[len(df):].astype(np.int32)
+    return EncodedPairs(df, labels['id'], labels['name'], labels['country'])
+
+def unique_pairs(first, second, n):
+    """Sorted distinct unordered code pairs as (low, high), with the index of each input row's pair.
     
-    # Compute degree (number of unique partners) for each institution
-    partners1 = df.groupby('institution_1_id')['institution_2_id'].nunique()
-    partners2 = df.groupby('institution_2_id')['institution_1_id'].nunique()
-    degree = partners1.add(partners2, fill_value=0).astype(int)
+    A-B and B-A rows are the same collaboration, so both map to (min, max).
+    """
+    low, high = np.minimum(first, second).astype(np.int64), np.maximum(first, second)
+    keys, pair = np.unique(low * n + high, return_inverse=True)
+    return keys // n, keys % n, pair
+
+def institution_frame(data, code, name, country, lat, lon, source, target, weight):
+    """Institution table from first-seen codes and the canonical (deduplicated) edge list."""
+    n = len(data.ids)
+    # Degree counts distinct partners, strength sums incident edge weights; a
+    # self-pair (both sides the same institution) counts once in strength only
+    other = source != target
+    degree = np.bincount(source[other], minlength=n) + np.bincount(target[other], minlength=n)
+    strength = (np.bincount(source, weights=weight, minlength=n) +
+                np.bincount(target[other], weights=weight[other], minlength=n)).astype(np.int64)
+    return pd.DataFrame({
+        'id': data.ids[code],
+        'name': data.names[name],
+        'country': data.countries[country],
+        'lat': lat,
+        'lon': lon,
+        'degree': degree[code],
+        'strength': strength[code],
+        'code': code
+    })
+
+def canonical_edges(data):
+    """Canonical (source <= target) pairs with their summed collaborations and authors."""
+    df = data.frame
+    source, target, pair = unique_pairs(df['institution_1_id'].to_numpy(), df['institution_2_id'].to_numpy(),
+                                        len(data.ids))
+    weight = np.bincount(pair, weights=df['collaboration_count'], minlength=len(source)).astype(np.int64)
+    authors = np.bincount(pair, weights=df['authors_involved'], minlength=len(source)).astype(np.int64)
+    return source, target, weight, authors
+
+def build_institution_data(data, edges):
+    """Build institution metadata using vectorized ops; degree and strength come from the edge list."""
+    print("  Building institution metadata...")
+    df = data.frame
+    rows = len(df)
     
-    # Compute strength (total collaboration count)
-    strength1 = df.groupby('institution_1_id')['collaboration_count'].sum()
-    strength2 = df.groupby('institution_2_id')['collaboration_count'].sum()
-    strength = strength1.add(strength2, fill_value=0).astype(int)
+    # First occurrence of each institution, institution_1 rows before institution_2 rows
+    stacked = np.concatenate([df['institution_1_id'].to_numpy(), df['institution_2_id'].to_numpy()])
+    _, first = np.unique(stacked, return_index=True)
+    first.sort()
+    side1 = first < rows
+    row = np.where(side1, first, first - rows)
     
-    institutions['degree'] = degree
-    institutions['strength'] = strength
-    institutions = institutions.fillna({'degree': 0, 'strength': 0})
+    def column(field):
+        return np.where(side1, df[f'institution_1_{field}'].to_numpy()[row], df[f'institution_2_{field}'].to_numpy()[row])
     
-    return institutions.reset_index()
+    return institution_frame(data, column('id'), column('name'), column('country'), column('lat'), column('lon'),
+                             edges['source'].to_numpy(), edges['target'].to_numpy(), edges['weight'].to_numpy())
 
-def build_edges(df):
-    """Build edge list with aggregation."""
+def build_edges(data):
+    """Build the undirected edge list, merging A-B and B-A rows."""
     print("  Building edges...")
-    
-    # Aggregate edges (in case of duplicates)
-    edges = df.groupby(['institution_1_id', 'institution_2_id']).agg({
-        'collaboration_count': 'sum',
-        'authors_involved': 'sum'
-    }).reset_index()
-    
-    edges.columns = ['source', 'target', 'weight', 'authors']
-    
-    return edges
+    source, target, weight, authors = canonical_edges(data)
+    return pd.DataFrame({'source': source, 'target': target, 'weight': weight, 'authors': authors})
 
 def compute_layout_fast(institutions):
     """Pre-compute layout positions using geographic coords + noise."""
@@ -138,50 +218,548 @@ def compute_layout_fast(institutions):
     
     return institutions
 
-def compute_country_aggregation(df):
+def compute_layout(institutions, edges, iterations=None, cache_path=None, seconds=None):
+    """Force-directed (ForceAtlas2) layout, seeded with the geographic positions.
+    
+    With cache_path, raw positions are kept there keyed by institution id: the
+    next run starts from them and only relaxes new or changed institutions.
+    The raw positions are also returned, as raw_x/raw_y. With seconds, the
+    layout stops after that much wall time even if iterations remain.
+    """
+    institutions = compute_layout_fast(institutions)
+    print("  Running force-directed layout...")
+    
+    # Edges reference institutions by code; the layout works on row positions
+    codes = institutions['code'].to_numpy()
+    source, target = edges['source'].to_numpy(), edges['target'].to_numpy()
+    node_idx = np.full(max(codes.max(initial=-1), source.max(initial=-1), target.max(initial=-1)) + 1, -1)
+    node_idx[codes] = np.arange(len(codes))
+    source, target = node_idx[source], node_idx[target]
+    known = (source >= 0) & (target >= 0) & (source != target)
+    source, target, weight = source[known], target[known], edges['weight'].to_numpy()[known]
+    
+    # Start at roughly the scale ForceAtlas2 settles at, so the budget goes into the structure
+    seed = institutions[['x', 'y']].to_numpy() * np.sqrt(len(institutions))
+    ids = institutions['id'].astype(str).to_numpy()
+    degree, strength = institutions['degree'].to_numpy(), institutions['strength'].to_numpy()
+    movable = None
+    cached = load_layout(cache_path)
+    if cached is not None:
+        seed, movable = warm_start(ids, seed, degree, strength, source, target, cached)
+        print(f"  Warm start: {movable.sum():,} of {len(movable):,} institutions new or changed")
+        # A cache that barely matches (say, ids from another dataset) gets a cold run's budget
+        iterations = iterations or warm_iterations(movable)
+    
+    options = {'iterations': iterations} if iterations else {}
+    pos = force_atlas2(seed, degree + 1, source, target, weight, seconds=seconds, movable=movable, **options)
+    if cache_path:
+        save_layout(cache_path, ids, pos, degree, strength)
+    
+    institutions['raw_x'] = pos[:, 0]
+    institutions['raw_y'] = pos[:, 1]
+    pos = normalize_positions(pos)
+    institutions['x'] = pos[:, 0]
+    institutions['y'] = pos[:, 1]
+    return institutions
+
+def country_records(countries, first, second, weight, sides, counts):
+    """Country nodes and edges from code-level aggregates.
+    
+    first/second/weight are international country pairs in either order (repeats
+    are summed); sides holds per-side mean lat/lon frames indexed by country
+    code and counts the per-side row counts per code.
+    """
+    n = len(countries)
+    low, high, pair = unique_pairs(np.minimum(first, second), np.maximum(first, second), n)
+    country_edges = pd.DataFrame({
+        'source': countries[low],
+        'target': countries[high],
+        'weight': np.bincount(pair, weights=weight, minlength=len(low)).astype(np.int64)
+    })
+    
+    # Centroid: mean of the per-side means; institution count from the institution_1 side when present
+    geo = pd.concat(sides).groupby(level=0).mean()
+    code = geo.index.to_numpy()
+    country_geo = pd.DataFrame({
+        'country': countries[code],
+        'lat': geo['lat'].to_numpy(),
+        'lon': geo['lon'].to_numpy(),
+        'inst_count': np.where(counts[0] > 0, counts[0], counts[1])[code]
+    })
+    
+    return country_geo.to_dict('records'), country_edges.to_dict('records')
+
+def compute_country_aggregation(data):
     """Aggregate at country level."""
     print("  Computing country aggregation...")
+    df = data.frame
     
     # Filter to international collaborations only
-    intl = df[df['institution_1_country'] != df['institution_2_country']].copy()
+    first, second = df['institution_1_country'].to_numpy(), df['institution_2_country'].to_numpy()
+    intl = first != second
     
-    if len(intl) == 0:
+    if not intl.any():
         return [], []
     
-    # Create sorted country pair keys
-    intl['c1'] = intl[['institution_1_country', 'institution_2_country']].min(axis=1)
-    intl['c2'] = intl[['institution_1_country', 'institution_2_country']].max(axis=1)
+    # Country centroids and row counts per side
+    sides, counts = [], []
+    for side in (1, 2):
+        prefix = f'institution_{side}_'
+        geo = df.groupby(prefix + 'country')[[prefix + 'lat', prefix + 'lon']].mean()
+        sides.append(geo.set_axis(['lat', 'lon'], axis=1))
+        counts.append(np.bincount(df[prefix + 'country'], minlength=len(data.countries)))
+    
+    return country_records(data.countries, first[intl], second[intl], df['collaboration_count'].to_numpy()[intl],
+                           sides, counts)
+
+# Partial aggregates buffered before they are merged into the running totals
+COMPACT_ROWS = 1_000_000
+
+class GroupSum:
+    """Running groupby-sum over partial results, merged once enough are buffered.
+
+    Memory is bounded by the number of distinct keys, not the number of rows fed in.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.pending = 0
+        self.size = 0
+
+    def add(self, partial):
+        self.parts.append(partial)
+        self.pending += len(partial)
+        if self.pending > max(self.size, COMPACT_ROWS):
+            self.compact()
+
+    def compact(self):
+        if self.parts:
+            combined = pd.concat(self.parts)
+            merged = combined.groupby(level=list(range(combined.index.nlevels))).sum()
+            self.parts = [merged]
+            self.size = len(merged)
+            self.pending = 0
+
+    def result(self):
+        self.compact()
+        return self.parts[0] if self.parts else None
+
+class FirstSeen:
+    """Metadata of each institution at its first occurrence, in build_institution_data's order."""
+
+    # Sort key offset for the institution_2 side, which comes after every institution_1 row
+    SIDE_2 = 2 ** 62
+
+    def __init__(self):
+        self.parts = []
+        self.pending = 0
+        self.size = 0
+
+    def add(self, frame):
+        self.parts.append(frame.drop_duplicates(subset='id'))
+        self.pending += len(self.parts[-1])
+        if self.pending > max(self.size, COMPACT_ROWS):
+            self.compact()
+
+    def compact(self):
+        if self.parts:
+            combined = pd.concat(self.parts, ignore_index=True)
+            self.parts = [combined.sort_values('order', kind='stable').drop_duplicates(subset='id')]
+            self.size = len(self.parts[0])
+            self.pending = 0
+
+    def result(self):
+        self.compact()
+        return self.parts[0].drop(columns='order').reset_index(drop=True)
+
+class Encoder:
+    """Integer codes for values met across chunks, assigned in first-seen order."""
+
+    def __init__(self):
+        self.uniques = pd.Index([], dtype=object)
+
+    def encode(self, values):
+        codes = self.uniques.get_indexer(values)
+        new = codes < 0
+        if new.any():
+            self.uniques = self.uniques.append(pd.Index(pd.unique(values[new]), dtype=object))
+            codes[new] = self.uniques.get_indexer(values[new])
+        return codes.astype(np.int32)
+
+    def labels(self, as_str=False, sort=False):
+        """(remap, labels): first-seen code c stands for labels[remap[c]]"""
+        return factorize_labels(self.uniques, as_str, sort)
+
+class ChunkAggregates:
+    """Online aggregates over prepared chunks of the institution-pair CSV.
+
+    Keeps only what the institution, edge and country stages need (per-institution
+    metadata, per-pair sums, per-country sums), so peak memory depends
+    on the number of institutions and pairs rather than on the number of rows.
+    Ids, names and countries are encoded as they arrive; the first-seen codes are
+    remapped to the sorted codes of EncodedPairs when the results are built.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.encoders = {field: Encoder() for field, _, _ in ENCODED_FIELDS}
+        self.first_seen = FirstSeen()
+        self.edges = GroupSum()
+        self.country_pairs = GroupSum()
+        self.country_geo = [GroupSum(), GroupSum()]
+        self._decoded = None
+
+    def add(self, df):
+        """Fold one prepared chunk into the aggregates."""
+        for field, encoder in self.encoders.items():
+            for side in (1, 2):
+                column = f'institution_{side}_{field}'
+                df[column] = encoder.encode(df[column].to_numpy())
+
+        order = np.arange(self.rows, self.rows + len(df), dtype=np.int64)
+        for side, offset in ((1, 0), (2, FirstSeen.SIDE_2)):
+            prefix = f'institution_{side}_'
+            meta = df[[prefix + 'id', prefix + 'name', prefix + 'country', prefix + 'lat', prefix + 'lon']]
+            meta = meta.set_axis(['id', 'name', 'country', 'lat', 'lon'], axis=1)
+            self.first_seen.add(meta.assign(order=order + offset))
+
+            self.country_geo[side - 1].add(df.groupby(prefix + 'country').agg(
+                lat=(prefix + 'lat', 'sum'), lon=(prefix + 'lon', 'sum'), rows=(prefix + 'lat', 'size')
+            ))
+
+        # Encoder codes are not yet sorted, so pairs are canonicalized after decoding
+        self.edges.add(df.groupby(['institution_1_id', 'institution_2_id'])[
+            ['collaboration_count', 'authors_involved']].sum())
+
+        # Country pairs are unordered here; they are ordered by name once decoded
+        first, second = df['institution_1_country'].to_numpy(), df['institution_2_country'].to_numpy()
+        intl = first != second
+        if intl.any():
+            self.country_pairs.add(df['collaboration_count'][intl].groupby(
+                [np.minimum(first[intl], second[intl]), np.maximum(first[intl], second[intl])]
+            ).sum())
+
+        self.rows += len(df)
+
+    def decoded(self):
+        """EncodedPairs-style label arrays plus the first-seen -> sorted code remaps."""
+        if self._decoded is None:
+            remaps, labels = {}, {}
+            for field, as_str, sort in ENCODED_FIELDS:
+                remaps[field], labels[field] = self.encoders[field].labels(as_str, sort)
+            self._decoded = remaps, EncodedPairs(None, labels['id'], labels['name'], labels['country'])
+        return self._decoded
+
+    def pairs(self):
+        """Canonical institution pairs in sorted code order, with their summed counts."""
+        remaps, data = self.decoded()
+        edges = self.edges.result()
+        source, target, pair = unique_pairs(remaps['id'][edges.index.get_level_values(0)],
+                                            remaps['id'][edges.index.get_level_values(1)], len(data.ids))
+        weight = np.bincount(pair, weights=edges['collaboration_count'], minlength=len(source)).astype(np.int64)
+        authors = np.bincount(pair, weights=edges['authors_involved'], minlength=len(source)).astype(np.int64)
+        return source, target, weight, authors
+
+    def institutions(self, edges):
+        """Same output as build_institution_data over the whole file."""
+        print("  Building institution metadata...")
+        remaps, data = self.decoded()
+        first = self.first_seen.result()
+        code = remaps['id'][first['id']]
+
+        return institution_frame(data, code, remaps['name'][first['name']], remaps['country'][first['country']],
+                                 first['lat'].to_numpy(), first['lon'].to_numpy(), edges['source'].to_numpy(),
+                                 edges['target'].to_numpy(), edges['weight'].to_numpy())
+
+    def build_edges(self):
+        """Same output as build_edges over the whole file."""
+        print("  Building edges...")
+        source, target, weight, authors = self.pairs()
+        return pd.DataFrame({'source': source, 'target': target, 'weight': weight, 'authors': authors})
+
+    def country_aggregation(self):
+        """Same output as compute_country_aggregation over the whole file."""
+        print("  Computing country aggregation...")
+        pairs = self.country_pairs.result()
+        if pairs is None:
+            return [], []
+
+        remaps, data = self.decoded()
+        country = remaps['country']
+        sides, counts = [], []
+        for geo in self.country_geo:
+            geo = geo.result()
+            code = country[geo.index.to_numpy()]
+            sides.append(pd.DataFrame({'lat': (geo['lat'] / geo['rows']).to_numpy(),
+                                       'lon': (geo['lon'] / geo['rows']).to_numpy()}, index=code))
+            counts.append(np.bincount(code, weights=geo['rows'], minlength=len(data.countries)).astype(np.int64))
+
+        return country_records(data.countries, country[pairs.index.get_level_values(0)],
+                               country[pairs.index.get_level_values(1)], pairs.to_numpy(), sides, counts)
+
+def ingest_chunks(csv_path, country_mapping=None, chunk_rows=500_000):
+    """Stream the CSV in chunks of chunk_rows rows into ChunkAggregates."""
+    print(f"  Streaming CSV in chunks of {chunk_rows:,} rows...")
+    aggregates = ChunkAggregates()
+
+    # Read ids as strings so every chunk types them the same way
+    id_types = {'institution_1_id': str, 'institution_2_id': str}
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype=id_types):
+        aggregates.add(prepare_frame(chunk, country_mapping, verbose=False))
+
+    return aggregates
+
+def pack_column(values):
+    """Column as an array np.savez stores without pickling (object strings become unicode)."""
+    if values.dtype != object:
+        return values
+    if pd.api.types.infer_dtype(values, skipna=False) not in ('string', 'empty'):
+        raise TypeError("column holds non-string objects")
+    return values.astype(str)
+
+def unpack_column(values):
+    return values.astype(object) if values.dtype.kind == 'U' else values
+
+def pack_frame(frame, prefix):
+    arrays = {f'{prefix}columns': np.asarray(frame.columns, dtype=str), f'{prefix}index': frame.index.to_numpy()}
+    for i, column in enumerate(frame.columns):
+        arrays[f'{prefix}{i}'] = pack_column(frame[column].to_numpy())
+    return arrays
+
+def unpack_frame(arrays, prefix):
+    columns = arrays[f'{prefix}columns']
+    return pd.DataFrame({column: unpack_column(arrays[f'{prefix}{i}']) for i, column in enumerate(columns)},
+                        index=arrays[f'{prefix}index'], columns=list(columns))
+
+def pack_output(output):
+    """Arrays for a stage output: a DataFrame, EncodedPairs, or a tuple of record lists."""
+    if isinstance(output, pd.DataFrame):
+        return {'kind': np.array('frame'), **pack_frame(output, 'frame/')}
+    if isinstance(output, EncodedPairs):
+        return {'kind': np.array('pairs'), **pack_frame(output.frame, 'frame/'), 'ids': pack_column(output.ids),
+                'names': pack_column(output.names), 'countries': pack_column(output.countries)}
+    if isinstance(output, tuple) and all(isinstance(records, list) for records in output):
+        arrays = {'kind': np.array('records'), 'count': np.array(len(output))}
+        for i, records in enumerate(output):
+            arrays.update(pack_frame(pd.DataFrame.from_records(records), f'{i}/'))
+        return arrays
+    raise TypeError(f"cannot store {type(output).__name__}")
+
+def unpack_output(arrays):
+    kind = str(arrays['kind'])
+    if kind == 'frame':
+        return unpack_frame(arrays, 'frame/')
+    if kind == 'pairs':
+        return EncodedPairs(unpack_frame(arrays, 'frame/'), unpack_column(arrays['ids']),
+                            unpack_column(arrays['names']), unpack_column(arrays['countries']))
+    return tuple(unpack_frame(arrays, f'{i}/').to_dict('records') for i in range(int(arrays['count'])))
+
+def file_digest(path):
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=None)
+def code_digest():
+    """Digest of the pipeline's source, so cached outputs of older code never match."""
+    return hashlib.sha256(''.join(file_digest(module) for module in (__file__, inspect.getfile(force_atlas2)))
+                          .encode()).hexdigest()
+
+class StageCache:
+    """Content-addressed store of stage outputs, one .npz file of columns per output.
+    
+    A stage's key hashes its name, its parameters, the keys of the stages it
+    depends on and the pipeline's source, so it only matches an output computed
+    from the same inputs by the same code. The directory can be deleted at any time.
+    """
     
-    # Aggregate
-    country_edges = intl.groupby(['c1', 'c2']).agg({
-        'collaboration_count': 'sum'
-    }).reset_index()
-    country_edges.columns = ['source', 'target', 'weight']
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
     
-    # Country centroids
-    inst1_geo = df.groupby('institution_1_country').agg({
-        'institution_1_lat': 'mean',
-        'institution_1_lon': 'mean'
-    }).reset_index()
-    inst1_geo.columns = ['country', 'lat', 'lon']
+    def path(self, name, key):
+        return os.path.join(self.directory, f"{name}-{key}.npz")
     
-    inst2_geo = df.groupby('institution_2_country').agg({
-        'institution_2_lat': 'mean',
-        'institution_2_lon': 'mean'
-    }).reset_index()
-    inst2_geo.columns = ['country', 'lat', 'lon']
+    def input_digest(self, path):
+        """file_digest of an input, only rehashed when its size or mtime changed since it was last hashed."""
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        digests_path = os.path.join(self.directory, 'inputs.json')
+        try:
+            with open(digests_path, encoding='utf-8') as f:
+                digests = json.load(f)
+        except (OSError, ValueError):
+            digests = {}
+        key = os.path.abspath(path)
+        if digests.get(key, [None])[:2] == stamp:
+            return digests[key][2]
+        
+        digests[key] = stamp + [file_digest(path)]
+        tmp_path = f"{digests_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(digests, f)
+        os.replace(tmp_path, digests_path)
+        return digests[key][2]
     
-    country_geo = pd.concat([inst1_geo, inst2_geo]).groupby('country').mean().reset_index()
+    def has(self, name, key):
+        return os.path.exists(self.path(name, key))
     
-    # Count institutions per country
-    inst_counts = pd.concat([
-        df['institution_1_country'].value_counts(),
-        df['institution_2_country'].value_counts()
-    ]).groupby(level=0).first()
+    def load(self, name, key):
+        with np.load(self.path(name, key)) as stored:
+            return unpack_output({field: stored[field] for field in stored.files})
     
-    country_geo['inst_count'] = country_geo['country'].map(inst_counts).fillna(0).astype(int)
+    def save(self, name, key, output):
+        try:
+            arrays = pack_output(output)
+        except TypeError as e:
+            print(f"  Not caching {name}: {e}")
+            return
+        path = self.path(name, key)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+def _saved_stage(func, cache, name, key, *args):
+    result = func(*args)
+    cache.save(name, key, result)
+    return result
+
+def cached_stages(stages, cache, params, uncached=()):
+    """Rewrite {name: (func, deps)} so stored outputs are loaded and new ones saved.
     
-    return country_geo.to_dict('records'), country_edges.to_dict('records')
+    Stages are listed after the stages they depend on. params maps stage names
+    to JSON-able parameters (input file digests among them). Walking back from
+    the final stages, a stage with a stored output is loaded and needs nothing
+    upstream; only the stages still needed are kept.
+    Returns (stages, names of the stages loaded from the cache).
+    """
+    keys = {}
+    for name, (_, deps) in stages.items():
+        spec = [name, code_digest(), params.get(name), [keys[dep] for dep in deps]]
+        keys[name] = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:32]
+    
+    rewritten, loaded = {}, set()
+    queue = [name for name in stages if not any(name in deps for _, deps in stages.values())]
+    while queue:
+        name = queue.pop()
+        if name in rewritten:
+            continue
+        func, deps = stages[name]
+        if name in uncached:
+            rewritten[name] = (func, deps)
+        elif cache.has(name, keys[name]):
+            rewritten[name] = (partial(cache.load, name, keys[name]), [])
+            loaded.add(name)
+            continue
+        else:
+            rewritten[name] = (partial(_saved_stage, func, cache, name, keys[name]), deps)
+        queue.extend(deps)
+    return {name: rewritten[name] for name in stages if name in rewritten}, loaded
+
+# Stage outputs that forked workers inherit instead of receiving them pickled
+_inherited = {}
+
+def peak_rss_mb():
+    """This process's peak resident memory so far, in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def measure(func, *args, cpu_clock=time.process_time):
+    """Call func(*args) and return (result, {'wall', 'cpu'}) with times in seconds.
+    
+    While tracemalloc is tracing, the record also has the call's peak traced
+    memory above what was allocated when it started ('peak_mb') and the
+    process's peak RSS so far ('rss_mb').
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    wall, cpu = time.perf_counter(), cpu_clock()
+    result = func(*args)
+    record = {'wall': time.perf_counter() - wall, 'cpu': cpu_clock() - cpu}
+    if tracing:
+        record['peak_mb'] = (tracemalloc.get_traced_memory()[1] - start_memory) / 2**20
+        record['rss_mb'] = peak_rss_mb()
+    return result, record
+
+def _run_stage(func, deps, passed, cpu_clock):
+    """Run one stage (in a worker or inline) and measure it."""
+    args = [passed[dep] if dep in passed else _inherited[dep] for dep in deps]
+    return measure(func, *args, cpu_clock=cpu_clock)
+
+def run_stages(stages, workers=1, inline=()):
+    """Run {name: (func, deps)} in dependency order, independent stages concurrently.
+    
+    Each stage is called with its dependencies' outputs as arguments. A stage
+    runs in this process when it is listed in `inline` (cheap ones, such as
+    loads from the stage cache) or nothing could run beside it; otherwise it goes
+    to a pool of `workers` processes, forked when first needed so they inherit
+    every output computed so far (the prepared frame in particular) without
+    pickling it. Where fork is unavailable a thread pool is used instead.
+    
+    Returns ({name: output}, {name: {'wall', 'cpu', 'parallel'}}) with times in
+    seconds (and memory, see measure).
+    """
+    global _inherited
+    results, timings = {}, {}
+    pending = dict(stages)
+    running = {}
+    pool, inherited = None, set()
+    
+    try:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+            if not ready and not running:
+                raise ValueError(f"Unsatisfiable stage dependencies: {sorted(pending)}")
+            
+            name = next((name for name in ready if name in inline), None)
+            if name is None and ready and (workers <= 1 or (len(ready) == 1 and not running)):
+                name = ready[0]
+            if name is not None:
+                func, deps = pending.pop(name)
+                _inherited = results
+                result, record = _run_stage(func, deps, {}, time.process_time)
+                results[name] = result
+                timings[name] = {**record, 'parallel': False}
+                continue
+            
+            if ready and pool is None:
+                _inherited = dict(results)
+                if 'fork' in multiprocessing.get_all_start_methods():
+                    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+                    inherited, cpu_clock = set(results), time.process_time
+                else:
+                    pool = ThreadPoolExecutor(workers)
+                    _inherited, inherited, cpu_clock = results, None, time.thread_time
+            
+            for name in ready:
+                func, deps = pending.pop(name)
+                # Threads share every output; forked processes only those from before the fork
+                passed = {} if inherited is None else {dep: results[dep] for dep in deps if dep not in inherited}
+                running[pool.submit(_run_stage, func, deps, passed, cpu_clock)] = name
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result, record = future.result()
+                results[name] = result
+                timings[name] = {**record, 'parallel': True}
+    finally:
+        _inherited = {}
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    
+    return results, timings
+
+def _viz_stage(institutions, edges, country):
+    return prepare_viz_data(institutions, edges, *country)
 
 def prepare_viz_data(institutions, edges, country_nodes, country_edges):
     """Prepare final data for visualization."""
@@ -191,23 +769,24 @@ def prepare_viz_data(institutions, edges, country_nodes, country_edges):
     max_strength = institutions['strength'].max() or 1
     institutions['size'] = 2 + 15 * (institutions['strength'] / max_strength)
     
-    # Node data
-    nodes = institutions[['id', 'name', 'country', 'lat', 'lon', 'x', 'y', 
-                          'size', 'strength', 'degree']].to_dict('records')
-    
-    # Create node index map for edges
-    node_idx = {n['id']: i for i, n in enumerate(nodes)}
+    # Node data, built from column lists rather than per-row Series
+    columns = ['id', 'name', 'country', 'lat', 'lon', 'x', 'y', 'size', 'strength', 'degree']
+    values = [institutions[column].tolist() for column in columns]
+    nodes = [dict(zip(columns, row)) for row in zip(*values)]
     
-    # Edge data - use indices for Cosmograph
-    max_weight = edges['weight'].max() or 1
-    edge_list = []
-    for _, e in edges.iterrows():
-        if e['source'] in node_idx and e['target'] in node_idx:
-            edge_list.append({
-                'source': node_idx[e['source']],
-                'target': node_idx[e['target']],
-                'weight': int(e['weight'])
-            })
+    # Edge data - use node indices for Cosmograph; edges reference institutions by code
+    codes = institutions['code'].to_numpy()
+    source, target = edges['source'].to_numpy(), edges['target'].to_numpy()
+    size = max(codes.max(initial=-1), source.max(initial=-1), target.max(initial=-1)) + 1
+    node_idx = np.full(size, -1, dtype=np.int64)
+    node_idx[codes] = np.arange(len(codes))
+    source, target = node_idx[source], node_idx[target]
+    known = (source >= 0) & (target >= 0)
+    edge_list = [
+        {'source': s, 'target': t, 'weight': w}
+        for s, t, w in zip(source[known].tolist(), target[known].tolist(),
+                           edges['weight'].to_numpy()[known].astype(np.int64).tolist())
+    ]
     
     # Stats
     stats = {
@@ -221,11 +800,49 @@ def prepare_viz_data(institutions, edges, country_nodes, country_edges):
         'edges': edge_list,
         'countryNodes': country_nodes,
         'countryEdges': country_edges,
-        'stats': stats
+        'stats': stats,
+        'layout': 'forceatlas2'
     }
 
-def process_data(csv_path, country_codes_path=None):
-    """Main function to process data from CSV to visualization-ready format."""
+def output_rows(output):
+    """Row count of a stage output (pairs for the prepared input, nodes + edges for viz)."""
+    if isinstance(output, EncodedPairs):
+        return len(output.frame)
+    if isinstance(output, ChunkAggregates):
+        return output.rows
+    if isinstance(output, dict):
+        return len(output['nodes']) + len(output['edges'])
+    if isinstance(output, tuple):
+        return sum(len(records) for records in output)
+    return len(output)
+
+def output_bytes(output):
+    """In-memory size of a stage output; JSON size for record lists and viz data."""
+    if isinstance(output, pd.DataFrame):
+        return int(output.memory_usage(deep=True).sum())
+    if isinstance(output, EncodedPairs):
+        labels = (output.ids, output.names, output.countries)
+        return output_bytes(output.frame) + sum(int(pd.Series(values).memory_usage(deep=True)) for values in labels)
+    if isinstance(output, (dict, tuple)):
+        return len(json.dumps(output))
+    return None
+
+def process_data(csv_path, country_codes_path=None, chunk_rows=None, workers=None, timings=None,
+                 layout_iterations=None, layout_cache=None, stage_cache=None, profile=False, layout_seconds=None):
+    """Main function to process data from CSV to visualization-ready format.
+    
+    With chunk_rows set, the CSV is streamed in chunks into online aggregates
+    instead of being loaded whole; the result is the same (country centroids
+    may differ in the last bits, as their sums are added chunk by chunk).
+    Independent stages run on up to `workers` processes (default: STAGE_WORKERS,
+    capped at the CPU count); per-stage timings are stored in `timings` if given.
+    `layout_iterations` overrides the force-directed layout's iteration budget
+    and `layout_seconds` caps its wall time; `layout_cache` is a file the
+    layout is warm-started from and saved to.
+    With `stage_cache` (a directory), stage outputs are stored there and reused
+    by later runs over the same inputs (see StageCache). With `profile`, the
+    timings also get each stage's output rows and size in bytes.
+    """
     print("Loading data...")
     
     # Load country codes mapping
@@ -233,25 +850,63 @@ def process_data(csv_path, country_codes_path=None):
     if country_codes_path:
         country_mapping = load_country_codes(country_codes_path)
     
-    df = load_and_prepare_data(csv_path, country_mapping)
-    print(f"  {len(df)} rows loaded")
-    
-    print("Processing institutions...")
-    institutions = build_institution_data(df)
-    print(f"  {len(institutions)} unique institutions")
+    if workers is None:
+        workers = min(STAGE_WORKERS, os.cpu_count() or 1)
     
-    print("Processing edges...")
-    edges = build_edges(df)
-    print(f"  {len(edges)} unique edges")
+    if chunk_rows:
+        stages = {
+            'prepare': (partial(ingest_chunks, csv_path, country_mapping, chunk_rows), []),
+            'edges': (ChunkAggregates.build_edges, ['prepare']),
+            'institutions': (ChunkAggregates.institutions, ['prepare', 'edges']),
+            'country': (ChunkAggregates.country_aggregation, ['prepare']),
+        }
+    else:
+        stages = {
+            'prepare': (partial(load_and_prepare_data, csv_path, country_mapping), []),
+            'edges': (build_edges, ['prepare']),
+            'institutions': (build_institution_data, ['prepare', 'edges']),
+            'country': (compute_country_aggregation, ['prepare']),
+        }
+    stages['layout'] = (partial(compute_layout, iterations=layout_iterations, cache_path=layout_cache,
+                                seconds=layout_seconds), ['institutions', 'edges'])
+    stages['viz'] = (_viz_stage, ['layout', 'edges', 'country'])
     
-    print("Computing layout...")
-    institutions = compute_layout_fast(institutions)
+    loaded = set()
+    if stage_cache:
+        cache = StageCache(stage_cache)
+        params = {
+            'prepare': {'csv': cache.input_digest(csv_path), 'country_codes': sorted(country_mapping.items()),
+                        'chunk_rows': chunk_rows},
+            # Not the layout cache: it only decides where a run for new inputs starts
+            'layout': {'iterations': layout_iterations, 'seconds': layout_seconds},
+        }
+        # Streaming aggregates are not stored, nor is viz (it is cheaper to rebuild than to load)
+        uncached = ('prepare', 'viz') if chunk_rows else ('viz',)
+        stages, loaded = cached_stages(stages, cache, params, uncached)
     
-    print("Computing country aggregation...")
-    country_nodes, country_edges = compute_country_aggregation(df)
+    print(f"Processing ({workers} worker{'s' if workers != 1 else ''})...")
+    # Loading a cached output is cheap: never worth starting the pool for
+    results, stage_timings = run_stages(stages, workers, inline=loaded)
+    viz_data = results['viz']
+    if layout_cache and 'layout' in loaded:
+        # compute_layout did not run, so write the warm-start file it would have
+        layout = results['layout']
+        save_layout(layout_cache, layout['id'].astype(str), layout[['raw_x', 'raw_y']].to_numpy(),
+                    layout['degree'].to_numpy(), layout['strength'].to_numpy())
     
-    print("Building visualization data...")
-    viz_data = prepare_viz_data(institutions, edges, country_nodes, country_edges)
+    print(f"  {len(results['layout'])} unique institutions")
+    print(f"  {len(results['edges'])} unique edges")
+    print("Stage timings:")
+    for name, timing in stage_timings.items():
+        timing['cached'] = name in loaded
+        where = ' (cached)' if timing['cached'] else ' (parallel)' if timing['parallel'] else ''
+        print(f"  {name:<13} {timing['wall']:8.2f}s wall {timing['cpu']:8.2f}s cpu{where}")
+    if profile:
+        for name, timing in stage_timings.items():
+            timing['rows'] = output_rows(results[name])
+            timing['bytes'] = output_bytes(results[name])
+    if timings is not None:
+        timings.update(stage_timings)
 
     print("=== DEBUG VIZ DATA ===")
     print(f"Viz Nodes: {len(viz_data['nodes'])}")
@@ -260,26 +915,63 @@ def process_data(csv_path, country_codes_path=None):
     
     return viz_data
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <input_csv> [country_codes_json] [output_html]")
-        print("Example: python main.py data.csv country_codes.json output.html")
-        sys.exit(1)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the institutional collaboration network page from an "
+                                                 "institution-pair CSV.")
+    parser.add_argument('csv_path', help='institution-pair CSV')
+    parser.add_argument('country_codes', nargs='?', help='country code to name JSON (found automatically if omitted)')
+    parser.add_argument('output', nargs='?', help='output HTML (default: test.html)')
+    parser.add_argument('--chunk-rows', type=int, default=int(os.environ.get('CHUNK_ROWS', 0)) or None,
+                        help='stream the CSV in chunks of this many rows, for inputs larger than memory')
+    parser.add_argument('--workers', type=int, help=f'processes for independent stages (default: {STAGE_WORKERS})')
+    parser.add_argument('--layout-iterations', type=int, default=int(os.environ.get('LAYOUT_ITERATIONS', 0)) or None,
+                        help='force-directed layout iteration budget (trades quality for time on large graphs)')
+    parser.add_argument('--layout-seconds', type=float, default=float(os.environ.get('LAYOUT_SECONDS', 0)) or None,
+                        help='stop the force-directed layout after this many seconds, whatever the budget')
+    parser.add_argument('--layout-cache', default=os.environ.get('LAYOUT_CACHE'),
+                        help='layout file to warm-start from (default: <output>.layout.npz; empty disables)')
+    parser.add_argument('--stage-cache', default=os.environ.get('STAGE_CACHE'),
+                        help='directory of cached stage outputs (default: .institute_cache next to the output; '
+                             'empty disables)')
+    parser.add_argument('--profile', nargs='?', const='', metavar='JSON',
+                        help='record per-stage time, memory, rows and output size (written to JSON, default: '
+                             '<output>.profile.json); memory tracing slows the build down')
+    args = parser.parse_args(argv)
     
-    csv_path = sys.argv[1]
+    # The second positional is the output when it is not a JSON file
+    if args.country_codes and not args.country_codes.endswith('.json'):
+        args.country_codes, args.output = None, args.output or args.country_codes
+    args.output = args.output or 'test.html'
+    stem = os.path.splitext(args.output)[0]
+    if args.layout_cache is None:
+        args.layout_cache = stem + '.layout.npz'
+    if args.stage_cache is None:
+        args.stage_cache = os.path.join(os.path.dirname(args.output), '.institute_cache')
+    if args.profile == '':
+        args.profile = stem + '.profile.json'
+    return args
+
+def write_html(output_path, html_content):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return os.path.getsize(output_path)
+
+def print_profile(stages):
+    print("Build profile:")
+    print(f"  {'stage':<13}{'wall s':>9}{'cpu s':>9}{'peak MB':>10}{'RSS MB':>10}{'rows':>14}{'output MB':>11}")
     
-    # Check if country codes JSON path is provided
-    country_codes_path = None
-    output_path = 'test.html'
+    def number(value, spec):
+        return '-' if value is None else format(value, spec)
     
-    if len(sys.argv) >= 3:
-        # Check if second argument is a JSON file
-        if sys.argv[2].endswith('.json'):
-            country_codes_path = sys.argv[2]
-            if len(sys.argv) >= 4:
-                output_path = sys.argv[3]
-        else:
-            output_path = sys.argv[2]
+    for name, record in stages.items():
+        output = record.get('bytes')
+        print(f"  {name:<13}{record['wall']:>9.2f}{record['cpu']:>9.2f}{number(record.get('peak_mb'), '.1f'):>10}"
+              f"{number(record.get('rss_mb'), '.1f'):>10}{number(record.get('rows'), ','):>14}"
+              f"{number(output and output / 2**20, '.1f'):>11}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    csv_path, country_codes_path, output_path = args.csv_path, args.country_codes, args.output
     
     # Try to find country_codes.json in common locations
     if not country_codes_path:
@@ -294,20 +986,41 @@ def main():
                 print(f"Found country codes at: {path}")
                 break
     
+    if args.profile:
+        tracemalloc.start()
+    
     # Process the data
     print("Processing data...")
-    viz_data = process_data(csv_path, country_codes_path)
+    stages = {}
+    viz_data, total = measure(partial(process_data, csv_path, country_codes_path, args.chunk_rows, args.workers,
+                                      stages, args.layout_iterations, args.layout_cache or None,
+                                      args.stage_cache or None, bool(args.profile), args.layout_seconds))
     
     # Generate the HTML
     print("Generating HTML...")
-    html_content = generate_html_template(viz_data)
+    html_content, stages['html'] = measure(generate_html_template, viz_data)
     
     # Write to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    size, stages['write'] = measure(write_html, output_path, html_content)
     
     print(f"Visualization saved to: {output_path}")
+    
+    if args.profile:
+        tracemalloc.stop()
+        stages['html'].update(rows=None, bytes=len(html_content.encode('utf-8')))
+        stages['write'].update(rows=None, bytes=size)
+        print_profile(stages)
+        report = {
+            'input': csv_path,
+            'input_bytes': os.path.getsize(csv_path),
+            'output': output_path,
+            'process_data': total,
+            'stages': stages,
+        }
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Profile saved to: {args.profile}")
     print("Done!")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -771,6 +771,9 @@ def get_js_visualization():
     let allNodes = DATA.nodes;
     let allEdges = DATA.edges;
     let simulation = null;
+    // Positions laid out by the backend (ForceAtlas2) are final for the whole graph; a filtered
+    // subset is re-fitted to the view and briefly relaxed. Without them the browser simulates
+    const PRECOMPUTED_LAYOUT = DATA.layout === 'forceatlas2';
     let canvas, ctx;
     let transform = d3.zoomIdentity;
     let currentNodes = [];
@@ -943,6 +946,21 @@ def get_js_visualization():
         }
     }
     
+    // Layout positions of a subset, re-centered and scaled alike on both axes into [-1, 1]
+    function fitPositions(nodes) {
+        if (!PRECOMPUTED_LAYOUT || nodes.length === allNodes.length) return nodes.map(n => [n.x, n.y]);
+        const xs = nodes.map(n => n.x), ys = nodes.map(n => n.y);
+        const [x0, x1] = d3.extent(xs), [y0, y1] = d3.extent(ys);
+        const half = Math.max(x1 - x0, y1 - y0) / 2 || 1;
+        return nodes.map(n => [(n.x - (x0 + x1) / 2) / half, (n.y - (y0 + y1) / 2) / half]);
+    }
+    
+    // Simulate without a precomputed layout; with one, only relax a subset for a moment
+    function needsSimulation(nodes) {
+        if (nodes.length === 0 || nodes.length >= 4000) return false;
+        return !PRECOMPUTED_LAYOUT || nodes.length < allNodes.length;
+    }
+    
     function applyFilters() {
         // Clear selection when filters change
         document.getElementById('node-info').classList.remove('visible');
@@ -972,11 +990,12 @@ def get_js_visualization():
                 weight: e.weight 
             }));
         
+        const positions = fitPositions(filtered);
         currentNodes = filtered.map((n, i) => ({
             ...n,
             index: i,
-            x: n.x * 350 + canvas.width / (2 * window.devicePixelRatio),
-            y: n.y * 350 + canvas.height / (2 * window.devicePixelRatio),
+            x: positions[i][0] * 350 + canvas.width / (2 * window.devicePixelRatio),
+            y: positions[i][1] * 350 + canvas.height / (2 * window.devicePixelRatio),
             color: COLORS[countryColorMap[n.country] || 0]
         }));
         
@@ -988,14 +1007,14 @@ def get_js_visualization():
             simulation = null;
         }
         
-        if (currentNodes.length > 0 && currentNodes.length < 4000) {
+        if (needsSimulation(currentNodes)) {
             simulation = d3.forceSimulation(currentNodes)
                 .force('link', d3.forceLink(currentEdges.map(e => ({...e}))).id((d, i) => i).distance(50).strength(0.2))
                 .force('charge', d3.forceManyBody().strength(-20).distanceMax(150))
                 .force('center', d3.forceCenter(canvas.width / (2 * window.devicePixelRatio), canvas.height / (2 * window.devicePixelRatio)))
                 .force('collision', d3.forceCollide().radius(d => d.size + 1).iterations(2))
-                .alpha(0.6)
-                .alphaDecay(0.03)
+                .alpha(PRECOMPUTED_LAYOUT ? 0.3 : 0.6)
+                .alphaDecay(PRECOMPUTED_LAYOUT ? 0.06 : 0.03)
                 .on('tick', render);
         } else {
             render();
@@ -1178,11 +1197,12 @@ def get_js_visualization():
             }));
         
         // Create node positions
+        const positions = fitPositions(filtered);
         currentNodes = filtered.map((n, i) => ({
             ...n,
             index: i,
-            x: n.x * 350 + compareCanvas.width / (2 * window.devicePixelRatio),
-            y: n.y * 350 + compareCanvas.height / (2 * window.devicePixelRatio),
+            x: positions[i][0] * 350 + compareCanvas.width / (2 * window.devicePixelRatio),
+            y: positions[i][1] * 350 + compareCanvas.height / (2 * window.devicePixelRatio),
             color: COMPARE_COLORS[countryColorIndex[n.country]] || '#999'
         }));
         
@@ -1195,14 +1215,14 @@ def get_js_visualization():
         }
         
         // Force simulation
-        if (currentNodes.length > 0 && currentNodes.length < 4000) {
+        if (needsSimulation(currentNodes)) {
             simulation = d3.forceSimulation(currentNodes)
                 .force('link', d3.forceLink(currentEdges.map(e => ({...e}))).id((d, i) => i).distance(60).strength(0.3))
                 .force('charge', d3.forceManyBody().strength(-30).distanceMax(200))
                 .force('center', d3.forceCenter(compareCanvas.width / (2 * window.devicePixelRatio), compareCanvas.height / (2 * window.devicePixelRatio)))
                 .force('collision', d3.forceCollide().radius(d => d.size + 2).iterations(2))
-                .alpha(0.7)
-                .alphaDecay(0.03)
+                .alpha(PRECOMPUTED_LAYOUT ? 0.3 : 0.7)
+                .alphaDecay(PRECOMPUTED_LAYOUT ? 0.06 : 0.03)
                 .on('tick', renderComparison);
         } else {
             renderComparison();
@@ -0,0 +1,246 @@
+"""
+Institutional Collaboration Network - Force-Directed Layout
+ForceAtlas2-style layout of the institution graph in numpy, with the all-pairs
+repulsion approximated by a Barnes-Hut quadtree.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Iteration budget per run (warm starts only relax new or changed nodes, so
+# need fewer: from WARM_ITERATIONS when almost nothing changed up to the full
+# budget when everything did); force_atlas2's `seconds` also bounds the wall time
+LAYOUT_ITERATIONS = 200
+WARM_ITERATIONS = 60
+
+# ForceAtlas2 parameters (Jacomy et al. 2014) and the Barnes-Hut opening angle
+SCALING_RATIO = 2.0
+GRAVITY = 1.0
+EDGE_WEIGHT_INFLUENCE = 0.5
+JITTER_TOLERANCE = 1.0
+THETA = 1.2
+
+# Quadtree depth; leaves are 2**-16 of the layout's extent
+TREE_DEPTH = 16
+
+# Nodes per force-evaluation task; smaller graphs are evaluated in one piece
+MIN_CHUNK = 2048
+
+def spread_bits(values):
+    """Interleave zeros between the low 16 bits of values (for Morton codes)."""
+    values = values.astype(np.int64) & 0xFFFF
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
+
+class QuadTree:
+    """Every level of a quadtree over the node positions, as flat arrays.
+
+    Level l splits the bounding square into 2**l x 2**l cells. Nodes are sorted
+    by Morton code, so the occupied cells of each level are runs of that order
+    and their keys come out sorted; each cell keeps its node count, total mass
+    and mass-weighted position sum.
+    """
+
+    def __init__(self, pos, mass, depth=TREE_DEPTH):
+        low = pos.min(axis=0)
+        self.extent = float((pos.max(axis=0) - low).max()) or 1.0
+        self.depth = depth
+        cells = 1 << depth
+        grid = np.minimum(((pos - low) / self.extent * cells).astype(np.int64), cells - 1)
+        morton = (spread_bits(grid[:, 0]) << 1) | spread_bits(grid[:, 1])
+        order = np.argsort(morton, kind='stable')
+        morton = morton[order]
+
+        self.keys, self.count, self.mass, self.moment, self.node_cell = [], [], [], [], []
+        for level in range(depth + 1):
+            key = morton >> (2 * (depth - level))
+            start = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+            self.keys.append(key[start])
+            self.count.append(np.diff(np.r_[start, len(key)]))
+            self.mass.append(np.add.reduceat(mass[order], start))
+            self.moment.append(np.add.reduceat(mass[order, None] * pos[order], start, axis=0))
+            cell = np.empty(len(key), dtype=np.int64)
+            cell[order] = np.cumsum(np.r_[True, key[1:] != key[:-1]]) - 1
+            self.node_cell.append(cell)
+
+    def children(self, level, cell):
+        """Occupied children of cells at level, as (parent position, child cell) arrays."""
+        keys = self.keys[level + 1]
+        child = (self.keys[level][cell][:, None] << 2) | np.arange(4)
+        found = np.minimum(np.searchsorted(keys, child), len(keys) - 1)
+        parent, quadrant = np.nonzero(keys[found] == child)
+        return parent, found[parent, quadrant]
+
+    def repulsion(self, nodes, pos, mass, theta):
+        """Approximate ForceAtlas2 repulsion on the given nodes (without the scaling ratio)."""
+        force = np.zeros((len(nodes), 2))
+        # Frontier of (node, cell) pairs still to resolve, starting at the root
+        who = np.arange(len(nodes))
+        cell = np.zeros(len(nodes), dtype=np.int64)
+        for level in range(self.depth + 1):
+            node = nodes[who]
+            inside = self.node_cell[level][node] == cell
+            leaf = level == self.depth
+            # Remove a node's own mass from the cell it sits in
+            cell_mass = self.mass[level][cell] - np.where(inside, mass[node], 0)
+            moment = self.moment[level][cell] - np.where(inside, mass[node], 0)[:, None] * pos[node]
+            single = self.count[level][cell] - inside == 1
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                delta = pos[node] - moment / cell_mass[:, None]
+            dist2 = np.einsum('ij,ij->i', delta, delta)
+            size = self.extent / (1 << level)
+            accept = (~inside & (size * size < theta * theta * dist2)) | single | (cell_mass <= 0) | leaf
+            use = accept & (cell_mass > 0)
+
+            # F = m_i * m_j / d along the unit vector, i.e. m_i * m_j * delta / d^2
+            factor = mass[node[use]] * cell_mass[use] / np.maximum(dist2[use], 1e-12)
+            for axis in (0, 1):
+                force[:, axis] += np.bincount(who[use], weights=delta[use, axis] * factor, minlength=len(nodes))
+
+            if leaf:
+                break
+            parent, cell = self.children(level, cell[~accept])
+            who = who[~accept][parent]
+            if not len(who):
+                break
+        return force
+
+def force_atlas2(pos, mass, source, target, weight, iterations=LAYOUT_ITERATIONS, seconds=None,
+                 workers=None, theta=THETA, movable=None):
+    """Run ForceAtlas2 from the initial positions `pos` (n x 2) and return the new positions.
+
+    `mass` is degree + 1 per node; edges are (source, target, weight) index arrays.
+    With a boolean `movable` mask only those nodes move (the rest still push and
+    pull on them), and forces are only evaluated for them. Repulsion is evaluated
+    in chunks of nodes on `workers` threads (default: the CPU count). With
+    `seconds`, iteration stops once that much wall time has passed. The run is
+    deterministic for the same inputs (and no time limit).
+    """
+    pos = np.array(pos, dtype=np.float64)
+    n = len(pos)
+    nodes = np.arange(n) if movable is None else np.flatnonzero(movable)
+    if n < 2 or not len(nodes):
+        return pos
+    mass = np.asarray(mass, dtype=np.float64)
+    edge_weight = np.asarray(weight, dtype=np.float64) ** EDGE_WEIGHT_INFLUENCE
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = np.array_split(nodes, max(1, min(workers, len(nodes) // MIN_CHUNK)))
+    moving = len(nodes)
+
+    old_force = np.zeros((moving, 2))
+    speed, speed_efficiency = 1.0, 1.0
+    deadline = time.perf_counter() + seconds if seconds else None
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        for _ in range(iterations):
+            if deadline and time.perf_counter() > deadline:
+                break
+
+            tree = QuadTree(pos, mass)
+            parts = executor.map(lambda nodes: tree.repulsion(nodes, pos, mass, theta), chunks)
+            force = SCALING_RATIO * np.concatenate(list(parts))
+
+            # Linear attraction along edges
+            pull = (pos[target] - pos[source]) * edge_weight[:, None]
+            for axis in (0, 1):
+                force[:, axis] += (np.bincount(source, weights=pull[:, axis], minlength=n) -
+                                   np.bincount(target, weights=pull[:, axis], minlength=n))[nodes]
+
+            # Gravity towards the origin, constant in magnitude
+            at = pos[nodes]
+            dist = np.maximum(np.hypot(at[:, 0], at[:, 1]), 1e-12)
+            force -= (GRAVITY * mass[nodes] / dist)[:, None] * at
+
+            # Adaptive speed from the global swinging/traction ratio
+            swinging = mass[nodes] * np.hypot(*(force - old_force).T)
+            traction = mass[nodes] * np.hypot(*(force + old_force).T) / 2
+            total_swinging, total_traction = swinging.sum(), traction.sum()
+            estimated = 0.05 * np.sqrt(moving)
+            jitter = JITTER_TOLERANCE * max(np.sqrt(estimated), min(10.0, estimated * total_traction / moving ** 2))
+            if total_swinging / total_traction > 2.0:
+                if speed_efficiency > 0.05:
+                    speed_efficiency *= 0.5
+                jitter = max(jitter, JITTER_TOLERANCE)
+            target_speed = jitter * speed_efficiency * total_traction / total_swinging
+            if total_swinging > jitter * total_traction:
+                if speed_efficiency > 0.05:
+                    speed_efficiency *= 0.7
+            elif speed < 1000:
+                speed_efficiency *= 1.3
+            speed += min(target_speed - speed, 0.5 * speed)
+
+            pos[nodes] += force * (speed / (1 + np.sqrt(speed * swinging)))[:, None]
+            old_force = force
+    return pos
+
+def normalize_positions(pos):
+    """Center positions and scale both axes alike into [-1, 1]."""
+    low, high = pos.min(axis=0), pos.max(axis=0)
+    half = (high - low).max() / 2 or 1.0
+    return (pos - (low + high) / 2) / half
+
+def load_layout(path):
+    """Positions saved by save_layout as (ids, pos, degree, strength) sorted by id, or None."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as cached:
+            layout = cached['ids'], cached['pos'], cached['degree'], cached['strength']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"  Ignoring unreadable layout cache {path}: {e}")
+        return None
+    return layout if len(layout[0]) else None
+
+def save_layout(path, ids, pos, degree, strength):
+    """Persist raw (unnormalized) positions keyed by institution id, replacing the file atomically."""
+    ids = np.asarray(ids, dtype=str)
+    order = np.argsort(ids, kind='stable')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, ids=ids[order], pos=pos[order], degree=degree[order], strength=strength[order])
+    os.replace(tmp_path, path)
+
+def warm_iterations(movable, iterations=LAYOUT_ITERATIONS):
+    """Iteration budget for a warm start, scaled by the share of nodes that can move."""
+    share = float(np.mean(movable)) if len(movable) else 0.0
+    return int(round(WARM_ITERATIONS + (iterations - WARM_ITERATIONS) * share))
+
+def warm_start(ids, seed, degree, strength, source, target, cached):
+    """Initial positions and movable mask for a run warm-started from a cached layout.
+
+    Institutions whose degree and strength are unchanged keep their cached
+    position and stay put. Changed ones start from their cached position; new
+    ones start at the mean of their already placed neighbours (or at `seed`
+    when they have none), with a little deterministic jitter. Only changed and
+    new institutions are movable.
+    """
+    cached_ids, cached_pos, cached_degree, cached_strength = cached
+    ids = np.asarray(ids, dtype=str)
+    found = np.minimum(np.searchsorted(cached_ids, ids), len(cached_ids) - 1)
+    known = cached_ids[found] == ids
+    pos = np.array(seed, dtype=np.float64)
+    pos[known] = cached_pos[found[known]]
+    movable = ~known | (cached_degree[found] != degree) | (cached_strength[found] != strength)
+
+    new = ~known
+    if new.any() and known.any():
+        # Place new institutions among their cached neighbours
+        n = len(ids)
+        total, links = np.zeros((n, 2)), np.zeros(n)
+        for a, b in ((source, target), (target, source)):
+            placed = new[a] & known[b]
+            for axis in (0, 1):
+                total[:, axis] += np.bincount(a[placed], weights=pos[b[placed], axis], minlength=n)
+            links += np.bincount(a[placed], minlength=n)
+        linked = new & (links > 0)
+        pos[linked] = total[linked] / links[linked, None]
+        extent = np.ptp(pos[known], axis=0).max() or 1.0
+        pos[new] += np.random.default_rng(42).normal(scale=0.01 * extent, size=(new.sum(), 2))
+    return pos, movable
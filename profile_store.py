@@ -0,0 +1,125 @@
+"""
+Materialized author profiles.
+
+A precompute stage renders every author's /api/author/<id> payload once and
+writes the serialized JSON into a dbm key-value file, so serving a profile is
+a single hash lookup with no scanning, joining or sorting at request time.
+
+The store records the dataset version it was built from; app.py rebuilds it
+whenever the source CSVs change.
+
+Usage (standalone precompute, e.g. in a release step):
+    python profile_store.py coauthors_nodes.csv coauthors_edges.csv [store_dir]
+"""
+
+import dbm
+import json
+import os
+import shutil
+import threading
+import time
+
+VERSION_KEY = b'__version__'
+STORE_FILE = 'profiles'
+
+# Bumped whenever the profile payload changes, forcing a rebuild
+PROFILE_FORMAT = '2'
+
+
+def serialize_profile(profile):
+    """Serialize a profile exactly as Flask's jsonify does in production"""
+    return (json.dumps(profile, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+
+def write_store(store_dir, items, version):
+    """Write (key, serialized bytes) pairs into a fresh store and swap it into store_dir
+
+    The swap takes two renames, so concurrent writers to one store_dir must be
+    serialized (app.py builds under backends.build_lock).
+    """
+    tmp_dir = f"{store_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    count = 0
+    with dbm.open(os.path.join(tmp_dir, STORE_FILE), 'n') as db:
+        for key, value in items:
+            db[key.encode()] = value
+            count += 1
+        db[VERSION_KEY] = version.encode()
+
+    # Swap the finished store into place
+    old_dir = f"{store_dir}.old{os.getpid()}"
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return count
+
+
+def build_profile_store(backend, store_dir, version):
+    """Render every author profile from a backend and write them to store_dir"""
+    start = time.perf_counter()
+    items = ((author_id, serialize_profile(backend.author_details(author_id))) for author_id in backend.author_ids())
+    count = write_store(store_dir, items, version)
+    print(f"  Materialized {count:,} author profiles in {time.perf_counter() - start:.1f}s")
+    return count
+
+
+def profile_version(dataset_version):
+    """Store version for profiles rendered from a dataset version"""
+    return f"{dataset_version}.{PROFILE_FORMAT}"
+
+
+def store_version(store_dir):
+    """Return the dataset version a store was built from, or None"""
+    try:
+        with dbm.open(os.path.join(store_dir, STORE_FILE), 'r') as db:
+            value = db.get(VERSION_KEY)
+    except (*dbm.error, OSError):
+        return None
+    return value.decode() if value else None
+
+
+class ProfileStore:
+    """Read-only handle on a profile (or any write_store) store, opened lazily per process"""
+
+    def __init__(self, store_dir, version):
+        self.store_dir = str(store_dir)
+        self.version = version
+        self._db = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self, author_id):
+        """Serialized profile bytes for an author id, or None"""
+        key = author_id.encode()
+        if key == VERSION_KEY:
+            return None
+        with self._lock:
+            if self._db is None or self._pid != os.getpid():
+                self._db = dbm.open(os.path.join(self.store_dir, STORE_FILE), 'r')
+                self._pid = os.getpid()
+            return self._db.get(key)
+
+
+if __name__ == '__main__':
+    import sys
+
+    import pandas as pd
+
+    from backends import PandasBackend, dataset_version, read_nodes_csv
+
+    if len(sys.argv) < 3:
+        print("Usage: python profile_store.py <nodes_csv> <edges_csv> [store_dir]")
+        sys.exit(1)
+
+    nodes_path, edges_path = sys.argv[1], sys.argv[2]
+    store_dir = sys.argv[3] if len(sys.argv) > 3 else 'author_profiles'
+    version = dataset_version(nodes_path, edges_path)
+
+    if store_version(store_dir) == profile_version(version):
+        print(f"Profile store {store_dir} is up to date (version {version})")
+    else:
+        backend = PandasBackend(read_nodes_csv(nodes_path), pd.read_csv(edges_path), version=version)
+        build_profile_store(backend, store_dir, profile_version(version))
@@ -0,0 +1,157 @@
+"""
+Concurrency model for serving the dashboard from many threads per worker.
+
+  * Dataset       - immutable bundle of the backend, its derived indexes and
+                    their response cache. Loaders build a new bundle and
+                    app.py swaps the module reference in one assignment; a
+                    handler reads the reference once and works on a
+                    consistent snapshot for the whole request.
+  * ResponseCache - lock-protected cache with single-flight computation, so
+                    concurrent misses on one key compute it once.
+  * HeavyExecutor - bounded thread pool for CPU-heavy handler work, so a few
+                    expensive queries cannot occupy every request thread and
+                    cached or cheap routes keep being answered meanwhile.
+
+Backends and indexes are read-only once built (the SQLite backend keeps one
+connection per thread), so sharing them between threads needs no locking.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_MISSING = object()
+
+
+class Dataset:
+    """Immutable snapshot of everything the data routes read"""
+
+    FIELDS = ('backend', 'profile_store', 'suggestion_store', 'statistics_sketches', 'country_matrix')
+    __slots__ = FIELDS + ('cache',)
+
+    def __init__(self, backend=None, profile_store=None, suggestion_store=None, statistics_sketches=None,
+                 country_matrix=None, cache=None):
+        values = dict(backend=backend, profile_store=profile_store, suggestion_store=suggestion_store,
+                      statistics_sketches=statistics_sketches, country_matrix=country_matrix,
+                      cache=cache if cache is not None else ResponseCache())
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Dataset is immutable; build a new one with replace()')
+
+    def replace(self, **changes):
+        """Copy with some fields changed; a new backend starts with an empty cache"""
+        values = {name: getattr(self, name) for name in self.FIELDS}
+        values.update(changes)
+        if values['backend'] is self.backend:
+            values['cache'] = self.cache
+        return Dataset(**values)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ResponseCache:
+    """Thread-safe key/value cache of computed responses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._flights = {}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._values
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def update(self, values):
+        with self._lock:
+            self._values.update(values)
+
+    def single_flight(self, key, compute):
+        """Run compute once for concurrent callers with the same key; all get its result"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it once on a miss"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def fill():
+            # A flight that finished just before ours may already have stored it
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = compute()
+                self.update({key: value})
+            return value
+
+        return self.single_flight(key, fill)
+
+
+class HeavyExecutor:
+    """Bounded pool that runs CPU-heavy handler work off the request threads"""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _executor(self):
+        # Created lazily and per process, so forked workers get their own threads
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='heavy',
+                                                initializer=self._mark_worker)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _mark_worker(self):
+        self._local.worker = True
+
+    def submit(self, func, *args, **kwargs):
+        """Future for func(*args, **kwargs) on the pool"""
+        return self._executor().submit(func, *args, **kwargs)
+
+    def run(self, func, *args, **kwargs):
+        """Run func on the pool and wait for it (inline if already on a pool thread)"""
+        if getattr(self._local, 'worker', False):
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
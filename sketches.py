@@ -0,0 +1,289 @@
+"""
+Approximate statistics from streaming sketches.
+
+One pass over the backend's node and edge streams builds, for the unfiltered
+view and for every country, a small fixed-size summary:
+
+  * exact counters for authors, edges and summed collaboration counts
+  * a HyperLogLog of the distinct authors that have a collaboration
+  * a count-min sketch of per-author collaboration totals, plus a bounded set
+    of heavy-hitter candidates for the top authors list
+  * uniform reservoir samples of publication years and edge strengths
+
+Memory is bounded by the sketch sizes, not the dataset, and the statistics
+for a filter are answered from its summary in time independent of the number
+of edges. Every approximate answer carries its error bounds.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from backends import STATISTICS_FIELDS, TOP_N, statistics_result
+
+# Rows pulled from the backend per streaming step
+SKETCH_CHUNK_ROWS = 500_000
+
+HLL_PRECISION = 11           # 2048 registers, ~2.3% relative standard error
+CMS_WIDTH = 1024
+CMS_DEPTH = 4
+HEAVY_HITTER_CANDIDATES = TOP_N * 8
+RESERVOIR_SIZE = 4096
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _hash64(values, seed=0):
+    """splitmix64 finalizer over an integer array"""
+    with np.errstate(over='ignore'):
+        x = values.astype(np.uint64) + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) & 0xFFFFFFFFFFFFFFFF)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return (x ^ (x >> np.uint64(31))) & _MASK64
+
+
+def _bit_length64(values):
+    """Exact bit length of uint64 values (0 for 0)"""
+    hi = (values >> np.uint64(32)).astype(np.float64)
+    lo = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide='ignore'):
+        hi_bits = np.where(hi > 0, np.floor(np.log2(hi)) + 33, 0)
+        lo_bits = np.where(lo > 0, np.floor(np.log2(lo)) + 1, 0)
+    return np.where(hi > 0, hi_bits, lo_bits).astype(np.int64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch over integer keys"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, keys):
+        if len(keys) == 0:
+            return
+        hashed = _hash64(keys)
+        index = (hashed >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = (hashed << np.uint64(self.precision)) & _MASK64
+        rank = np.minimum(64 - _bit_length64(rest) + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * math.log(self.m / zeros)
+        return raw
+
+    @property
+    def relative_std_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+
+class CountMinSketch:
+    """Frequency sketch: estimates never undercount, overcount <= eps * total w.p. 1 - delta"""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, keys, row):
+        return (_hash64(keys, seed=row + 1) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, keys, counts):
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(keys, row), weights=counts,
+                                           minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+
+    def query(self, keys):
+        return np.min([self.table[row][self._columns(keys, row)] for row in range(self.depth)], axis=0)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def confidence(self):
+        return 1 - math.exp(-self.depth)
+
+
+class Reservoir:
+    """Uniform sample without replacement (keeps the smallest random priorities)"""
+
+    def __init__(self, size=RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.priorities = np.empty(0, dtype=np.float32)
+        self.values = np.empty(0, dtype=np.int64)
+        self.population = 0
+
+    def add(self, values):
+        self.population += len(values)
+        priorities = np.concatenate([self.priorities, self.rng.random(len(values), dtype=np.float32)])
+        values = np.concatenate([self.values, values.astype(np.int64)])
+        if len(values) > self.size:
+            keep = np.argpartition(priorities, self.size)[:self.size]
+            priorities, values = priorities[keep], values[keep]
+        self.priorities, self.values = priorities, values
+
+    def distribution(self):
+        """Estimated (value, count) pairs scaled to the population, by value"""
+        if self.population == 0:
+            return []
+        values, counts = np.unique(self.values, return_counts=True)
+        scale = self.population / len(self.values)
+        return [(int(v), int(round(c * scale))) for v, c in zip(values, counts)]
+
+    def margin(self):
+        """Worst-case 95% margin on any estimated bucket count"""
+        n, population = len(self.values), self.population
+        if n == 0 or n >= population:
+            return 0
+        finite = math.sqrt((population - n) / (population - 1))
+        return int(math.ceil(1.96 * population * math.sqrt(0.25 / n) * finite))
+
+
+class FilterSketch:
+    """Everything needed to answer /api/statistics approximately for one filter"""
+
+    def __init__(self, seed=0):
+        self.total_authors = 0
+        self.unique_connections = 0
+        self.total_collaborations = 0
+        self.collaborators = HyperLogLog()
+        self.author_totals = CountMinSketch()
+        self.candidates = np.empty(0, dtype=np.int64)
+        self.years = Reservoir(seed=seed)
+        self.strengths = Reservoir(seed=seed + 1)
+
+    def add_nodes(self, years):
+        self.total_authors += len(years)
+        self.years.add(years)
+
+    def add_edges(self, src, dst, weight):
+        self.unique_connections += len(weight)
+        self.total_collaborations += int(weight.sum())
+        self.strengths.add(weight)
+
+        endpoints = np.concatenate([src, dst])
+        self.collaborators.add(endpoints)
+
+        keys, inverse = np.unique(endpoints, return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate([weight, weight])).astype(np.int64)
+        self.author_totals.add(keys, totals)
+
+        # Estimates only grow, so re-ranking old candidates with this chunk's
+        # authors keeps every true heavy hitter in the candidate set
+        pool = np.union1d(self.candidates, keys)
+        estimates = self.author_totals.query(pool)
+        self.candidates = pool[np.argsort(-estimates, kind='stable')[:HEAVY_HITTER_CANDIDATES]]
+
+    def top_authors(self):
+        """[(author code, estimated total)] for the heaviest candidates"""
+        if len(self.candidates) == 0:
+            return []
+        estimates = self.author_totals.query(self.candidates)
+        order = np.lexsort((self.candidates, -estimates))[:TOP_N]
+        return [(int(self.candidates[i]), int(estimates[i])) for i in order]
+
+    def error_bounds(self):
+        return {
+            'distinct_collaborators': {
+                'relative_std_error': round(self.collaborators.relative_std_error, 4)
+            },
+            'top_authors': {
+                'max_overcount': int(math.ceil(self.author_totals.epsilon * self.author_totals.total)),
+                'confidence': round(self.author_totals.confidence, 4)
+            },
+            'year_distribution': {
+                'sample_size': len(self.years.values),
+                'population': self.years.population,
+                'margin_95': self.years.margin()
+            },
+            'strength_distribution': {
+                'sample_size': len(self.strengths.values),
+                'population': self.strengths.population,
+                'margin_95': self.strengths.margin()
+            }
+        }
+
+
+def _groups(countries):
+    """Yield (country, row indices) for each non-missing country in a chunk"""
+    codes, uniques = pd.factorize(pd.Series(countries, dtype=object))
+    if len(uniques) == 0:
+        return
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    for i, country in enumerate(uniques):
+        yield country, order[bounds[i]:bounds[i + 1]]
+
+
+class StatisticsSketches:
+    """Per-filter sketches for the whole dataset, built in one streaming pass"""
+
+    def __init__(self, backend, country_name=None):
+        self.backend = backend
+        self.country_name = country_name or backend.country_name
+        self.filters = {'': FilterSketch()}
+        self.country_counts = {}
+        self._build()
+
+    def _sketch(self, country):
+        if country not in self.filters:
+            self.filters[country] = FilterSketch(seed=len(self.filters) * 2)
+        return self.filters[country]
+
+    def _build(self):
+        everything = self.filters['']
+        for countries, years in self.backend.node_chunks(SKETCH_CHUNK_ROWS):
+            everything.add_nodes(years)
+            for country, rows in _groups(countries):
+                self._sketch(country).add_nodes(years[rows])
+                self.country_counts[country] = self.country_counts.get(country, 0) + len(rows)
+
+        for src, dst, weight, src_country, dst_country in self.backend.edge_chunks(SKETCH_CHUNK_ROWS):
+            everything.add_edges(src, dst, weight)
+            same = (pd.notna(src_country) & (src_country == dst_country)).astype(bool)
+            for country, rows in _groups(src_country[same]):
+                rows = np.flatnonzero(same)[rows]
+                self._sketch(country).add_edges(src[rows], dst[rows], weight[rows])
+
+    def statistics(self, country, fields=STATISTICS_FIELDS):
+        """Approximate /api/statistics payload, or None for an unknown filter"""
+        sketch = self.filters.get(country or '')
+        if sketch is None:
+            return None
+
+        country_counts = sorted(self.country_counts.items(), key=lambda item: (-item[1], item[0]))
+
+        top_authors = None
+        if 'top_authors' in fields:
+            top = sketch.top_authors()
+            labels = self.backend.author_labels([code for code, _ in top])
+            top_authors = [{'id': author_id, 'name': name, 'count': count}
+                           for (author_id, name), (_, count) in zip(labels, top)]
+
+        result = statistics_result(
+            country, fields, self.country_name, country_counts, sketch.total_authors,
+            sketch.total_collaborations, sketch.unique_connections, top_authors,
+            sketch.years.distribution(), sketch.strengths.distribution()
+        )
+        if 'summary' in result:
+            result['summary']['distinct_collaborators'] = int(round(sketch.collaborators.estimate()))
+        result['approximate'] = True
+        result['error_bounds'] = sketch.error_bounds()
+        return result
+
+    def edge_count(self, country):
+        sketch = self.filters.get(country or '')
+        return sketch.unique_connections if sketch is not None else 0
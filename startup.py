@@ -0,0 +1,91 @@
+"""
+Staged startup tracking for the dashboard server.
+
+Data loading runs in named phases (parse, index build, cache warm). Each
+phase records its status and wall time so /healthz, /readyz and /debug can
+report how far a worker has got while cheap routes are already serving.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class StartupStatus:
+    """Thread-safe record of startup phases and their timings"""
+
+    def __init__(self, phases):
+        self._lock = threading.Lock()
+        self._order = list(phases)
+        self._phases = {name: {'status': PENDING, 'seconds': None} for name in self._order}
+        self._state = PENDING
+        self._error = None
+        self._started = None
+        self._finished = None
+
+    def begin(self):
+        with self._lock:
+            self._state = RUNNING
+            self._started = time.time()
+
+    def finish(self):
+        with self._lock:
+            self._state = DONE
+            self._finished = time.time()
+
+    def fail(self, error):
+        with self._lock:
+            self._state = FAILED
+            self._error = str(error)
+            self._finished = time.time()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase and record whether it completed"""
+        with self._lock:
+            self._phases[name]['status'] = RUNNING
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self._end_phase(name, FAILED, start)
+            raise
+        self._end_phase(name, DONE, start)
+
+    def _end_phase(self, name, status, start):
+        with self._lock:
+            self._phases[name] = {'status': status, 'seconds': round(time.perf_counter() - start, 3)}
+
+    def phase_done(self, name):
+        with self._lock:
+            return self._phases[name]['status'] == DONE
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def ready(self):
+        return self._state == DONE
+
+    @property
+    def loading(self):
+        return self._state in (PENDING, RUNNING)
+
+    def snapshot(self):
+        """JSON-serializable view of the startup progress"""
+        with self._lock:
+            elapsed = None
+            if self._started is not None:
+                elapsed = round((self._finished or time.time()) - self._started, 3)
+            return {
+                'state': self._state,
+                'phases': [dict(name=name, **self._phases[name]) for name in self._order],
+                'elapsed_seconds': elapsed,
+                'error': self._error
+            }
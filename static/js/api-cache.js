@@ -0,0 +1,118 @@
+// Client-side cache of API responses, in memory for the page's lifetime and
+// in IndexedDB across visits. Entries are keyed by the dataset version the
+// server reports in /api/filters, so a reloaded dataset never serves stale
+// charts; entries of other versions are dropped when a new one is seen.
+// Concurrent requests for one URL share a single fetch.
+class ApiCache {
+    constructor(dbName = 'coauthor-dashboard') {
+        this.version = null;
+        this.memory = new Map();
+        this.pending = new Map();
+        this.db = ApiCache.openDatabase(dbName).catch(() => null);
+    }
+
+    static openDatabase(dbName) {
+        return new Promise((resolve, reject) => {
+            if (!window.indexedDB) {
+                reject(new Error('IndexedDB is not available'));
+                return;
+            }
+            const request = indexedDB.open(dbName, 1);
+            request.onupgradeneeded = () => request.result.createObjectStore('responses', { keyPath: 'key' });
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    async setVersion(version) {
+        if (version === this.version) return;
+        this.version = version;
+        this.memory.clear();
+
+        const db = await this.db;
+        if (!db) return;
+        const store = db.transaction('responses', 'readwrite').objectStore('responses');
+        store.openCursor().onsuccess = event => {
+            const cursor = event.target.result;
+            if (!cursor) return;
+            if (cursor.value.version !== version) cursor.delete();
+            cursor.continue();
+        };
+    }
+
+    key(url) {
+        return `${this.version}|${url}`;
+    }
+
+    has(url) {
+        return this.memory.has(this.key(url));
+    }
+
+    // Parsed JSON for url: from memory, then IndexedDB, then the network.
+    // Error, shed and degraded responses are returned but never cached.
+    async get(url, { signal } = {}) {
+        const key = this.key(url);
+        if (this.memory.has(key)) return this.memory.get(key);
+        if (!this.pending.has(key)) {
+            const load = this.load(key, url, signal).finally(() => this.pending.delete(key));
+            this.pending.set(key, load);
+        }
+        return this.pending.get(key);
+    }
+
+    async load(key, url, signal) {
+        const stored = await this.read(key);
+        if (stored !== undefined) {
+            this.memory.set(key, stored);
+            return stored;
+        }
+
+        const response = await fetch(url, { signal });
+        const data = await response.json();
+        if (response.ok && !data.error && !data.degraded && this.version !== null) {
+            this.memory.set(key, data);
+            this.write(key, data);
+        }
+        return data;
+    }
+
+    async read(key) {
+        const db = await this.db;
+        if (!db || this.version === null) return undefined;
+        return new Promise(resolve => {
+            const request = db.transaction('responses').objectStore('responses').get(key);
+            request.onsuccess = () => resolve(request.result ? request.result.data : undefined);
+            request.onerror = () => resolve(undefined);
+        });
+    }
+
+    async write(key, data) {
+        const db = await this.db;
+        if (!db) return;
+        try {
+            db.transaction('responses', 'readwrite').objectStore('responses')
+                .put({ key, version: this.version, data });
+        } catch (error) {
+            // Quota exceeded or private browsing: the memory cache still works
+            console.warn('Could not persist API response:', error);
+        }
+    }
+
+    // Warm the cache for urls one at a time once the browser is idle, stopping
+    // at the first failure (offline, or the server shedding load)
+    prefetch(urls) {
+        const run = async () => {
+            for (const url of urls) {
+                if (this.has(url)) continue;
+                try {
+                    const data = await this.get(url);
+                    if (data.error) return;
+                } catch (error) {
+                    return;
+                }
+            }
+        };
+        const whenIdle = window.requestIdleCallback || (callback => setTimeout(callback, 1000));
+        whenIdle(() => run());
+    }
+}
@@ -0,0 +1,7 @@
+// Register the dashboard service worker; it is served from the site root so it controls every page
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js')
+            .catch(error => console.warn('Service worker registration failed:', error));
+    });
+}
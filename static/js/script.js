@@ -1,5 +1,39 @@
 let charts = {};
 
+// Statistics fields the dashboard renders; country charts only appear unfiltered
+const STATISTICS_FIELDS = ['summary', 'top_authors', 'year_distribution', 'strength_distribution'];
+const COUNTRY_FIELDS = ['top_countries', 'all_countries'];
+
+// Dataset to show (?dataset=name on the page URL); the server default when absent
+const DATASET = new URLSearchParams(window.location.search).get('dataset');
+
+// Largest countries whose statistics are prefetched after the first paint
+const PREFETCH_COUNTRIES = 10;
+
+const api = new ApiCache();
+// In-flight statistics and search requests, aborted when superseded
+const inflight = {};
+
+function apiUrl(path, params = new URLSearchParams()) {
+    if (DATASET) params.set('dataset', DATASET);
+    const query = params.toString();
+    return query ? `${path}?${query}` : path;
+}
+
+// Fetch url through the cache, cancelling the previous request of the same kind.
+// Resolves to null when a newer request has superseded this one.
+async function latest(kind, url) {
+    if (inflight[kind]) inflight[kind].abort();
+    const controller = inflight[kind] = new AbortController();
+    try {
+        const data = await api.get(url, { signal: controller.signal });
+        return controller === inflight[kind] ? data : null;
+    } catch (error) {
+        if (error.name === 'AbortError') return null;
+        throw error;
+    }
+}
+
 document.addEventListener('DOMContentLoaded', function() {
     initializeDashboard();
     setupEventListeners();
@@ -19,10 +53,15 @@ function setupEventListeners() {
 async function initializeDashboard() {
     try {
         await loadFilters();
-        await loadStatistics();
+        const statistics = await loadStatistics();
         
         document.getElementById('loadingOverlay').style.display = 'none';
         document.getElementById('mainContainer').style.display = 'block';
+        
+        // Make the likeliest next selections instant
+        if (statistics && statistics.all_countries) {
+            api.prefetch(statistics.all_countries.slice(0, PREFETCH_COUNTRIES).map(c => statisticsUrl(c.code)));
+        }
     } catch (error) {
         console.error('Error initializing dashboard:', error);
         document.getElementById('loadingOverlay').innerHTML = `
@@ -32,7 +71,7 @@ async function initializeDashboard() {
 }
 
 async function loadFilters() {
-    const response = await fetch('/api/filters');
+    const response = await fetch(apiUrl('/api/filters'));
     const data = await response.json();
     
     if (data.error) {
@@ -40,26 +79,33 @@ async function loadFilters() {
         return;
     }
     
+    await api.setVersion(data.version);
+    
     const countrySelect = document.getElementById('countryFilter');
     countrySelect.innerHTML = '<option value="">All Countries</option>' +
         data.countries.map(c => `<option value="${c.code}">${c.name}</option>`).join('');
 }
 
-async function loadStatistics() {
-    const country = document.getElementById('countryFilter').value;
-    
+function statisticsUrl(country) {
     const params = new URLSearchParams();
     if (country) params.append('country', country);
+    params.append('fields', (country ? STATISTICS_FIELDS : STATISTICS_FIELDS.concat(COUNTRY_FIELDS)).join(','));
+    return apiUrl('/api/statistics', params);
+}
+
+async function loadStatistics() {
+    const country = document.getElementById('countryFilter').value;
     
-    const response = await fetch(`/api/statistics?${params}`);
-    const data = await response.json();
+    const data = await latest('statistics', statisticsUrl(country));
+    if (data === null) return null;
     
     if (data.error) {
         console.error('Error loading statistics:', data.error);
-        return;
+        return null;
     }
     
     renderDashboard(data);
+    return data;
 }
 
 function renderDashboard(data) {
@@ -470,8 +516,8 @@ async function performSearch() {
     searchResults.innerHTML = '<div class="no-results"><div class="loading-spinner"></div></div>';
     
     try {
-        const response = await fetch(`/api/search/author?q=${encodeURIComponent(query)}`);
-        const data = await response.json();
+        const data = await latest('search', apiUrl('/api/search/author', new URLSearchParams({q: query})));
+        if (data === null) return;
         
         if (data.error) {
             searchResults.innerHTML = `
@@ -491,7 +537,7 @@ async function performSearch() {
             return;
         }
         
-        renderSearchResults(data.results);
+        renderSearchResults(data.results, data.truncated);
         
     } catch (error) {
         console.error('Search error:', error);
@@ -503,10 +549,16 @@ async function performSearch() {
     }
 }
 
-function renderSearchResults(results) {
+function renderSearchResults(results, truncated) {
     const searchResults = document.getElementById('searchResults');
     
-    searchResults.innerHTML = results.map(author => `
+    const notice = truncated ? `
+        <div class="no-results">
+            <div class="no-results-text">Showing the first ${results.length} matches - refine your search to see more</div>
+        </div>
+    ` : '';
+    
+    searchResults.innerHTML = notice + results.map(author => `
         <div class="search-result-card">
             <div class="author-header">
                 <div class="author-info">
@@ -0,0 +1,163 @@
+"""
+Suggested collaborators from common-neighbor scoring.
+
+For every author u, candidates are the authors v two hops away that u has not
+collaborated with, scored over their shared collaborators w:
+
+  * adamic_adar               sum of 1 / log(degree(w))  (ranking score)
+  * weighted_common_neighbors sum of min(count(u, w), count(w, v))
+  * common_neighbors          number of shared collaborators
+
+This is the row-wise sparse product A D A over the undirected coauthor graph,
+computed in numpy on a CSR adjacency. Rows are processed in batches sized by
+their number of two-hop paths, so peak memory is bounded by
+SUGGESTION_BATCH_PATHS rather than by the square of the hub degrees. Authors
+with more than SUGGESTION_MAX_HUB_DEGREE collaborators are not used as
+intermediaries; their Adamic-Adar weight is negligible and they dominate the
+path count.
+
+The top SUGGESTION_TOP_K per author are serialized into a store (the same
+format as the profile store) so the API serves them with one key lookup.
+
+Usage (standalone precompute, e.g. in a release step):
+    python suggestions.py coauthors_nodes.csv coauthors_edges.csv [store_dir]
+"""
+
+import time
+
+import numpy as np
+
+from graph_structure import CoauthorGraph, adjacency_slots
+from profile_store import serialize_profile, write_store
+
+SUGGESTION_TOP_K = 10
+SUGGESTION_BATCH_PATHS = 5_000_000
+SUGGESTION_MAX_HUB_DEGREE = 2000
+# Author codes per label lookup (keeps SQLite under its bound-parameter limit)
+LABEL_BATCH = 500
+
+
+def suggestion_batches(graph, top_k=SUGGESTION_TOP_K, batch_paths=SUGGESTION_BATCH_PATHS,
+                       max_hub_degree=SUGGESTION_MAX_HUB_DEGREE):
+    """Yield (rows, candidate ptr, candidates, adamic_adar, weighted, common) per batch of authors.
+
+    Suggestions for rows[i] are candidates[ptr[i]:ptr[i + 1]] (graph indices),
+    best first: by Adamic-Adar, then weighted common neighbors, then index.
+    """
+    n = len(graph)
+    if n == 0:
+        return
+    hub_ok = graph.degree <= max_hub_degree
+    # Any intermediary joins two distinct authors, so its degree is at least 2
+    hub_weight = 1 / np.log(np.maximum(graph.degree, 2))
+
+    # Cumulative two-hop paths leaving rows 0..i, used to cut rows into batches
+    slot_paths = np.where(hub_ok[graph.indices], graph.degree[graph.indices], 0)
+    cumulative = np.concatenate([[0], np.cumsum(slot_paths)])[graph.indptr[1:]]
+    cuts = np.searchsorted(cumulative, np.arange(batch_paths, int(cumulative[-1]), batch_paths), side='right')
+    bounds = np.concatenate([[0], cuts, [n]])
+
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        if first == last:
+            continue
+        rows = np.arange(first, last)
+
+        # u -> w: first hop, through non-hub intermediaries only
+        first_slots = np.arange(graph.indptr[first], graph.indptr[last])
+        u = np.repeat(rows, graph.degree[rows])
+        w = graph.indices[first_slots]
+        neighbor_keys = (u - first) * n + w
+        via = hub_ok[w]
+        u, w, uw = u[via], w[via], graph.data[first_slots[via]]
+
+        # w -> v: second hop
+        hops = graph.degree[w]
+        second_slots = adjacency_slots(graph.indptr, w, hops)
+        u, w, uw = np.repeat(u, hops), np.repeat(w, hops), np.repeat(uw, hops)
+        v, wv = graph.indices[second_slots], graph.data[second_slots]
+        keep = v != u
+        u, w, v = u[keep], w[keep], v[keep]
+        strength = np.minimum(uw[keep], wv[keep])
+
+        # Sum contributions per (u, v), then drop existing collaborators
+        keys, pair = np.unique((u - first) * n + v, return_inverse=True)
+        adamic_adar = np.bincount(pair, weights=hub_weight[w], minlength=len(keys))
+        weighted = np.bincount(pair, weights=strength, minlength=len(keys)).astype(np.int64)
+        common = np.bincount(pair, minlength=len(keys))
+        fresh = ~np.isin(keys, neighbor_keys)
+        keys, adamic_adar, weighted, common = keys[fresh], adamic_adar[fresh], weighted[fresh], common[fresh]
+        owner, candidate = keys // n, keys % n
+
+        # Top-k per owner: rank within each owner's run of the sorted order
+        order = np.lexsort((candidate, -weighted, -adamic_adar, owner))
+        ranked_owner = owner[order]
+        within = np.arange(len(order)) - np.searchsorted(ranked_owner, ranked_owner, side='left')
+        top = order[within < top_k]
+        ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ranked_owner[within < top_k], minlength=len(rows)), out=ptr[1:])
+        yield rows, ptr, candidate[top], adamic_adar[top], weighted[top], common[top]
+
+
+def _labels(backend, codes):
+    labels = []
+    for start in range(0, len(codes), LABEL_BATCH):
+        labels.extend(backend.author_labels(codes[start:start + LABEL_BATCH]))
+    return labels
+
+
+def suggestion_items(backend, graph, **options):
+    """(author id, serialized payload) for every author, in the backend's author order"""
+    all_ids = iter(backend.author_ids())
+    for rows, ptr, candidates, adamic_adar, weighted, common in suggestion_batches(graph, **options):
+        owner_labels = _labels(backend, graph.codes[rows].tolist())
+        candidate_labels = _labels(backend, graph.codes[candidates].tolist())
+        for i, (author_id, _) in enumerate(owner_labels):
+            # Authors without collaborators sit between graph rows; they get no suggestions
+            for other_id in all_ids:
+                if other_id == author_id:
+                    break
+                yield other_id, serialize_profile({'author_id': other_id, 'suggestions': []})
+            yield author_id, serialize_profile({
+                'author_id': author_id,
+                'suggestions': [{
+                    'id': candidate_labels[j][0],
+                    'name': candidate_labels[j][1],
+                    'adamic_adar': round(float(adamic_adar[j]), 4),
+                    'weighted_common_neighbors': int(weighted[j]),
+                    'common_neighbors': int(common[j])
+                } for j in range(ptr[i], ptr[i + 1])]
+            })
+    for other_id in all_ids:
+        yield other_id, serialize_profile({'author_id': other_id, 'suggestions': []})
+
+
+def build_suggestion_store(backend, store_dir, version):
+    """Score suggested collaborators for every author and write them to store_dir"""
+    start = time.perf_counter()
+    graph = CoauthorGraph(backend)
+    count = write_store(store_dir, suggestion_items(backend, graph), version)
+    print(f"  Scored suggested collaborators for {count:,} authors in {time.perf_counter() - start:.1f}s")
+    return count
+
+
+if __name__ == '__main__':
+    import sys
+
+    import pandas as pd
+
+    from backends import PandasBackend, dataset_version, read_nodes_csv
+    from profile_store import store_version
+
+    if len(sys.argv) < 3:
+        print("Usage: python suggestions.py <nodes_csv> <edges_csv> [store_dir]")
+        sys.exit(1)
+
+    nodes_path, edges_path = sys.argv[1], sys.argv[2]
+    store_dir = sys.argv[3] if len(sys.argv) > 3 else 'author_suggestions'
+    version = dataset_version(nodes_path, edges_path)
+
+    if store_version(store_dir) == version:
+        print(f"Suggestion store {store_dir} is up to date (version {version})")
+    else:
+        backend = PandasBackend(read_nodes_csv(nodes_path), pd.read_csv(edges_path), version=version)
+        build_suggestion_store(backend, store_dir, version)
@@ -0,0 +1,143 @@
+// Service worker for the dashboard pages (rendered by app.py at /sw.js).
+//
+//  * Pages and static assets are precached on install. Static URLs carry a
+//    content hash, so they are served cache-first; pages are served from the
+//    cache and refreshed in the background. CACHE_NAME changes whenever an
+//    asset or template changes, and activation drops the old caches.
+//  * CDN scripts, styles and fonts use versioned URLs and are cached on
+//    first use.
+//  * Data API responses are stale-while-revalidate. Each carries its
+//    X-Dataset-Version; once a revalidation sees a newer version of a
+//    dataset, entries of older versions are no longer served and are removed.
+//    The versions seen are persisted, as the browser stops idle workers.
+//    /api/filters is network-first (cached only for offline use): pages read
+//    the current dataset version from it.
+const CACHE_NAME = 'dashboard-{{ cache_version }}';
+const RUNTIME_CACHE = 'dashboard-runtime';
+const API_CACHE = 'dashboard-api';
+const STATE_CACHE = 'dashboard-state';
+const VERSIONS_KEY = '/sw-state/dataset-versions';
+const PAGES = {{ pages|tojson }};
+const PRECACHE = {{ precache|tojson }};
+const API_PATHS = ['/api/filters', '/api/statistics', '/api/search/author', '/api/author/', '/api/countries/',
+                   '/api/graph/summary'];
+const NETWORK_FIRST_API_PATHS = ['/api/filters'];
+const CDN_DESTINATIONS = ['script', 'style', 'font'];
+
+// Latest dataset version seen per dataset= parameter ('' for the default
+// dataset), loaded from STATE_CACHE when the worker starts
+let versions = null;
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(CACHE_NAME)
+        .then(cache => cache.addAll(PAGES.concat(PRECACHE)))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    const keep = [CACHE_NAME, RUNTIME_CACHE, API_CACHE, STATE_CACHE];
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names.filter(name => !keep.includes(name)).map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        if (CDN_DESTINATIONS.includes(request.destination)) {
+            event.respondWith(cacheFirst(RUNTIME_CACHE, request));
+        }
+    } else if (API_PATHS.some(path => url.pathname.startsWith(path))) {
+        event.respondWith(staleWhileRevalidateApi(event, url));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(cacheFirst(CACHE_NAME, request));
+    } else if (PAGES.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidatePage(event, url));
+    }
+});
+
+async function cacheFirst(cacheName, request) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+
+    const response = await fetch(request);
+    // Cross-origin scripts loaded without CORS come back opaque (status 0)
+    if (response.ok || response.type === 'opaque') {
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidatePage(event, url) {
+    // Pages are cached by path; the query string (e.g. ?dataset=) is read client-side
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(url.pathname);
+    const network = fetch(event.request).then(async response => {
+        if (response.ok) await cache.put(url.pathname, response.clone());
+        return response;
+    });
+
+    if (!cached) return network;
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+}
+
+async function knownVersions() {
+    if (versions === null) {
+        const stored = await (await caches.open(STATE_CACHE)).match(VERSIONS_KEY);
+        const loaded = new Map(Object.entries(stored ? await stored.json() : {}));
+        // Another event may have loaded (and updated) them meanwhile
+        if (versions === null) versions = loaded;
+    }
+    return versions;
+}
+
+async function rememberVersion(dataset, version) {
+    (await knownVersions()).set(dataset, version);
+    const state = await caches.open(STATE_CACHE);
+    await state.put(VERSIONS_KEY, new Response(JSON.stringify(Object.fromEntries(versions)),
+                                               {headers: {'Content-Type': 'application/json'}}));
+}
+
+async function staleWhileRevalidateApi(event, url) {
+    const cache = await caches.open(API_CACHE);
+    const dataset = url.searchParams.get('dataset') || '';
+    const cached = await cache.match(event.request);
+    const known = await knownVersions();
+    const network = fetch(event.request).then(async response => {
+        const version = response.headers.get('X-Dataset-Version');
+        const noStore = (response.headers.get('Cache-Control') || '').includes('no-store');
+        if (response.ok && version && !noStore) {
+            await cache.put(event.request, response.clone());
+            if (known.get(dataset) !== version) {
+                await rememberVersion(dataset, version);
+                await dropOtherVersions(cache, dataset, version);
+            }
+        }
+        return response;
+    });
+
+    // Until a response has told us the current version, any cached entry is served
+    const current = known.get(dataset);
+    const fresh = cached && (current === undefined || cached.headers.get('X-Dataset-Version') === current);
+    if (fresh && !NETWORK_FIRST_API_PATHS.includes(url.pathname)) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }
+    // Outdated entries are still better than nothing when offline
+    return network.catch(error => cached || Promise.reject(error));
+}
+
+async function dropOtherVersions(cache, dataset, version) {
+    for (const request of await cache.keys()) {
+        if ((new URL(request.url).searchParams.get('dataset') || '') !== dataset) continue;
+        const response = await cache.match(request);
+        if (response && response.headers.get('X-Dataset-Version') !== version) {
+            await cache.delete(request);
+        }
+    }
+}
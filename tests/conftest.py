@@ -0,0 +1,56 @@
+"""
+Shared test setup: a small synthetic coauthor dataset, and the app started on
+it with the SQLite backend (so streaming and thread-bound connections are
+exercised the way production runs them).
+
+The environment is set before any test module imports app, which loads its
+datasets at import time.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from bench_backends import generate_coauthor_csvs
+
+DATA_DIR = tempfile.mkdtemp(prefix='coauthors-tests-')
+atexit.register(shutil.rmtree, DATA_DIR, True)
+NODES_CSV, EDGES_CSV = generate_coauthor_csvs(DATA_DIR, 3000, 6)
+
+os.environ.update({
+    'DATASETS': f'default={NODES_CSV}:{EDGES_CSV}',
+    'DATA_BACKEND': 'sqlite',
+    'SQLITE_PATH': os.path.join(DATA_DIR, 'coauthors.sqlite3'),
+    'PROFILE_STORE': '',
+    'SUGGESTION_STORE': '',
+    'BACKGROUND_STARTUP': '0',
+    'EXPORT_CONCURRENCY': '8',
+})
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    import app
+    assert app.startup.snapshot()['state'] == 'done'
+    return app
+
+
+@pytest.fixture(scope='session')
+def backends(tmp_path_factory):
+    """(pandas, sqlite) backends over the same synthetic CSVs"""
+    from backends import PandasBackend, SQLiteBackend, build_sqlite, read_nodes_csv
+
+    db_path = tmp_path_factory.mktemp('sqlite') / 'parity.sqlite3'
+    build_sqlite(Path(NODES_CSV), Path(EDGES_CSV), db_path, 'test')
+    pandas_backend = PandasBackend(read_nodes_csv(NODES_CSV), pd.read_csv(EDGES_CSV), version='test')
+    return pandas_backend, SQLiteBackend(db_path)
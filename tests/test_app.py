@@ -0,0 +1,165 @@
+import contextlib
+import io
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from admission import QUEUE_FULL, QUEUE_TIMEOUT, RouteLimiter, Shed
+from bench_backends import generate_coauthor_csvs
+from conftest import NODES_CSV
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.app.test_client()
+
+
+def uncached_country(flask_app):
+    """A country whose exact statistics are not cached yet"""
+    data = flask_app.datasets['default']
+    for country in data.backend.filters():
+        if flask_app.get_cache_key(country, False, 'summary') not in data.cache:
+            return country
+    pytest.skip('every country is cached')
+
+
+def test_concurrent_misses_run_the_backend_once(flask_app, monkeypatch):
+    backend = flask_app.datasets['default'].backend
+    statistics = backend.statistics
+    calls = []
+
+    def counted(*args):
+        calls.append(args)
+        time.sleep(0.2)
+        return statistics(*args)
+
+    monkeypatch.setattr(backend, 'statistics', counted)
+    barrier = threading.Barrier(6)
+    responses = []
+
+    def request():
+        barrier.wait()
+        responses.append(flask_app.app.test_client().get('/api/statistics?min_core=1&component=giant'))
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [response.status_code for response in responses] == [200] * 6
+    assert len({response.get_data() for response in responses}) == 1
+
+
+def test_route_limiter_sheds_when_full_or_timed_out():
+    limiter = RouteLimiter('test', max_concurrent=1, max_queue=0, queue_timeout=0.05)
+    with limiter.admit():
+        with pytest.raises(Shed) as shed:
+            with limiter.admit():
+                pass
+    assert shed.value.reason == QUEUE_FULL and shed.value.status == 503
+
+    limiter = RouteLimiter('test', max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    with limiter.admit():
+        with pytest.raises(Shed) as shed:
+            with limiter.admit():
+                pass
+    assert shed.value.reason == QUEUE_TIMEOUT
+    snapshot = limiter.snapshot()
+    assert snapshot['admitted'] == 1 and snapshot['shed'][QUEUE_TIMEOUT] == 1 and snapshot['active'] == 0
+
+
+def test_statistics_degrade_to_sketches_when_shed(flask_app, client, monkeypatch):
+    monkeypatch.setitem(flask_app.limiters, 'statistics', RouteLimiter('statistics', 0, 0, 0.05))
+    country = uncached_country(flask_app)
+
+    response = client.get(f'/api/statistics?country={country}')
+    assert response.status_code == 200
+    assert response.json['degraded'] is True and response.json['approximate'] is True
+    assert response.headers['Cache-Control'] == 'no-store'
+    # The estimate is not cached in place of the exact answer
+    assert flask_app.get_cache_key(country, False, 'summary') not in flask_app.datasets['default'].cache
+
+    # Busy and expensive enough: degraded up front instead of queueing
+    monkeypatch.setitem(flask_app.app.config, 'STATISTICS_DEGRADE_EDGES', 0)
+    assert client.get(f'/api/statistics?country={country}').json['degraded'] is True
+    assert flask_app.limiters['statistics'].snapshot()['degraded'] == 2
+
+
+def test_statistics_shed_without_a_fallback(flask_app, client, monkeypatch):
+    monkeypatch.setitem(flask_app.limiters, 'statistics', RouteLimiter('statistics', 0, 0, 0.05))
+
+    # Structure filters are always exact, so there is nothing to degrade to
+    response = client.get('/api/statistics?min_core=4')
+    assert response.status_code == 503
+    assert response.json['reason'] == QUEUE_FULL
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_broad_search_is_rejected(client):
+    response = client.get('/api/search/author?q=a')
+    assert response.status_code == 429
+    assert response.json['reason'] == 'too_expensive'
+    assert client.get('/api/search/author?q=smith').status_code == 200
+
+
+def test_statistics_fields_are_selected_and_cached_separately(flask_app, client):
+    country = uncached_country(flask_app)
+    full = client.get(f'/api/statistics?country={country}').json
+    cache = flask_app.datasets['default'].cache
+
+    other = uncached_country(flask_app)
+    response = client.get(f'/api/statistics?country={other}&fields=summary, year_distribution')
+    assert set(response.json) == {'summary', 'year_distribution', 'has_country_filter'}
+    assert flask_app.get_cache_key(other, False, 'summary') in cache
+    assert flask_app.get_cache_key(other, False, 'top_authors') not in cache
+
+    # Fields answered from the full response's cache entries are the same values
+    partial = client.get(f'/api/statistics?country={country}&fields=top_authors,summary').json
+    assert partial == {field: full[field] for field in ('top_authors', 'summary', 'has_country_filter')}
+
+    assert client.get('/api/statistics?fields=summary,bogus').status_code == 400
+    assert client.get('/api/statistics?shape=wide').status_code == 400
+
+
+def test_statistics_columnar_shape(client):
+    rows = client.get('/api/statistics').json
+    columnar = client.get('/api/statistics?shape=columnar').json
+    assert columnar['summary'] == rows['summary']
+    for field, columns in (('all_countries', ('country', 'code', 'count')), ('top_authors', ('id', 'name', 'count')),
+                           ('year_distribution', ('year', 'count')), ('strength_distribution', ('strength', 'count'))):
+        assert set(columnar[field]) == set(columns)
+        assert [dict(zip(columns, values)) for values in zip(*(columnar[field][c] for c in columns))] == rows[field]
+
+
+def test_datasets_are_isolated(flask_app, client, monkeypatch, tmp_path):
+    nodes_csv, edges_csv = generate_coauthor_csvs(tmp_path, 800, 4, seed=7)
+    monkeypatch.setattr(flask_app, 'datasets', dict(flask_app.datasets))
+    default = flask_app.datasets['default']
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert flask_app.load_data('snapshot', nodes_csv, edges_csv)
+        flask_app.build_indexes('snapshot')
+    snapshot = flask_app.datasets['snapshot']
+    assert snapshot.backend is not default.backend and snapshot.cache is not default.cache
+
+    assert client.get('/api/statistics').json['summary']['total_authors'] == 3000
+    cached = len(default.cache)
+    assert client.get('/api/statistics?dataset=snapshot').json['summary']['total_authors'] == 800
+    assert len(default.cache) == cached and len(snapshot.cache) > 0
+
+    # The synthetic snapshots share author ids; each dataset answers from its own data
+    countries = pd.read_csv(nodes_csv).merge(pd.read_csv(NODES_CSV), on='author_id', suffixes=('', '_default'))
+    moved = countries[countries['country_code'] != countries['country_code_default']].iloc[0]
+    author_id = str(moved['author_id'])
+    assert client.get(f'/api/author/{author_id}').json['country_code'] == moved['country_code_default']
+    response = client.get(f'/api/author/{author_id}?dataset=snapshot')
+    assert response.json['country_code'] == moved['country_code']
+    assert response.headers['X-Dataset-Version'] == snapshot.backend.version != default.backend.version
+
+    listed = client.get('/api/datasets').json['datasets']
+    assert {entry['name']: entry['nodes_count'] for entry in listed} == {'default': 3000, 'snapshot': 800}
+    response = client.get('/api/statistics?dataset=missing')
+    assert response.status_code == 404 and set(response.json['datasets']) == {'default', 'snapshot'}
@@ -0,0 +1,66 @@
+import asyncio
+import json
+from functools import partial
+
+import export
+
+
+def asgi_get(application, path, query=b''):
+    """Run one GET through an ASGI application; returns (status, headers, body chunks)"""
+    sent = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'headers': []}
+    return application(scope, receive, send), sent
+
+
+def test_sqlite_export_streams_through_asgi(flask_app, monkeypatch):
+    from asgi import WSGIToASGI
+
+    # Many small chunks, so the body is pulled by many separate next() calls
+    monkeypatch.setattr(flask_app, 'stream_export', partial(export.stream_export, chunk_rows=200))
+    assert flask_app.app.config['DATA_BACKEND'] == 'sqlite'
+    adapter = WSGIToASGI(flask_app.app, threads=3)
+
+    async def run():
+        requests = [asgi_get(adapter, '/api/export', b'format=ndjson') for _ in range(6)]
+        await asyncio.gather(*(call for call, _ in requests))
+        return [sent for _, sent in requests]
+
+    nodes, edges = flask_app.datasets['default'].backend.counts()
+    for sent in asyncio.run(run()):
+        assert sent[0]['type'] == 'http.response.start'
+        assert sent[0]['status'] == 200
+        assert all(message['more_body'] for message in sent[1:-1])
+        assert sent[-1]['more_body'] is False
+        body = b''.join(message['body'] for message in sent[1:])
+        records = [json.loads(line) for line in body.splitlines()]
+        assert sum(record['type'] == 'node' for record in records) == nodes
+        assert sum(record['type'] == 'edge' for record in records) == edges
+        assert len(sent) > 10
+
+
+def test_asgi_lifespan(flask_app):
+    from asgi import WSGIToASGI
+
+    messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(WSGIToASGI(flask_app.app)({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
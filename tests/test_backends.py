@@ -0,0 +1,110 @@
+import json
+import multiprocessing
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from backends import STATISTICS_FIELDS, PandasBackend, StringPool, dataset_version, read_nodes_csv, sqlite_version
+from conftest import EDGES_CSV, NODES_CSV
+
+
+def author_ids(pandas_backend):
+    """A hub author and a median-degree author"""
+    degrees = pandas_backend.adj_ptr[1:] - pandas_backend.adj_ptr[:-1]
+    order = degrees.argsort(kind='stable')
+    return str(pandas_backend.author_lookup[order[-1]]), str(pandas_backend.author_lookup[order[len(order) // 2]])
+
+
+def test_backends_return_identical_json(backends):
+    pandas_backend, sqlite_backend = backends
+    hub, median = author_ids(pandas_backend)
+    country = pandas_backend.filters()[0]
+    cases = [
+        ('filters', ()),
+        ('counts', ()),
+        ('statistics', ('',)),
+        ('statistics', (country,)),
+        ('statistics', ('', ('summary', 'year_distribution'))),
+        ('statistics', ('', STATISTICS_FIELDS, 0, 2)),
+        ('statistics', (country, STATISTICS_FIELDS, None, 3)),
+        ('search_author', (median,)),
+        ('search_author', ('smith 12',)),
+        ('search_author', ('no such author',)),
+        ('author_details', (median,)),
+        ('author_details', (hub,)),
+        ('author_details', ('0',)),
+        ('collaborator_page', (hub, 25)),
+        ('collaborator_page', (hub, 25, 25)),
+        ('collaborator_page', (hub, 10, 0, country)),
+    ]
+    for method, args in cases:
+        expected = getattr(pandas_backend, method)(*args)
+        actual = getattr(sqlite_backend, method)(*args)
+        assert json.dumps(actual, sort_keys=True) == json.dumps(expected, sort_keys=True), (method, args)
+
+
+@pytest.mark.parametrize('country', [None, 'first', 'rare'])
+def test_collaborator_pages_chain_without_gaps(backends, country):
+    pandas_backend, sqlite_backend = backends
+    hub, _ = author_ids(pandas_backend)
+    collaborators = pandas_backend.author_details(hub)['collaborators']
+    countries = sorted({c['country'] for c in collaborators}, key=[c['country'] for c in collaborators].count)
+    country = {None: None, 'first': countries[-1], 'rare': countries[0]}[country]
+    expected = [c['id'] for c in collaborators if country is None or c['country'] == country]
+
+    for backend in backends:
+        ids, cursor, pages = [], 0, 0
+        while cursor is not None:
+            page = backend.collaborator_page(hub, 7, cursor, country)
+            assert len(page['collaborators']) <= 7
+            ids.extend(c['id'] for c in page['collaborators'])
+            cursor = page['next_cursor']
+            pages += 1
+        assert ids == expected
+        assert pages == max(1, -(-len(expected) // 7))
+
+
+def test_concurrent_workers_build_the_sqlite_file_once(flask_app, tmp_path, monkeypatch):
+    """Workers starting together (gunicorn without --preload) build a stale file once and share it"""
+    builds = multiprocessing.get_context('fork').Value('i', 0)
+    build_sqlite = flask_app.build_sqlite
+
+    def counted(*args):
+        with builds.get_lock():
+            builds.value += 1
+        return build_sqlite(*args)
+
+    monkeypatch.setitem(flask_app.app.config, 'SQLITE_PATH', str(tmp_path / 'shared.sqlite3'))
+    monkeypatch.setattr(flask_app, 'build_sqlite', counted)
+    nodes, edges = Path(NODES_CSV), Path(EDGES_CSV)
+    version = dataset_version(nodes, edges)
+
+    def worker():
+        backend = flask_app.load_sqlite_backend('default', nodes, edges, version)
+        assert backend.version == version
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=worker) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert [process.exitcode for process in workers] == [0] * 4
+    assert builds.value == 1
+    assert sqlite_version(tmp_path / 'shared.sqlite3') == version
+    assert not list(tmp_path.glob('*.tmp*'))
+
+
+def test_snapshots_share_pooled_strings():
+    pool = StringPool()
+    nodes, edges = read_nodes_csv(NODES_CSV), pd.read_csv(EDGES_CSV)
+    first = PandasBackend(nodes, edges, string_pool=pool)
+    # A later snapshot of the same authors, read separately so its strings are new objects
+    second = PandasBackend(read_nodes_csv(NODES_CSV), edges.iloc[: len(edges) // 2], string_pool=pool)
+
+    names = nodes['author_name'].nunique() + nodes['country_code'].nunique()
+    assert len(pool) == names and pool.snapshot()['references'] == 4 * len(nodes)
+    assert all(a is b for a, b in zip(first.nodes_df['author_name'], second.nodes_df['author_name']))
+    assert first.statistics('') != second.statistics('')
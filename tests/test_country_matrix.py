@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import EDGES_CSV, NODES_CSV
+from country_matrix import CountryMatrix
+
+
+def expected_matrix(codes):
+    """The matrix from a groupby over the edges' endpoint countries"""
+    country = pd.read_csv(NODES_CSV).set_index('author_id')['country_code']
+    edges = pd.read_csv(EDGES_CSV)
+    first, second = edges['author1'].map(country), edges['author2'].map(country)
+    pairs = pd.DataFrame({'a': np.minimum(first, second), 'b': np.maximum(first, second),
+                          'count': edges['collaboration_count']}).dropna()
+    expected = pd.DataFrame(0, index=codes, columns=codes)
+    for (a, b), count in pairs.groupby(['a', 'b'])['count'].sum().items():
+        expected.loc[a, b] = expected.loc[b, a] = count
+    return expected.to_numpy()
+
+
+@pytest.mark.parametrize('which', ['pandas', 'sqlite'])
+def test_matrix_matches_a_groupby(backends, which):
+    backend = dict(zip(['pandas', 'sqlite'], backends))[which]
+    # Small chunks, so rows are scatter-added across several of them
+    country_matrix = CountryMatrix(backend, chunk_rows=1000)
+    np.testing.assert_array_equal(country_matrix.matrix, expected_matrix(country_matrix.codes))
+
+
+def test_matrix_and_partner_routes(flask_app):
+    client = flask_app.app.test_client()
+    payload = client.get('/api/countries/matrix').get_json()
+    codes = [country['code'] for country in payload['countries']]
+    matrix = np.array(payload['matrix'])
+    np.testing.assert_array_equal(matrix, expected_matrix(codes))
+
+    code = codes[0]
+    row = codes.index(code)
+    partners = client.get(f'/api/countries/{code}/partners?limit=3').get_json()
+    counts = [partner['count'] for partner in partners['partners']]
+    assert counts == sorted(np.delete(matrix[row], row), reverse=True)[:3]
+    assert all(matrix[row, codes.index(partner['code'])] == partner['count'] for partner in partners['partners'])
+    assert partners['domestic_collaborations'] == matrix[row, row]
+    assert partners['international_collaborations'] == matrix[row].sum() - matrix[row, row]
+    assert client.get('/api/countries/XX/partners').status_code == 404
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from graph_structure import CoauthorGraph, GraphStructure, connected_components, core_numbers
+
+
+class EdgeList:
+    """Backend stand-in streaming a fixed edge list"""
+
+    def __init__(self, src, dst):
+        self.src, self.dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+
+    def edge_chunks(self, chunk_rows):
+        for start in range(0, len(self.src), chunk_rows):
+            stop = start + chunk_rows
+            weight = np.ones(len(self.src[start:stop]), dtype=np.int64)
+            yield self.src[start:stop], self.dst[start:stop], weight, None, None
+
+
+def random_edges(seed, n=300, m=900):
+    rng = np.random.default_rng(seed)
+    # Hubs, repeated pairs, self-loops and a planted clique
+    src = np.r_[rng.zipf(1.8, size=m) % n, np.triu_indices(12, 1)[0] + 50, [7, 7]]
+    dst = np.r_[rng.integers(0, n, size=m), np.triu_indices(12, 1)[1] + 50, [7, 8]]
+    return src, dst
+
+
+def adjacency(src, dst):
+    neighbors = {}
+    for a, b in zip(src.tolist(), dst.tolist()):
+        if a != b:
+            neighbors.setdefault(a, set()).add(b)
+            neighbors.setdefault(b, set()).add(a)
+    return neighbors
+
+
+def brute_force_components(neighbors):
+    """Smallest member of each vertex's component, by search from every vertex"""
+    root = {}
+    for start in sorted(neighbors):
+        if start in root:
+            continue
+        stack, seen = [start], {start}
+        while stack:
+            for other in neighbors[stack.pop()]:
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        for vertex in seen:
+            root[vertex] = min(seen)
+    return root
+
+
+def brute_force_cores(neighbors):
+    """Largest k such that the vertex survives repeatedly deleting vertices of degree < k"""
+    core = {}
+    for k in range(max(map(len, neighbors.values())) + 1):
+        alive = {v: set(adj) for v, adj in neighbors.items()}
+        changed = True
+        while changed:
+            changed = False
+            for v in [v for v, adj in alive.items() if len(adj) < k]:
+                for other in alive.pop(v):
+                    alive[other].discard(v)
+                changed = True
+        for v in alive:
+            core[v] = k
+    return core
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_components_and_cores_match_brute_force(seed):
+    src, dst = random_edges(seed)
+    graph = CoauthorGraph(EdgeList(src, dst), chunk_rows=250)
+    neighbors = adjacency(src, dst)
+    vertices = graph.codes.tolist()
+    assert vertices == sorted(neighbors)
+
+    roots = brute_force_components(neighbors)
+    assert graph.codes[connected_components(graph)].tolist() == [roots[v] for v in vertices]
+    cores = brute_force_cores(neighbors)
+    assert core_numbers(graph).tolist() == [cores[v] for v in vertices]
+
+
+def test_structure_numbers_components_by_size():
+    # Path 1-2-3, triangle 10-11-12 plus pendant 13, and isolated authors 0 and 20
+    src, dst = [1, 2, 10, 11, 12, 12], [2, 3, 11, 12, 10, 13]
+    structure = GraphStructure.compute([0, 1, 2, 3, 10, 11, 12, 13, 20], EdgeList(src, dst))
+
+    assert structure.component.tolist() == [2, 1, 1, 1, 0, 0, 0, 0, 3]
+    assert structure.core.tolist() == [0, 1, 1, 1, 2, 2, 2, 1, 0]
+    summary = structure.summary()
+    assert summary['giant_component'] == {'size': 4, 'share': round(4 / 9, 4)}
+    assert summary['isolated_authors'] == 2
+    assert summary['max_core'] == 2
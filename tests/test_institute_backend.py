@@ -0,0 +1,144 @@
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import institute_backend
+from generate_institutions import generate_institution_csv
+from institute_backend import StageCache, main, parse_args, process_data
+from institute_layout import load_layout
+
+COUNTRY_CODES = str(Path(__file__).resolve().parent.parent / 'country_codes.json')
+
+
+@pytest.fixture(scope='module')
+def institutions_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp('institutions') / 'institutions.csv'
+    generate_institution_csv(path, 20_000, num_institutions=600)
+    return str(path)
+
+
+def build(csv_path, **options):
+    """process_data with its progress output silenced; returns (viz data, stage timings)"""
+    timings = {}
+    options.setdefault('layout_iterations', 20)
+    with contextlib.redirect_stdout(io.StringIO()):
+        viz_data = process_data(csv_path, COUNTRY_CODES, timings=timings, **options)
+    return viz_data, timings
+
+
+def assert_close(actual, expected, path='viz'):
+    """Equal JSON-like values, floats up to rounding"""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_close(actual[key], expected[key], f'{path}.{key}')
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected), path
+        for i, (a, b) in enumerate(zip(actual, expected)):
+            assert_close(a, b, f'{path}[{i}]')
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12), path
+    else:
+        assert actual == expected, path
+
+
+def test_streamed_build_matches_in_memory(institutions_csv):
+    in_memory, _ = build(institutions_csv, workers=1)
+    # Chunks much smaller than the file, so every aggregate is merged many times
+    streamed, timings = build(institutions_csv, workers=1, chunk_rows=3000)
+    assert_close(streamed, in_memory)
+    assert in_memory['stats']['totalInstitutions'] == 600
+    assert set(timings) == {'prepare', 'edges', 'institutions', 'country', 'layout', 'viz'}
+
+
+@pytest.mark.parametrize('chunk_rows', [None, 3000])
+def test_parallel_build_matches_serial(institutions_csv, chunk_rows):
+    serial, timings = build(institutions_csv, workers=1, chunk_rows=chunk_rows)
+    assert not any(timing['parallel'] for timing in timings.values())
+    parallel, timings = build(institutions_csv, workers=3, chunk_rows=chunk_rows)
+    assert any(timing['parallel'] for timing in timings.values())
+    assert parallel == serial
+
+
+def test_stage_cache_hits_on_rerun(institutions_csv, tmp_path):
+    stage_cache = str(tmp_path / 'stages')
+    first, timings = build(institutions_csv, stage_cache=stage_cache,
+                           layout_cache=str(tmp_path / 'a.layout.npz'))
+    assert not any(timing['cached'] for timing in timings.values())
+
+    # A different output (so a different layout warm-start file) reuses every cached stage
+    second, timings = build(institutions_csv, stage_cache=stage_cache, workers=3,
+                            layout_cache=str(tmp_path / 'b.layout.npz'))
+    assert {name for name, timing in timings.items() if timing['cached']} == {'layout', 'edges', 'country'}
+    # Loads run in this process; with only viz left to compute, no pool is started
+    assert not any(timing['parallel'] for timing in timings.values())
+    assert 'prepare' not in timings and 'institutions' not in timings
+    assert second == first
+    # ...and still leaves the warm-start file for the new output
+    np.testing.assert_array_equal(load_layout(str(tmp_path / 'b.layout.npz'))[1],
+                                  load_layout(str(tmp_path / 'a.layout.npz'))[1])
+
+    # Changed parameters miss
+    _, timings = build(institutions_csv, stage_cache=stage_cache, layout_iterations=10)
+    assert not timings['layout']['cached'] and timings['edges']['cached']
+
+
+def test_input_digest_is_only_recomputed_for_a_changed_file(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'pairs.csv'
+    csv_path.write_text('a,b\n1,2\n')
+    cache = StageCache(str(tmp_path / 'stages'))
+    hashed = []
+    monkeypatch.setattr(institute_backend, 'file_digest', lambda path: hashed.append(path) or f'digest{len(hashed)}')
+
+    assert cache.input_digest(csv_path) == cache.input_digest(csv_path) == 'digest1'
+    # Also across runs: the digests are kept in the cache directory
+    assert StageCache(str(tmp_path / 'stages')).input_digest(csv_path) == 'digest1'
+    csv_path.write_text('a,b\n1,2\n3,4\n')
+    assert cache.input_digest(csv_path) == 'digest2' and len(hashed) == 2
+
+
+def test_cli_arguments(monkeypatch):
+    for name in ('CHUNK_ROWS', 'LAYOUT_ITERATIONS', 'LAYOUT_SECONDS', 'LAYOUT_CACHE', 'STAGE_CACHE'):
+        monkeypatch.delenv(name, raising=False)
+
+    args = parse_args(['pairs.csv'])
+    assert (args.country_codes, args.output, args.chunk_rows, args.layout_iterations) == (None, 'test.html', None, None)
+    assert args.layout_cache == 'test.layout.npz' and args.stage_cache == '.institute_cache'
+    assert args.profile is None and args.layout_seconds is None
+
+    # A second positional that is not JSON is the output
+    args = parse_args(['pairs.csv', 'out/page.html', '--profile', '--layout-cache', ''])
+    assert (args.country_codes, args.output) == (None, 'out/page.html')
+    assert args.profile == 'out/page.profile.json' and args.layout_cache == ''
+    assert args.stage_cache == os.path.join('out', '.institute_cache')
+
+    monkeypatch.setenv('LAYOUT_SECONDS', '2.5')
+    monkeypatch.setenv('CHUNK_ROWS', '1000')
+    args = parse_args(['pairs.csv', 'codes.json', 'page.html', '--workers', '2', '--layout-iterations', '50',
+                       '--profile', 'report.json'])
+    assert (args.country_codes, args.output, args.workers) == ('codes.json', 'page.html', 2)
+    assert (args.chunk_rows, args.layout_iterations, args.layout_seconds) == (1000, 50, 2.5)
+    assert args.profile == 'report.json'
+
+
+def test_cli_writes_the_page_and_profile(institutions_csv, tmp_path):
+    output = str(tmp_path / 'page.html')
+    with contextlib.redirect_stdout(io.StringIO()) as printed:
+        main([institutions_csv, COUNTRY_CODES, output, '--layout-iterations', '5', '--workers', '1', '--profile'])
+
+    assert os.path.exists(tmp_path / 'page.layout.npz') and os.path.isdir(tmp_path / '.institute_cache')
+    with open(tmp_path / 'page.profile.json') as f:
+        report = json.load(f)
+    assert report['input'] == institutions_csv and report['output'] == output
+    assert report['process_data']['wall'] > 0
+    stages = report['stages']
+    assert list(stages) == ['prepare', 'edges', 'institutions', 'country', 'layout', 'viz', 'html', 'write']
+    for name, record in stages.items():
+        assert {'wall', 'cpu', 'peak_mb', 'rss_mb', 'rows', 'bytes'} <= set(record), name
+    assert stages['layout']['rows'] == 600 and stages['write']['bytes'] == os.path.getsize(output)
+    assert 'Build profile:' in printed.getvalue()
@@ -0,0 +1,148 @@
+import contextlib
+import io
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import institute_backend
+import institute_layout
+from institute_layout import (LAYOUT_ITERATIONS, WARM_ITERATIONS, QuadTree, force_atlas2, load_layout,
+                              normalize_positions, save_layout, warm_start)
+
+
+def brute_force_repulsion(pos, mass):
+    delta = pos[:, None, :] - pos[None, :, :]
+    dist2 = np.einsum('ijk,ijk->ij', delta, delta)
+    np.fill_diagonal(dist2, np.inf)
+    return np.einsum('ij,ijk->ik', mass[:, None] * mass[None, :] / dist2, delta)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_barnes_hut_with_zero_theta_is_exact(seed):
+    rng = np.random.default_rng(seed)
+    pos = rng.normal(size=(400, 2)) * [30, 10]
+    mass = rng.integers(1, 20, size=400).astype(float)
+    force = QuadTree(pos, mass).repulsion(np.arange(400), pos, mass, theta=0.0)
+    np.testing.assert_allclose(force, brute_force_repulsion(pos, mass), rtol=1e-9, atol=1e-12)
+
+
+def test_barnes_hut_approximation_is_close():
+    rng = np.random.default_rng(7)
+    pos = rng.normal(size=(2000, 2))
+    mass = np.ones(2000)
+    exact = brute_force_repulsion(pos, mass)
+    force = QuadTree(pos, mass).repulsion(np.arange(2000), pos, mass, theta=0.5)
+    error = np.linalg.norm(force - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.02
+
+
+def test_threaded_layout_matches_serial(monkeypatch):
+    rng = np.random.default_rng(3)
+    n = 600
+    source, target = rng.integers(0, n, size=(2, 2000))
+    keep = source != target
+    source, target = source[keep], target[keep]
+    weight = rng.integers(1, 5, size=len(source))
+    mass = np.bincount(source, minlength=n) + np.bincount(target, minlength=n) + 1.0
+    seed = rng.normal(size=(n, 2)) * 20
+
+    serial = force_atlas2(seed, mass, source, target, weight, iterations=15, workers=1)
+    monkeypatch.setattr(institute_layout, 'MIN_CHUNK', 100)
+    threaded = force_atlas2(seed, mass, source, target, weight, iterations=15, workers=4)
+    np.testing.assert_array_equal(threaded, serial)
+    assert np.abs(normalize_positions(serial)).max() == pytest.approx(1.0)
+
+
+def test_layout_stops_at_the_time_limit(monkeypatch):
+    rng = np.random.default_rng(5)
+    n = 200
+    source, target = np.arange(n), (np.arange(n) + 1) % n
+    seed = rng.normal(size=(n, 2)) * 10
+    two = force_atlas2(seed, np.full(n, 3.0), source, target, np.ones(n), iterations=2)
+
+    # A clock that advances a second per reading: the deadline passes before the third iteration
+    clock = itertools.count()
+    monkeypatch.setattr(institute_layout.time, 'perf_counter', lambda: float(next(clock)))
+    limited = force_atlas2(seed, np.full(n, 3.0), source, target, np.ones(n), iterations=50, seconds=2.5)
+    np.testing.assert_array_equal(limited, two)
+
+
+def compute_layout(*args, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return institute_backend.compute_layout(*args, **options)
+
+
+def ring_network(n, offset=0):
+    """Institution and edge frames of a ring with chords, ids offset by `offset`"""
+    source = np.r_[np.arange(n), np.arange(0, n, 3)]
+    target = np.r_[(np.arange(n) + 1) % n, (np.arange(0, n, 3) + n // 2) % n]
+    degree = np.bincount(source, minlength=n) + np.bincount(target, minlength=n)
+    rng = np.random.default_rng(n)
+    institutions = pd.DataFrame({
+        'id': np.arange(n) + offset, 'lat': rng.uniform(-60, 60, n), 'lon': rng.uniform(-150, 150, n),
+        'degree': degree, 'strength': degree * 2, 'code': np.arange(n),
+    })
+    return institutions, pd.DataFrame({'source': source, 'target': target, 'weight': np.ones(len(source), int)})
+
+
+def test_warm_start_keeps_unchanged_and_places_new_nodes():
+    ids = np.array(['a', 'b', 'c', 'd'])
+    cached = (np.array(['a', 'b', 'c']), np.array([[0.0, 0.0], [2.0, 0.0], [0.0, 2.0]]),
+              np.array([2, 2, 1]), np.array([5, 5, 3]))
+    # c gained a collaboration (with the new institution d)
+    degree, strength = np.array([2, 2, 2, 1]), np.array([5, 5, 4, 1])
+    source, target = np.array([0, 0, 2]), np.array([1, 2, 3])
+    pos, movable = warm_start(ids, np.full((4, 2), 9.0), degree, strength, source, target, cached)
+
+    assert movable.tolist() == [False, False, True, True]
+    np.testing.assert_array_equal(pos[:3], cached[1])
+    # The new institution starts next to its only placed neighbour, not at the seed
+    assert np.hypot(*(pos[3] - [0.0, 2.0])) < 0.2
+
+
+def test_layout_cache_round_trip(tmp_path):
+    path = tmp_path / 'layout.npz'
+    assert load_layout(path) is None
+    save_layout(path, ['b', 'a'], np.array([[1.0, 2.0], [3.0, 4.0]]), np.array([1, 2]), np.array([3, 4]))
+    ids, pos, degree, strength = load_layout(path)
+    assert ids.tolist() == ['a', 'b'] and pos.tolist() == [[3.0, 4.0], [1.0, 2.0]]
+    assert degree.tolist() == [2, 1] and strength.tolist() == [4, 3]
+    path.write_bytes(b'not a layout')
+    assert load_layout(path) is None
+
+
+def grown(institutions, edges):
+    """One new institution collaborating with the first one"""
+    n = len(institutions)
+    row = institutions.iloc[[0]].assign(id=n, code=n, degree=1, strength=2)
+    institutions = pd.concat([institutions, row], ignore_index=True)
+    institutions.loc[0, ['degree', 'strength']] += [1, 2]
+    return institutions, pd.concat([edges, pd.DataFrame({'source': [0], 'target': [n], 'weight': [1]})],
+                                   ignore_index=True)
+
+
+@pytest.mark.parametrize('offset, expected', [(0, (WARM_ITERATIONS, WARM_ITERATIONS + 5)),
+                                               (10_000, (LAYOUT_ITERATIONS, LAYOUT_ITERATIONS))])
+def test_warm_budget_follows_the_share_of_movable_nodes(tmp_path, monkeypatch, offset, expected):
+    cache_path = str(tmp_path / 'layout.npz')
+    compute_layout(*ring_network(300), iterations=40, cache_path=cache_path)
+
+    budgets = []
+
+    def recorded(*args, **options):
+        budgets.append(options.get('iterations'))
+        return force_atlas2(*args, iterations=1, movable=options.get('movable'))
+
+    monkeypatch.setattr(institute_backend, 'force_atlas2', recorded)
+    # A small change (one new institution) or a cache whose ids do not match at all
+    compute_layout(*grown(*ring_network(300, offset)), cache_path=cache_path)
+    assert expected[0] <= budgets[0] <= expected[1]
+
+
+def test_warm_start_barely_moves_unchanged_institutions(tmp_path):
+    cache_path = str(tmp_path / 'layout.npz')
+    cold = compute_layout(*ring_network(300), iterations=40, cache_path=cache_path)[['x', 'y']].to_numpy()
+    warm = compute_layout(*ring_network(300), cache_path=cache_path)[['x', 'y']].to_numpy()
+    np.testing.assert_allclose(warm, cold, atol=1e-12)
@@ -0,0 +1,74 @@
+import itertools
+import multiprocessing
+
+from flask import jsonify
+
+from profile_store import ProfileStore, build_profile_store, store_version
+
+
+def test_store_bytes_equal_live_jsonify(flask_app, tmp_path):
+    backend = flask_app.datasets['default'].backend
+    build_profile_store(backend, tmp_path / 'profiles', 'v1')
+    store = ProfileStore(tmp_path / 'profiles', 'v1')
+
+    with flask_app.app.app_context():
+        for author_id in itertools.islice(backend.author_ids(), 0, None, 97):
+            assert store.get(author_id) == jsonify(backend.author_details(author_id)).get_data()
+    assert store.get('no-such-author') is None
+    assert store.get('__version__') is None
+
+
+def counted_builds(flask_app, monkeypatch, name):
+    builds = multiprocessing.get_context('fork').Value('i', 0)
+    build = getattr(flask_app, name)
+
+    def counted(*args):
+        with builds.get_lock():
+            builds.value += 1
+        return build(*args)
+
+    monkeypatch.setattr(flask_app, name, counted)
+    return builds
+
+
+def test_store_is_rebuilt_only_for_a_new_version(flask_app, tmp_path, monkeypatch):
+    backend = flask_app.datasets['default'].backend
+    monkeypatch.setitem(flask_app.app.config, 'PROFILE_STORE', str(tmp_path / 'profiles'))
+    builds = counted_builds(flask_app, monkeypatch, 'build_profile_store')
+
+    assert flask_app.load_profile_store('default', backend, 'v1').version == 'v1'
+    assert flask_app.load_profile_store('default', backend, 'v1').version == 'v1'
+    assert builds.value == 1
+    assert flask_app.load_profile_store('default', backend, 'v2').version == 'v2'
+    assert builds.value == 2
+    assert store_version(tmp_path / 'profiles') == 'v2'
+
+    # A stale store is not served when rebuilding is disabled
+    monkeypatch.setitem(flask_app.app.config, 'PROFILE_STORE_BUILD', False)
+    assert flask_app.load_profile_store('default', backend, 'v3') is None
+
+
+def test_concurrent_workers_build_the_stores_once(flask_app, tmp_path, monkeypatch):
+    backend = flask_app.datasets['default'].backend
+    monkeypatch.setitem(flask_app.app.config, 'PROFILE_STORE', str(tmp_path / 'profiles'))
+    monkeypatch.setitem(flask_app.app.config, 'SUGGESTION_STORE', str(tmp_path / 'suggestions'))
+    profile_builds = counted_builds(flask_app, monkeypatch, 'build_profile_store')
+    suggestion_builds = counted_builds(flask_app, monkeypatch, 'build_suggestion_store')
+
+    author_id = next(iter(backend.author_ids()))
+
+    def worker():
+        assert flask_app.load_profile_store('default', backend, 'v1').get(author_id)
+        assert flask_app.load_suggestion_store('default', backend, 'v1') is not None
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=worker) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert [process.exitcode for process in workers] == [0] * 4
+    assert (profile_builds.value, suggestion_builds.value) == (1, 1)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['profiles', 'profiles.lock', 'suggestions',
+                                                               'suggestions.lock']
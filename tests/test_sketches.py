@@ -0,0 +1,60 @@
+import numpy as np
+
+from sketches import CountMinSketch, HyperLogLog
+
+
+def test_hyperloglog_is_within_its_error_bound():
+    for n in (500, 20_000, 200_000):
+        sketch = HyperLogLog()
+        keys = np.random.default_rng(n).permutation(10 * n)[:n]
+        # Repeats and chunking must not change the estimate
+        for chunk in np.array_split(np.concatenate([keys, keys[: n // 2]]), 7):
+            sketch.add(chunk)
+        assert abs(sketch.estimate() - n) <= 4 * sketch.relative_std_error * n
+
+
+def test_count_min_never_undercounts():
+    rng = np.random.default_rng(1)
+    keys = np.arange(50_000)
+    counts = rng.zipf(1.5, size=len(keys)).clip(max=10_000)
+    sketch = CountMinSketch()
+    for part in np.array_split(keys, 5):
+        sketch.add(part, counts[part])
+    estimates = sketch.query(keys)
+    assert (estimates >= counts).all()
+    overcount = estimates - counts
+    assert np.mean(overcount <= sketch.epsilon * sketch.total) >= sketch.confidence
+
+
+def test_approximate_statistics_are_within_their_bounds(flask_app):
+    client = flask_app.app.test_client()
+    exact = client.get('/api/statistics').get_json()
+    approx = client.get('/api/statistics?approx=1').get_json()
+    bounds = approx['error_bounds']
+    assert approx['approximate'] and 'approximate' not in exact
+
+    # Counters are exact
+    for field in ('total_authors', 'total_collaborations', 'unique_connections'):
+        assert approx['summary'][field] == exact['summary'][field]
+
+    chunks = flask_app.datasets['default'].backend.edge_chunks(100_000)
+    endpoints = np.unique(np.concatenate([np.concatenate(chunk[:2]) for chunk in chunks]))
+    error = bounds['distinct_collaborators']['relative_std_error']
+    assert abs(approx['summary']['distinct_collaborators'] - len(endpoints)) <= 4 * error * len(endpoints)
+
+    # Count-min estimates of the top authors never undercount, and overcount within the bound
+    totals = {author['id']: author['count'] for author in exact['top_authors']}
+    overcount = bounds['top_authors']['max_overcount']
+    for author in approx['top_authors']:
+        if author['id'] in totals:
+            assert totals[author['id']] <= author['count'] <= totals[author['id']] + overcount
+    assert len(set(totals) & {author['id'] for author in approx['top_authors']}) >= len(totals) // 2
+
+    for field, key in (('year_distribution', 'year'), ('strength_distribution', 'strength')):
+        margin = bounds[field]['margin_95']
+        actual = {row[key]: row['count'] for row in exact[field]}
+        estimated = {row[key]: row['count'] for row in approx[field]}
+        assert bounds[field]['population'] == sum(actual.values())
+        # 95% margins: allow a few buckets outside them
+        outside = [value for value in actual if abs(estimated.get(value, 0) - actual[value]) > margin]
+        assert len(outside) <= max(1, len(actual) // 10)
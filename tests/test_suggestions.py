@@ -0,0 +1,83 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import EDGES_CSV, NODES_CSV
+from graph_structure import CoauthorGraph
+from profile_store import ProfileStore
+from suggestions import build_suggestion_store, suggestion_batches
+
+
+class WeightedEdgeList:
+    """Backend stand-in streaming a fixed weighted edge list"""
+
+    def __init__(self, src, dst, weight):
+        self.src, self.dst, self.weight = (np.asarray(values, dtype=np.int64) for values in (src, dst, weight))
+
+    def edge_chunks(self, chunk_rows):
+        for start in range(0, len(self.src), chunk_rows):
+            stop = start + chunk_rows
+            yield self.src[start:stop], self.dst[start:stop], self.weight[start:stop], None, None
+
+
+def brute_force_suggestions(graph, top_k, max_hub_degree):
+    """{author index: [(candidate, adamic_adar, weighted, common)]}, scored pair by pair"""
+    neighbors = [dict(zip(graph.indices[graph.indptr[u]:graph.indptr[u + 1]].tolist(),
+                          graph.data[graph.indptr[u]:graph.indptr[u + 1]].tolist())) for u in range(len(graph))]
+    suggestions = {}
+    for u in range(len(graph)):
+        scores = {}
+        for w, uw in neighbors[u].items():
+            if len(neighbors[w]) > max_hub_degree:
+                continue
+            for v, wv in neighbors[w].items():
+                if v == u or v in neighbors[u]:
+                    continue
+                aa, weighted, common = scores.get(v, (0.0, 0, 0))
+                scores[v] = (aa + 1 / math.log(max(len(neighbors[w]), 2)), weighted + min(uw, wv), common + 1)
+        ranked = sorted(scores.items(), key=lambda item: (-round(item[1][0], 9), -item[1][1], item[0]))
+        suggestions[u] = [(v, *score) for v, score in ranked[:top_k]]
+    return suggestions
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_ranking_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n, m = 200, 700
+    src = np.r_[rng.zipf(1.7, size=m) % n, [3, 3]]
+    dst = np.r_[rng.integers(0, n, size=m), [3, 4]]
+    graph = CoauthorGraph(WeightedEdgeList(src, dst, rng.integers(1, 6, size=m + 2)), chunk_rows=100)
+    expected = brute_force_suggestions(graph, top_k=5, max_hub_degree=25)
+
+    # Small batches, so rows are split across many of them
+    seen = set()
+    for rows, ptr, candidates, adamic_adar, weighted, common in suggestion_batches(graph, top_k=5, batch_paths=300,
+                                                                                  max_hub_degree=25):
+        for i, u in enumerate(rows.tolist()):
+            seen.add(u)
+            got = list(zip(candidates[ptr[i]:ptr[i + 1]].tolist(), adamic_adar[ptr[i]:ptr[i + 1]].tolist(),
+                           weighted[ptr[i]:ptr[i + 1]].tolist(), common[ptr[i]:ptr[i + 1]].tolist()))
+            assert [(v, w, c) for v, _, w, c in got] == [(v, w, c) for v, _, w, c in expected[u]], u
+            np.testing.assert_allclose([aa for _, aa, _, _ in got], [aa for _, aa, _, _ in expected[u]], rtol=1e-12)
+    assert seen == set(range(len(graph)))
+
+
+def test_store_serves_every_author(backends, tmp_path):
+    backend = backends[1]
+    build_suggestion_store(backend, tmp_path / 'suggestions', 'v1')
+    store = ProfileStore(tmp_path / 'suggestions', 'v1')
+
+    nodes, edges = pd.read_csv(NODES_CSV), pd.read_csv(EDGES_CSV)
+    collaborators = set(edges['author1'].astype(str)) | set(edges['author2'].astype(str))
+    names = dict(zip(nodes['author_id'].astype(str), nodes['author_name']))
+    for author_id in nodes['author_id'].astype(str):
+        payload = json.loads(store.get(author_id))
+        assert payload['author_id'] == author_id
+        suggestions = payload['suggestions']
+        assert bool(suggestions) <= (author_id in collaborators)
+        assert all(suggestion['name'] == names[suggestion['id']] for suggestion in suggestions)
+        scores = [suggestion['adamic_adar'] for suggestion in suggestions]
+        assert scores == sorted(scores, reverse=True)